@@ -0,0 +1,327 @@
+"""
+Command line entry point for the calculator, run with ``python -m SRPN``.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+from SRPN.cache.line_cache import LineCache
+from SRPN.lexer.lexer import Lexer
+from SRPN.output.output_sink import STANDARD_OUTPUT
+from SRPN.server.server_defaults import ServerDefaults
+from SRPN.session.session import Session
+from SRPN.stack.stack import Stack
+
+# argparse, the server, batch runner and profiler are imported only when needed, asyncio alone taking longer to
+# import than the rest of the calculator.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import argparse
+    from typing import TextIO, Tuple, Union
+
+    from SRPN.profiling.metrics_registry import MetricsRegistry
+    from SRPN.profiling.profiler import Profiler
+
+
+def main() -> None:
+    """
+    Parse the command line arguments and run the calculator over standard input.
+    """
+    if len(sys.argv) == 1:
+        # Without options nothing else is needed before the first line is read, not even argparse.
+        _process_lines(Session(output_sink=STANDARD_OUTPUT))
+        return
+
+    arguments = _parse_arguments()
+    if arguments.batch:
+        _run_batch(arguments)
+        return
+
+    if arguments.serve:
+        import asyncio
+
+        asyncio.run(_serve(arguments))
+        return
+
+    cache_size = LineCache.DEFAULT_MAX_SIZE if arguments.cache_size is None else arguments.cache_size
+    trace_capacity, trace_file = _open_trace(arguments)
+    session = Session(
+        arguments.advanced, STANDARD_OUTPUT, arguments.stack_capacity, cache_size, _make_profiler(arguments),
+        arguments.constant_folding, trace_capacity, trace_file, _make_metrics(arguments), _get_hot_threshold(arguments)
+    )
+    if trace_file is not None:
+        import signal
+
+        # The trace of a running session is written out on kill -USR1, where the platform has the signal.
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signal_number, frame: session.dump_trace(trace_file))
+
+    if arguments.script:
+        session.process_file(arguments.script)
+        return
+
+    if arguments.stream:
+        session.process_stream(sys.stdin, arguments.chunk_size)
+        return
+
+    _process_lines(session)
+
+
+def _process_lines(session: Session) -> None:
+    """
+    Evaluate standard input a line at a time until it ends.
+    :param session: Session the lines are evaluated in.
+    """
+    while True:
+        try:
+            command = input()
+        except EOFError:
+            STANDARD_OUTPUT.flush()
+            return
+        session.process_command(command)
+
+
+def _parse_arguments() -> argparse.Namespace:
+    """
+    :return: Parsed command line arguments.
+    """
+    import argparse
+
+    argument_parser = argparse.ArgumentParser(
+        prog="SRPN", description="Saturated Reverse Polish Notation calculator."
+    )
+    argument_parser.add_argument(
+        "--advanced", action="store_true",
+        help="report unrecognised operators and operands instead of reading them as 0"
+    )
+    argument_parser.add_argument(
+        "--stream", action="store_true", help="read standard input in fixed size chunks with bounded memory"
+    )
+    argument_parser.add_argument(
+        "--chunk-size", type=int, default=Lexer.STREAM_CHUNK_SIZE, help="characters read at a time when streaming"
+    )
+    argument_parser.add_argument(
+        "--script", metavar="PATH", help="run a script file by memory mapping it instead of reading standard input"
+    )
+    argument_parser.add_argument(
+        "--cache-size", type=int,
+        help=f"tokenized lines kept for reuse, 0 disables ({LineCache.DEFAULT_MAX_SIZE} by default, "
+             f"{ServerDefaults.CACHE_SIZE} per session with --serve)"
+    )
+    argument_parser.add_argument(
+        "--stack-capacity", type=_stack_capacity, default=Stack.DEFAULT_CAPACITY,
+        help="values the stack holds before overflowing"
+    )
+    argument_parser.add_argument(
+        "--no-constant-folding", dest="constant_folding", action="store_false",
+        help="evaluate every token of a line even when its literal arithmetic could be folded in advance"
+    )
+    argument_parser.add_argument(
+        "--tiered", action="store_true",
+        help="compile every line evaluated often enough to a Python function, not with --trace, --script or --stream"
+    )
+    argument_parser.add_argument(
+        "--hot-threshold", type=int, help="evaluations of a line before --tiered compiles it"
+    )
+    argument_parser.add_argument(
+        "--batch", metavar="PATH", help="replay every session input in a directory or manifest file in worker processes"
+    )
+    argument_parser.add_argument("--workers", type=int, help="worker processes for --batch, one per CPU by default")
+    argument_parser.add_argument(
+        "--batch-chunk-size", type=int, default=16, help="sessions sent to a worker at a time for --batch"
+    )
+    argument_parser.add_argument("--output-dir", help="directory the output of every --batch session is written to")
+    argument_parser.add_argument(
+        "--serve", action="store_true", help="host a session for every connection over TCP or a Unix socket"
+    )
+    argument_parser.add_argument("--host", default="127.0.0.1", help="address --serve listens on")
+    argument_parser.add_argument(
+        "--port", type=int, default=ServerDefaults.PORT, help="port --serve listens on"
+    )
+    argument_parser.add_argument("--unix-socket", metavar="PATH", help="Unix socket --serve listens on instead of TCP")
+    argument_parser.add_argument(
+        "--profile", action="store_true", help="write the time taken by every stage to standard error at exit"
+    )
+    argument_parser.add_argument(
+        "--trace", metavar="PATH",
+        help="trace the tokens evaluated and append the trace to a JSON lines file after every error and on SIGUSR1, "
+             "not with --script, --batch or --serve"
+    )
+    argument_parser.add_argument("--trace-capacity", type=int, help="most recent entries the trace keeps for --trace")
+    argument_parser.add_argument(
+        "--metrics", metavar="PATH", help="write metrics in the Prometheus text format to a file at exit"
+    )
+    argument_parser.add_argument(
+        "--metrics-port", type=int, help="serve metrics in the Prometheus text format over HTTP on a port with --serve"
+    )
+    arguments = argument_parser.parse_args()
+    if arguments.tiered and arguments.trace is not None:
+        argument_parser.error("--tiered cannot be used with --trace, which follows every token evaluated")
+    return arguments
+
+
+def _positive_int(string: str) -> int:
+    """
+    :param string: Command line argument.
+    :return: The argument as an integer.
+    :raises argparse.ArgumentTypeError: If the argument is not an integer of at least 1.
+    """
+    import argparse
+
+    try:
+        value = int(string)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {string!r}") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def _stack_capacity(string: str) -> int:
+    """
+    :param string: Command line argument.
+    :return: The argument as a stack capacity.
+    :raises argparse.ArgumentTypeError: If the argument is not an integer from 1 to Stack.MAX_CAPACITY.
+    """
+    import argparse
+
+    value = _positive_int(string)
+    if value > Stack.MAX_CAPACITY:
+        raise argparse.ArgumentTypeError(f"must be at most {Stack.MAX_CAPACITY}, not {value}")
+    return value
+
+
+def _make_profiler(arguments: argparse.Namespace) -> Union[Profiler, None]:
+    """
+    :param arguments: Parsed command line arguments.
+    :return: A profiler dumped to standard error at exit if --profile was given, otherwise None.
+    """
+    if not arguments.profile:
+        return None
+    import atexit
+
+    from SRPN.profiling.profiler import Profiler
+
+    profiler = Profiler()
+    atexit.register(profiler.dump, sys.stderr)
+    return profiler
+
+
+def _make_metrics(arguments: argparse.Namespace) -> Union[MetricsRegistry, None]:
+    """
+    :param arguments: Parsed command line arguments.
+    :return: A metrics registry written to the --metrics file at exit if --metrics or --metrics-port was given,
+    otherwise None.
+    """
+    if arguments.metrics is None and arguments.metrics_port is None:
+        return None
+    import atexit
+
+    from SRPN.profiling.metrics_registry import MetricsRegistry
+
+    metrics = MetricsRegistry()
+    if arguments.metrics is not None:
+        atexit.register(metrics.write_prometheus, arguments.metrics)
+    return metrics
+
+
+def _get_hot_threshold(arguments: argparse.Namespace) -> int:
+    """
+    :param arguments: Parsed command line arguments.
+    :return: Number of evaluations before a line is compiled if --tiered was given, otherwise 0.
+    """
+    if not arguments.tiered:
+        return 0
+    from SRPN.parse.closure_compiler import TieredLine
+
+    return TieredLine.DEFAULT_HOT_THRESHOLD if arguments.hot_threshold is None else arguments.hot_threshold
+
+
+def _open_trace(arguments: argparse.Namespace) -> Tuple[int, Union[TextIO, None]]:
+    """
+    :param arguments: Parsed command line arguments.
+    :return: Number of entries the trace keeps and the file it is appended to if --trace was given, otherwise 0 and
+    None.
+    """
+    if arguments.trace is None:
+        return 0, None
+    from SRPN.parse.tracing_parser import TracingParser
+
+    capacity = TracingParser.DEFAULT_CAPACITY if arguments.trace_capacity is None else arguments.trace_capacity
+    return capacity, open(arguments.trace, "a", encoding="utf-8")
+
+
+async def _serve(arguments: argparse.Namespace) -> None:
+    """
+    Host calculator sessions until interrupted.
+    :param arguments: Parsed command line arguments.
+    """
+    from SRPN.server.calculator_server import CalculatorServer
+
+    cache_size = CalculatorServer.DEFAULT_CACHE_SIZE if arguments.cache_size is None else arguments.cache_size
+    calculator_server = CalculatorServer(
+        arguments.advanced, arguments.stack_capacity, cache_size, profiler=_make_profiler(arguments),
+        metrics=_make_metrics(arguments)
+    )
+    if arguments.unix_socket:
+        server = await calculator_server.start_unix(arguments.unix_socket)
+    else:
+        server = await calculator_server.start_tcp(arguments.host, arguments.port)
+
+    for server_socket in server.sockets:
+        print(f"serving on {server_socket.getsockname()}", file=sys.stderr)
+    if arguments.metrics_port is not None:
+        metrics_server = await calculator_server.start_metrics(arguments.host, arguments.metrics_port)
+        for server_socket in metrics_server.sockets:
+            print(f"serving metrics on {server_socket.getsockname()}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def _run_batch(arguments: argparse.Namespace) -> None:
+    """
+    Replay the sessions given to --batch, write their outputs and report the throughput of every worker, exiting with
+    status 1 after every other session has run if any input could not be read.
+    :param arguments: Parsed command line arguments.
+    """
+    from SRPN.batch.session_runner import SessionRunner
+
+    paths = SessionRunner.find_session_inputs(arguments.batch)
+    metrics = _make_metrics(arguments)
+    runner = SessionRunner(
+        arguments.workers, arguments.batch_chunk_size, arguments.advanced, arguments.stack_capacity,
+        metrics is not None
+    )
+    start = time.perf_counter()
+    results = runner.run(paths)
+    seconds = time.perf_counter() - start
+    if metrics is not None:
+        SessionRunner.merge_metrics(results, metrics)
+
+    failed = 0
+    for result in results:
+        if result.get_error() is not None:
+            failed += 1
+            print(f"{result.get_path()}: {result.get_error()}", file=sys.stderr)
+        elif arguments.output_dir:
+            output_path = os.path.join(arguments.output_dir, os.path.relpath(result.get_path(), arguments.batch))
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(f"{output_path}.out", "w", encoding="utf-8") as output_file:
+                output_file.write(result.get_output())
+        else:
+            sys.stdout.write(result.get_output())
+
+    for worker, (sessions, worker_seconds) in sorted(SessionRunner.summarise_workers(results).items()):
+        print(f"worker {worker}: {sessions} sessions in {worker_seconds:.3f} s "
+              f"({sessions / worker_seconds if worker_seconds else 0:.0f} sessions/s)", file=sys.stderr)
+    print(f"total: {len(results)} sessions in {seconds:.3f} s ({len(results) / seconds:.0f} sessions/s)",
+          file=sys.stderr)
+    if failed:
+        print(f"{failed} sessions could not be read", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""
+Vectorised evaluation of one script against many bindings of its placeholder operands, using NumPy.
+"""
+import re
+from typing import Dict, List, Tuple
+
+import numpy
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.lexer.scanner import Scanner
+from SRPN.lexer.string_types import StringTypes
+from SRPN.lexer.substrings import Substring
+from SRPN.parse.compiler import Compiler
+from SRPN.parse.opcodes import Opcodes
+from SRPN.stack.random_generator import RandomGenerator
+from SRPN.stack.stack import Stack
+from SRPN.tokens.general_methods import GeneralMethods
+from SRPN.tokens.tokenizer import Tokenizer
+
+
+class SweepLexer(Lexer):
+    """
+    Lexer that also recognises placeholder operands such as ``$0``. A placeholder is read as a run of digits, so
+    comments and minus symbols treat it exactly as they would the literal it stands for.
+    """
+    PLACEHOLDER_PATTERN = r"\$\d+"
+    _SWEEP_PATTERN = re.compile(f"({PLACEHOLDER_PATTERN})|{Scanner.SCANNER_PATTERN.pattern}")
+    _SWEEP_STRING_TYPES = [StringTypes.DIGITS] + StringTypes.STRING_TYPES
+
+    def _decompose_uncommented_command(self, string: str) -> Tuple[Substring, ...]:
+        """
+        Break down only the parts of the script line outside of comments, placeholders included.
+        :param string: Script line.
+        :return: Tuple of substring objects with all comments removed.
+        """
+        string_types = self._SWEEP_STRING_TYPES
+        substrings = list()
+        for start, end in self._find_uncommented_regions(string):
+            substrings.extend(
+                Substring(match.group(), string_types[match.lastindex - 1])
+                for match in self._SWEEP_PATTERN.finditer(string, start, end)
+            )
+        return tuple(substrings)
+
+
+class SweepResult:
+    """
+    Per lane results of a parameter sweep, every array has one entry per lane along its first axis.
+    """
+
+    def __init__(self, stacks: numpy.ndarray, depths: numpy.ndarray, new_stack: bool, outputs: numpy.ndarray,
+                 output_valid: numpy.ndarray, error_flags: Dict[str, numpy.ndarray]) -> None:
+        self._stacks = stacks
+        self._depths = depths
+        self._new_stack = new_stack
+        self._outputs = outputs
+        self._output_valid = output_valid
+        self._error_flags = error_flags
+
+    def get_stacks(self) -> numpy.ndarray:
+        """
+        :return: Stack memory of every lane, only the first depth entries of a lane are in use.
+        """
+        return self._stacks
+
+    def get_depths(self) -> numpy.ndarray:
+        """
+        :return: Stack depth of every lane, counted as Stack.__len__ counts it.
+        """
+        return self._depths
+
+    def get_top(self) -> numpy.ndarray:
+        """
+        :return: Value on top of the stack of every lane.
+        """
+        return self._stacks[numpy.arange(len(self._depths)), self._depths - 1]
+
+    def is_new_stack(self) -> bool:
+        """
+        :return: Whether nothing was ever pushed, which is the same for every lane.
+        """
+        return self._new_stack
+
+    def get_outputs(self) -> numpy.ndarray:
+        """
+        :return: Value output by each ``=`` of the script in every lane, one column per ``=``.
+        """
+        return self._outputs
+
+    def get_output_valid(self) -> numpy.ndarray:
+        """
+        :return: Whether each output was made, an ``=`` on an empty stack outputs nothing.
+        """
+        return self._output_valid
+
+    def get_error_flags(self) -> Dict[str, numpy.ndarray]:
+        """
+        :return: For each kind of error, whether it happened at least once in every lane.
+        """
+        return self._error_flags
+
+
+class ParameterSweep:
+    """
+    Compiles a script with placeholder operands ``$0``, ``$1``... once and evaluates it for many bindings at once, each
+    binding being one lane of int64 arrays. Lanes follow the same saturation and error rules as a Stack, with errors
+    recorded as flags instead of printed.
+    A placeholder stands for the operand its bound value would make, a placeholder joined to a minus symbol stands for
+    the negated value. ``d`` prints a variable amount per lane and is not supported.
+    """
+    ERROR_NAMES = ("divide_by_zero", "negative_power", "underflow", "overflow", "stack_empty")
+    _PUSH_PLACEHOLDER = -1
+    _SATURATED_MAGNITUDE = GeneralMethods.UPPER_BOUND + 1
+    # Any base of magnitude 2 or more saturates once raised to this power.
+    _SATURATING_EXPONENT = _SATURATED_MAGNITUDE.bit_length()
+
+    def __init__(self, script: str, stack_capacity: int = Stack.DEFAULT_CAPACITY) -> None:
+        """
+        :param script: Script to evaluate, lines are separated by line breaks.
+        :param stack_capacity: Number of values the stack of every lane holds before overflowing.
+        """
+        self._stack_capacity = stack_capacity
+        self._instructions, self._placeholder_count = self._compile_script(script)
+
+    def get_placeholder_count(self) -> int:
+        """
+        :return: Number of columns bindings must have, one more than the highest placeholder index.
+        """
+        return self._placeholder_count
+
+    def evaluate(self, bindings: numpy.ndarray) -> SweepResult:
+        """
+        Evaluate the script for every row of bindings at once.
+        :param bindings: Array of shape (lanes, placeholders), or (lanes,) for a script with one placeholder.
+        :return: Results of every lane.
+        """
+        bindings = numpy.asarray(bindings, dtype=numpy.int64)
+        if bindings.ndim == 1:
+            bindings = bindings[:, numpy.newaxis]
+        if bindings.shape[1] < self._placeholder_count:
+            raise ValueError(f"Script has {self._placeholder_count} placeholders, bindings have {bindings.shape[1]}.")
+
+        lane_count = bindings.shape[0]
+        lanes = numpy.arange(lane_count)
+        stacks = numpy.zeros((lane_count, self._stack_capacity), dtype=numpy.int64)
+        stacks[:, 0] = GeneralMethods.LOWER_BOUND
+        depths = numpy.ones(lane_count, dtype=numpy.int64)
+        new_stack = True
+        error_flags = {name: numpy.zeros(lane_count, dtype=bool) for name in self.ERROR_NAMES}
+        outputs, output_valid = list(), list()
+        random_generator = RandomGenerator()
+
+        for opcode, immediate in self._instructions:
+            if opcode == self._PUSH_PLACEHOLDER or opcode == Opcodes.PUSH or opcode == Opcodes.STORE_RANDOM_INTEGER:
+                values = self._read_push_values(opcode, immediate, bindings, lane_count, random_generator)
+                if new_stack:
+                    stacks[:, 0] = values
+                    new_stack = False
+                else:
+                    full = depths == self._stack_capacity
+                    error_flags["overflow"] |= full
+                    pushed = ~full
+                    stacks[lanes[pushed], depths[pushed]] = values[pushed]
+                    depths[pushed] += 1
+            elif opcode <= Opcodes.LAST_OPERATOR:
+                self._perform_operation(opcode, stacks, depths, lanes, error_flags)
+            elif opcode == Opcodes.OUTPUT_TOP_OF_STACK:
+                if new_stack:
+                    error_flags["stack_empty"][:] = True
+                outputs.append(stacks[lanes, depths - 1])
+                output_valid.append(numpy.full(lane_count, not new_stack))
+
+        outputs = numpy.stack(outputs, axis=1) if outputs else numpy.zeros((lane_count, 0), dtype=numpy.int64)
+        output_valid = numpy.stack(output_valid, axis=1) if output_valid else numpy.zeros((lane_count, 0), dtype=bool)
+        return SweepResult(stacks, depths, new_stack, outputs, output_valid, error_flags)
+
+    @staticmethod
+    def _read_push_values(opcode: int, immediate, bindings: numpy.ndarray, lane_count: int,
+                          random_generator: RandomGenerator) -> numpy.ndarray:
+        """
+        :param opcode: PUSH, STORE_RANDOM_INTEGER or a placeholder push.
+        :param immediate: Value of a PUSH, or the index and negation of a placeholder.
+        :param bindings: Bindings of every lane.
+        :param lane_count: Number of lanes.
+        :param random_generator: Generator following the sequence a new Stack draws random integers from.
+        :return: Value pushed in every lane.
+        """
+        if opcode == Opcodes.PUSH:
+            return numpy.full(lane_count, immediate, dtype=numpy.int64)
+        if opcode == Opcodes.STORE_RANDOM_INTEGER:
+            return numpy.full(lane_count, random_generator.next_value(), dtype=numpy.int64)
+        index, negated = immediate
+        values = bindings[:, index]
+        # Pull values just past the bounds before negating, so negation cannot overflow yet still saturates.
+        values = numpy.clip(values, GeneralMethods.LOWER_BOUND - 1, GeneralMethods.UPPER_BOUND + 1)
+        if negated:
+            values = -values
+        return numpy.clip(values, GeneralMethods.LOWER_BOUND, GeneralMethods.UPPER_BOUND)
+
+    def _perform_operation(self, opcode: int, stacks: numpy.ndarray, depths: numpy.ndarray, lanes: numpy.ndarray,
+                           error_flags: Dict[str, numpy.ndarray]) -> None:
+        """
+        Apply an operator to the top two values of every lane that has them, leaving lanes that fail untouched.
+        :param opcode: Opcode of the operator.
+        :param stacks: Stack memory of every lane.
+        :param depths: Stack depth of every lane.
+        :param lanes: Index of every lane.
+        :param error_flags: Error flags of every lane.
+        """
+        underflow = depths == 1
+        error_flags["underflow"] |= underflow
+        left_index = numpy.maximum(depths - 2, 0)
+        operand1 = stacks[lanes, left_index]
+        operand2 = stacks[lanes, numpy.minimum(left_index + 1, self._stack_capacity - 1)]
+        failed = underflow.copy()
+
+        if opcode == Opcodes.ADD:
+            result = operand1 + operand2
+        elif opcode == Opcodes.SUBTRACT:
+            result = operand1 - operand2
+        elif opcode == Opcodes.MULTIPLY:
+            result = operand1 * operand2
+        elif opcode == Opcodes.DIVIDE or opcode == Opcodes.MODULO:
+            divide_by_zero = (operand2 == 0) & ~underflow
+            error_flags["divide_by_zero"] |= divide_by_zero
+            failed |= divide_by_zero
+            divisor = numpy.where(operand2 == 0, 1, operand2)
+            if opcode == Opcodes.DIVIDE:
+                result = numpy.abs(operand1) // numpy.abs(divisor)
+                result = numpy.where((operand1 < 0) != (divisor < 0), -result, result)
+            else:
+                result = numpy.remainder(operand1, divisor)
+        else:
+            negative_power = (operand2 < 0) & ~underflow
+            error_flags["negative_power"] |= negative_power
+            failed |= negative_power
+            result = self._saturating_power(operand1, operand2)
+
+        result = numpy.clip(result, GeneralMethods.LOWER_BOUND, GeneralMethods.UPPER_BOUND)
+        performed = ~failed
+        stacks[lanes[performed], left_index[performed]] = result[performed]
+        depths[performed] -= 1
+
+    @staticmethod
+    def _saturating_power(bases: numpy.ndarray, exponents: numpy.ndarray) -> numpy.ndarray:
+        """
+        Raise each base to its exponent by squaring, capping magnitudes as soon as they pass the calculator bounds so
+        nothing overflows int64. Negative exponents give 0 and are expected to be flagged by the caller.
+        :param bases: Bases of every lane.
+        :param exponents: Exponents of every lane.
+        :return: Powers of every lane, exact within the bounds and saturated beyond them.
+        """
+        cap = ParameterSweep._SATURATED_MAGNITUDE
+        exponents = numpy.maximum(exponents, 0)
+        base_magnitudes = numpy.minimum(numpy.abs(bases), cap)
+        magnitudes = numpy.ones_like(bases)
+        remaining = numpy.minimum(exponents, ParameterSweep._SATURATING_EXPONENT)
+
+        for _ in range(ParameterSweep._SATURATING_EXPONENT.bit_length()):
+            magnitudes = numpy.where(remaining & 1, numpy.minimum(magnitudes * base_magnitudes, cap), magnitudes)
+            base_magnitudes = numpy.minimum(base_magnitudes * base_magnitudes, cap)
+            remaining >>= 1
+
+        # Bases of magnitude 0 or 1 never saturate, any larger base does once the exponent reaches the saturating one.
+        saturates = (numpy.abs(bases) > 1) & (exponents >= ParameterSweep._SATURATING_EXPONENT)
+        magnitudes = numpy.where(saturates, cap, magnitudes)
+        negative = (bases < 0) & (exponents % 2 == 1)
+        return numpy.where(negative, -magnitudes, magnitudes)
+
+    @staticmethod
+    def _compile_script(script: str) -> Tuple[List[Tuple[int, object]], int]:
+        """
+        Lex and tokenize every line of the script into a list of instructions.
+        :param script: Script to compile.
+        :return: The instructions and the number of placeholders bindings must provide.
+        """
+        lexer, tokenizer = SweepLexer(), Tokenizer()
+        instructions, placeholder_count = list(), 0
+
+        for line in script.split("\n"):
+            for substring in lexer.read_user_input(line):
+                string = substring.get_string()
+                if substring.get_string_type() == StringTypes.DIGITS and "$" in string:
+                    index = int(string[string.index("$") + 1:])
+                    placeholder_count = max(placeholder_count, index + 1)
+                    instructions.append((ParameterSweep._PUSH_PLACEHOLDER, (index, string.startswith("-"))))
+                    continue
+
+                tokens = tokenizer.read_substrings((substring,))
+                for opcode, immediate in zip(*[iter(Compiler.compile_tokens(tokens))] * 2):
+                    if opcode == Opcodes.OUTPUT_STACK:
+                        raise ValueError("The d command is not supported in parameter sweeps.")
+                    instructions.append((opcode, immediate))
+
+        return instructions, placeholder_count
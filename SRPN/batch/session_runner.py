@@ -0,0 +1,184 @@
+"""
+Runs many independent calculator sessions across a pool of worker processes.
+"""
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+from SRPN.profiling.metrics_registry import MetricsRegistry
+from SRPN.session.session import Session
+from SRPN.stack.stack import Stack
+
+
+class SessionResult:
+    """
+    Output of one session along with where and how long it ran.
+    """
+
+    def __init__(self, path: str, output: str, seconds: float, worker: int,
+                 metrics_state: Dict[str, object] = None, error: str = None) -> None:
+        self._path = path
+        self._output = output
+        self._seconds = seconds
+        self._worker = worker
+        self._metrics_state = metrics_state
+        self._error = error
+
+    def get_path(self) -> str:
+        """
+        :return: Path of the session input.
+        """
+        return self._path
+
+    def get_output(self) -> str:
+        """
+        :return: Everything the session printed.
+        """
+        return self._output
+
+    def get_seconds(self) -> float:
+        """
+        :return: Time taken to run the session.
+        """
+        return self._seconds
+
+    def get_worker(self) -> int:
+        """
+        :return: Process id of the worker that ran the session.
+        """
+        return self._worker
+
+    def get_metrics_state(self) -> Union[Dict[str, object], None]:
+        """
+        :return: Metrics of the session from MetricsRegistry.get_state, None unless the runner collected them.
+        """
+        return self._metrics_state
+
+    def get_error(self) -> Union[str, None]:
+        """
+        :return: Why the session input could not be read, None if it was run.
+        """
+        return self._error
+
+
+class SessionRunner:
+    """
+    Replays session inputs, such as the files of the ``t-*`` fixture directories, in a ProcessPoolExecutor.
+    Every input is replayed in a new Session, whose generator for ``r`` is always seeded the same way, so the output
+    does not depend on the worker that runs it or on the sessions before it.
+    Metrics are counted in a registry of the session's own when collected, so they are sent back along with its output
+    and the worker keeps nothing between sessions.
+    """
+    _EXPECTED_OUTPUT_SUFFIX = ".result.term"
+
+    def __init__(self, workers: int = None, chunk_size: int = 16, advanced: bool = False,
+                 stack_capacity: int = Stack.DEFAULT_CAPACITY, collect_metrics: bool = False) -> None:
+        """
+        :param workers: Number of worker processes, the number of CPUs if not given.
+        :param chunk_size: Number of sessions sent to a worker at a time.
+        :param advanced: Report unrecognised operators and operands instead of reading them as 0.
+        :param stack_capacity: Number of values the stack of every session holds before overflowing.
+        :param collect_metrics: Count the metrics of every session, see merge_metrics.
+        """
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._advanced = advanced
+        self._stack_capacity = stack_capacity
+        self._collect_metrics = collect_metrics
+
+    @staticmethod
+    def find_session_inputs(path: str) -> List[str]:
+        """
+        A directory is searched recursively for session inputs, skipping hidden entries and expected outputs. Any other
+        path is read as a manifest listing one session input per line, relative to the manifest.
+        :param path: Directory or manifest file.
+        :return: Sorted list of session input paths for a directory, or the manifest's order.
+        """
+        if os.path.isdir(path):
+            inputs = list()
+            for directory, directory_names, file_names in os.walk(path):
+                directory_names[:] = [name for name in directory_names if not name.startswith(".")]
+                inputs.extend(
+                    os.path.join(directory, file_name) for file_name in file_names
+                    if not file_name.startswith(".") and not file_name.endswith(SessionRunner._EXPECTED_OUTPUT_SUFFIX)
+                )
+            return sorted(inputs)
+
+        manifest_directory = os.path.dirname(path)
+        with open(path, encoding="utf-8") as manifest:
+            return [os.path.join(manifest_directory, line.strip()) for line in manifest if line.strip()]
+
+    def run(self, paths: List[str]) -> List[SessionResult]:
+        """
+        :param paths: Paths of the session inputs.
+        :return: Result of every session, in the same order as the paths.
+        """
+        jobs = [(path, self._advanced, self._stack_capacity, self._collect_metrics) for path in paths]
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            return list(executor.map(_run_session_file, jobs, chunksize=self._chunk_size))
+
+    @staticmethod
+    def summarise_workers(results: List[SessionResult]) -> Dict[int, Tuple[int, float]]:
+        """
+        :param results: Results of a run.
+        :return: Number of sessions and total session time for every worker.
+        """
+        summary = dict()
+        for result in results:
+            sessions, seconds = summary.get(result.get_worker(), (0, 0.0))
+            summary[result.get_worker()] = (sessions + 1, seconds + result.get_seconds())
+        return summary
+
+    @staticmethod
+    def merge_metrics(results: List[SessionResult], metrics: MetricsRegistry) -> None:
+        """
+        :param results: Results of a run that collected metrics.
+        :param metrics: Registry the metrics of every session are added to.
+        """
+        for result in results:
+            if result.get_metrics_state() is not None:
+                metrics.merge_state(result.get_metrics_state())
+
+
+def run_session(user_input: str, advanced: bool = False, stack_capacity: int = Stack.DEFAULT_CAPACITY,
+                metrics: MetricsRegistry = None) -> str:
+    """
+    Run one session with fresh state, line by line, the way srpn.py reads standard input.
+    :param user_input: Everything the session types.
+    :param advanced: Report unrecognised operators and operands instead of reading them as 0.
+    :param stack_capacity: Number of values the stack holds before overflowing.
+    :param metrics: Registry the session is counted in, nothing is counted if not given.
+    :return: Everything the session printed.
+    """
+    session = Session(advanced, stack_capacity=stack_capacity, metrics=metrics)
+    # Standard input is read without translating line endings, so a carriage return is part of its line.
+    for line in io.StringIO(user_input, newline="\n"):
+        try:
+            session.process_command(line[:-1] if line.endswith("\n") else line)
+        except (Exception, SystemExit):
+            # srpn.py exits on any error, ending the session.
+            break
+    return session.get_output_sink().get_output()
+
+
+def _run_session_file(job: Tuple[str, bool, int, bool]) -> SessionResult:
+    """
+    Worker entry point, kept at module level so it can be sent to the pool.
+    :param job: Path of the session input, whether to run in advanced mode, the stack capacity and whether to collect
+    metrics.
+    :return: Result of the session, with no output and the error if its input could not be read.
+    """
+    path, advanced, stack_capacity, collect_metrics = job
+    metrics = MetricsRegistry() if collect_metrics else None
+    start = time.perf_counter()
+    # An input that cannot be read fails its own session alone rather than the whole batch.
+    try:
+        with open(path, encoding="utf-8", newline="\n") as session_input:
+            user_input = session_input.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return SessionResult(path, "", time.perf_counter() - start, os.getpid(), error=str(e))
+    output = run_session(user_input, advanced, stack_capacity, metrics)
+    seconds = time.perf_counter() - start
+    return SessionResult(path, output, seconds, os.getpid(), None if metrics is None else metrics.get_state())
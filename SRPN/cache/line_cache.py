@@ -0,0 +1,161 @@
+"""
+Least recently used cache of tokenized lines placed in front of the Lexer and Tokenizer.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.lexer.string_types import StringTypes
+from SRPN.parse.constant_folder import FoldedLine
+from SRPN.tokens import token
+from SRPN.tokens.tokenizer import Tokenizer
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Tuple
+
+    from SRPN.parse.closure_compiler import TieredLine
+
+
+class LineCache:
+    """
+    Remembers the tokens of recently read lines so repeated lines skip lexing and tokenization.
+    A line's tokens depend on whether it starts inside a comment, so that state is part of the key, and each entry
+    keeps the comment state the line leaves behind so it can be restored on a hit.
+    The cache is bounded by the characters of its lines as well as their number, as an entry keeps its line along with
+    tokens, folded and tiered lines that grow with it, so a few long machine-generated lines cannot hold on to much
+    memory. A line longer than the bound on its own is never kept.
+    """
+    DEFAULT_MAX_SIZE = 1024
+    # About 10 MB of lines, tokens and folded lines at most.
+    DEFAULT_MAX_CHARACTERS = 1 << 20
+
+    def __init__(self, lexer: Lexer, tokenizer: Tokenizer, max_size: int = DEFAULT_MAX_SIZE,
+                 max_characters: int = DEFAULT_MAX_CHARACTERS) -> None:
+        """
+        :param lexer: Lexer used to read lines missing from the cache, its comment state is kept up to date on hits.
+        :param tokenizer: Tokenizer used to read lines missing from the cache.
+        :param max_size: Maximum number of lines kept, 0 disables caching.
+        :param max_characters: Maximum number of characters in the lines kept.
+        """
+        self._lexer = lexer
+        self._tokenizer = tokenizer
+        self._max_size = max_size
+        self._max_characters = max_characters
+        self._characters = 0
+        # Keyed by the line and its starting comment state, holding its tokens, ending comment state, the strings of
+        # its unrecognised substrings, and its folded and tiered lines once they are asked for.
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def read_line(self, line: str) -> Tuple[token.Token, ...]:
+        """
+        Lex and tokenize a line, or reuse the tokens from the last time the same line was read in the same comment
+        state. Unrecognised substrings are reported to the tokenizer again on a hit.
+        :param line: User input string.
+        :return: Tuple of tokens for the line.
+        """
+        key = (line, self._lexer.is_comment_open())
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            self._hits += 1
+            self._entries.move_to_end(key)
+            tokens, comment_open, unrecognised, _, _ = entry
+            self._lexer.set_comment_open(comment_open)
+            self._tokenizer.report_unrecognised(unrecognised)
+            return tokens
+
+        self._misses += 1
+        substrings = self._lexer.read_user_input(line)
+        tokens = self._tokenizer.read_substrings(substrings)
+        if self._max_size and len(line) <= self._max_characters:
+            unrecognised = tuple(
+                substring.get_string() for substring in substrings
+                if substring.get_string_type() == StringTypes.NON_VALUE
+            )
+            self._entries[key] = (tokens, self._lexer.is_comment_open(), unrecognised, None, None)
+            self._characters += len(line)
+            self._evict(self._max_size)
+        return tokens
+
+    def read_folded_line(self, line: str) -> FoldedLine:
+        """
+        Read a line as read_line does, folding its constants the first time its entry is asked for them.
+        :param line: User input string.
+        :return: Folded line for the line.
+        """
+        key = (line, self._lexer.is_comment_open())
+        tokens = self.read_line(line)
+        entry = self._entries.get(key)
+        if entry is None:
+            return FoldedLine(tokens)
+        folded_line = entry[3]
+        if folded_line is None:
+            folded_line = FoldedLine(tokens)
+            self._entries[key] = (*entry[:3], folded_line, entry[4])
+        return folded_line
+
+    def read_tiered_line(self, line: str, constant_folding: bool, hot_threshold: int) -> TieredLine:
+        """
+        Read a line as read_line does, along with the count of its evaluations kept in its entry. A line missing from
+        the cache is never hot, as its count starts again every time it is read.
+        :param line: User input string.
+        :param constant_folding: Fold the literal arithmetic of a line read for the first time.
+        :param hot_threshold: Number of evaluations before a line read for the first time is compiled.
+        :return: Tiered line for the line.
+        """
+        key = (line, self._lexer.is_comment_open())
+        tokens = self.read_line(line)
+        entry = self._entries.get(key)
+        tiered_line = None if entry is None else entry[4]
+        if tiered_line is None:
+            # Only tiered sessions need the compiler, so it is imported the first time one reads a line.
+            from SRPN.parse.closure_compiler import TieredLine
+
+            tiered_line = TieredLine(tokens, FoldedLine(tokens) if constant_folding else None, hot_threshold)
+            if entry is not None:
+                self._entries[key] = (*entry[:4], tiered_line)
+        return tiered_line
+
+    def resize(self, max_size: int) -> None:
+        """
+        :param max_size: New maximum number of lines kept, least recently used lines over it are evicted.
+        """
+        self._max_size = max_size
+        self._evict(max_size)
+
+    def clear(self) -> None:
+        """
+        Remove every entry, the counters are kept.
+        """
+        self._entries.clear()
+        self._characters = 0
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        :return: Hit, miss and eviction counters along with the current and maximum number of entries and of their
+        characters.
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "characters": self._characters,
+            "max_characters": self._max_characters,
+        }
+
+    def _evict(self, max_size: int) -> None:
+        """
+        :param max_size: Number of entries to keep, the least recently used entries are removed first, as they are while
+        the entries hold more characters than the cache is bounded to.
+        """
+        while len(self._entries) > max_size or self._characters > self._max_characters:
+            (line, _), _ = self._entries.popitem(last=False)
+            self._characters -= len(line)
+            self._evictions += 1
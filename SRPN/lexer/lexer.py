@@ -1,32 +1,72 @@
 """
 Lexer object used to prepare user input for tokenization.
 """
+from __future__ import annotations
+
 import re
-from typing import Tuple
 
 from .patterns import Patterns
+from .scanner import Scanner
 from .string_types import StringTypes
 from .substrings import Substring
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, List, TextIO, Tuple
+
 
 class Lexer:
     """
     Prepares the user input for tokenization.
     """
+    STREAM_CHUNK_SIZE = 65536
 
-    def __init__(self) -> None:
+    def __init__(self, single_pass_scanner: bool = True) -> None:
+        """
+        :param single_pass_scanner: Decompose user input with the compiled single pass Scanner, rather than by matching
+        every pattern in turn at the start of the remaining string.
+        """
         self._comment_open = False
+        self._single_pass_scanner = single_pass_scanner
+
+    def is_comment_open(self) -> bool:
+        """
+        :return: Whether a comment opened on a previous line is still open.
+        """
+        return self._comment_open
+
+    def set_comment_open(self, comment_open: bool) -> None:
+        """
+        :param comment_open: Whether the next line starts inside a comment.
+        """
+        self._comment_open = comment_open
 
     def read_user_input(self, user_input: str) -> Tuple[Substring, ...]:
         """
         Method to decompose and clean a user input in preparation for tokenization.
         :param user_input: User input string.
         """
-        substrings = self._decompose_command(user_input)
-        substrings = self._verify_hashtag_commands(substrings)
+        if self._single_pass_scanner:
+            substrings = self._decompose_uncommented_command(user_input)
+        else:
+            substrings = self._decompose_command(user_input)
+            substrings = self._verify_hashtag_commands(substrings)
         substrings = self._verify_minus_operands(substrings)
         return substrings
 
+    def read_stream(self, stream: TextIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Substring]:
+        """
+        Lazily decompose and clean a file-like object in preparation for tokenization. The stream is read in fixed size
+        chunks and every stage keeps only a constant amount of state, so memory stays bounded however long a line is.
+        :param stream: File-like object opened in text mode.
+        :param chunk_size: Number of characters read from the stream at a time.
+        :return: Iterator of substrings, with LINE_BREAK substrings marking the end of each line.
+        """
+        substrings = Scanner.scan_stream(stream, chunk_size)
+        substrings = self._filter_comment_stream(substrings)
+        substrings = self._merge_minus_operand_stream(substrings)
+        return substrings
+
     @staticmethod
     def _decompose_command(string: str) -> Tuple[Substring, ...]:
         """
@@ -47,6 +87,46 @@ class Lexer:
 
         return tuple(substrings)
 
+    def _decompose_uncommented_command(self, string: str) -> Tuple[Substring, ...]:
+        """
+        Break down only the parts of the user input that are outside of comments, so the body of a comment is skipped
+        over without ever being decomposed into substrings.
+        :param string: User input.
+        :return: Tuple of substring objects with all comments removed.
+        """
+        substrings = list()
+        for start, end in self._find_uncommented_regions(string):
+            substrings.extend(Scanner.decompose_command(string, start, end))
+        return tuple(substrings)
+
+    def _find_uncommented_regions(self, string: str) -> List[Tuple[int, int]]:
+        """
+        Jump between comment markers with a string search to find the regions of the user input outside of comments.
+        A comment marker is bordered by spaces or the ends of the input, so cutting the input at one never splits what
+        would otherwise be a single substring.
+        :param string: User input.
+        :return: List of start and end indexes of every region outside of a comment.
+        """
+        regions = list()
+        final_index = len(string) - 1
+        region_start = 0
+
+        index = string.find("#")
+        while index != -1:
+            valid_preceding_character = (index == 0) or (string[index - 1] == " ")
+            valid_subsequent_character = (index == final_index) or (string[index + 1] == " ")
+            if valid_preceding_character and valid_subsequent_character:
+                if self._comment_open:
+                    region_start = index + 1
+                else:
+                    regions.append((region_start, index))
+                self._comment_open = not self._comment_open
+            index = string.find("#", index + 1)
+
+        if not self._comment_open:
+            regions.append((region_start, len(string)))
+        return regions
+
     def _verify_hashtag_commands(self, substrings: Tuple[Substring, ...]) -> Tuple[Substring, ...]:
         """
         Find and remove all comments in the decomposed user input.
@@ -116,61 +196,76 @@ class Lexer:
         :param substrings: Tuple of the decomposed user input as Substrings.
         :return: Tuple of decomposed user input with operands correctly prefaced with negative symbols.
         """
-        minus_operand_indexes = list()
+        return tuple(self._merge_minus_operand_stream(iter(substrings)))
 
-        for index, substring in enumerate(substrings):
-            substring_type = substring.get_string_type()
-            if substring_type == StringTypes.MINUS and self._is_minus_for_operand(substrings, index):
-                minus_operand_indexes.append(index)
-
-        minus_operand_indexes = tuple(minus_operand_indexes)
-        return self._combine_minuses_with_operands(substrings, minus_operand_indexes)
-
-    @staticmethod
-    def _combine_minuses_with_operands(
-            substrings: Tuple[Substring, ...], minus_operand_indexes: Tuple[int, ...]) -> Tuple[Substring, ...]:
+    def _filter_comment_stream(self, substrings: Iterator[Substring]) -> Iterator[Substring]:
         """
-        Combines the specified minus symbols with their respective operands.
-        :param substrings: Tuple of the decomposed user input as Substrings.
-        :param minus_operand_indexes: Indexes of the minuses to be combined with the operand that supersedes them.
-        :return: Tuple of decomposed user input with operands correctly prefaced with negative symbols.
+        Lazily remove all comments from a stream of substrings, looking one substring ahead to find comment markers.
+        Line breaks are always kept, both comment markers and minus operands rely on them to find the end of a line.
+        :param substrings: Iterator of the decomposed stream as Substrings.
+        :return: Iterator of Substrings with all comments removed.
         """
-        substrings = list(substrings)
+        line_edge_types = (StringTypes.SPACE_CHARACTER, StringTypes.LINE_BREAK)
+        previous_type = StringTypes.LINE_BREAK
+        substring = next(substrings, None)
 
-        for index in reversed(minus_operand_indexes):
-            minus_substring = substrings.pop(index)
-            operand_substring = substrings.pop(index)
-            new_operand_string = minus_substring.get_string() + operand_substring.get_string()
-            new_operand = Substring(new_operand_string, StringTypes.DIGITS)
-            substrings.insert(index, new_operand)
-        return tuple(substrings)
+        while substring is not None:
+            subsequent_substring = next(substrings, None)
+            substring_type = substring.get_string_type()
+            if subsequent_substring is None:
+                subsequent_type = StringTypes.LINE_BREAK
+            else:
+                subsequent_type = subsequent_substring.get_string_type()
+
+            if substring_type == StringTypes.HASHTAG and previous_type in line_edge_types and \
+                    subsequent_type in line_edge_types:
+                self._comment_open = not self._comment_open
+            elif not self._comment_open or substring_type == StringTypes.LINE_BREAK:
+                yield substring
+
+            previous_type = substring_type
+            substring = subsequent_substring
 
     @staticmethod
-    def _is_minus_for_operand(substrings: Tuple[Substring, ...], index: int) -> bool:
+    def _merge_minus_operand_stream(substrings: Iterator[Substring]) -> Iterator[Substring]:
         """
-        Check if a minus preceding an operand should be used to negate the operand or kept as an operator.
-        If an odd number of minuses are in front of an operand the minus should be treated as an operator, this is rule
-        is negated if an operand is directly in front of those consecutive minuses.
-        :param substrings: Tuple of the decomposed user input as Substrings.
-        :param index: Index of the minus being checked.
-        :return: Boolean stating if a minus should be combined with the operand preceding it.
+        Lazily join the correct minus symbols to their respective operands in a single forward pass.
+        If an odd number of minuses are in front of an operand the last minus should be combined with it, this rule is
+        negated if an operand is directly in front of those consecutive minuses. Only the last minus of a run can be
+        combined, so the run is held as its length and whether an operand preceded it rather than searched backwards.
+        :param substrings: Iterator of the decomposed stream as Substrings, with comments removed.
+        :return: Iterator of Substrings with operands correctly prefaced with negative symbols.
         """
-        pointer = index
-        final_index = len(substrings) - 1
+        held_minus = None
         consecutive_minuses = 0
+        minuses_follow_operand = False
+        previous_type = StringTypes.LINE_BREAK
 
-        if (index == final_index) or (substrings[index + 1].get_string_type() != StringTypes.DIGITS):
-            return False
+        for substring in substrings:
+            substring_type = substring.get_string_type()
 
-        while (0 <= pointer) and (substrings[pointer].get_string_type() == StringTypes.MINUS):
-            consecutive_minuses += 1
-            pointer -= 1
+            if substring_type == StringTypes.MINUS:
+                if held_minus is None:
+                    minuses_follow_operand = previous_type == StringTypes.DIGITS
+                else:
+                    yield held_minus
+                held_minus = substring
+                consecutive_minuses += 1
+            else:
+                if held_minus is not None:
+                    odd_consecutive_minuses = bool(consecutive_minuses % 2)
+                    if substring_type == StringTypes.DIGITS and odd_consecutive_minuses != minuses_follow_operand:
+                        substring = Substring(held_minus.get_string() + substring.get_string(), StringTypes.DIGITS)
+                    else:
+                        yield held_minus
+                    held_minus = None
+                    consecutive_minuses = 0
+                yield substring
 
-        odd_consecutive_minuses = bool(consecutive_minuses % 2)
-        if (substrings[pointer].get_string_type() == StringTypes.DIGITS) and (0 <= pointer):
-            return not odd_consecutive_minuses
-        else:
-            return odd_consecutive_minuses
+            previous_type = substring_type
+
+        if held_minus is not None:
+            yield held_minus
 
 
 if __name__ == '__main__':
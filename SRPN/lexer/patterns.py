@@ -35,3 +35,4 @@ class Patterns:
         COMMAND_RANDOM,
         NON_VALUE_PATTERN,
     ]
+    LINE_BREAK_PATTERN = r"\n"
@@ -0,0 +1,99 @@
+"""
+Single pass scanner used to decompose user input into substrings.
+"""
+from __future__ import annotations
+
+import re
+
+from SRPN.tokens.general_methods import GeneralMethods
+from .patterns import Patterns
+from .string_types import StringTypes
+from .substrings import Substring
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, Optional, TextIO, Tuple
+
+
+class Scanner:
+    """
+    Decomposes user input by walking it once with a single precompiled alternation of every pattern.
+    """
+    # Each pattern gets its own group so the index of the group that matched identifies the string type. Alternatives
+    # are tried in order, which gives the same precedence as matching each pattern of the list in turn.
+    SCANNER_PATTERN = re.compile("|".join(f"({pattern})" for pattern in Patterns.PATTERNS_LIST))
+    # Compiled the first time a stream is scanned, as most sessions never read one.
+    _stream_pattern: Optional[re.Pattern] = None
+    STREAM_STRING_TYPES = StringTypes.STRING_TYPES + [StringTypes.LINE_BREAK]
+    # A run with more significant digits than this is outside the calculator bounds, so it saturates the same way no
+    # matter how many further digits follow it.
+    _SIGNIFICANT_DIGITS_KEPT = len(str(GeneralMethods.OUT_OF_BOUNDS))
+
+    @staticmethod
+    def decompose_command(string: str, start: int = 0, end: Optional[int] = None) -> Tuple[Substring, ...]:
+        """
+        Break the user input down into substrings in a single pass over the string, by offset rather than by slicing
+        off the matched prefix.
+        :param string: User input.
+        :param start: Index the decomposition starts from.
+        :param end: Index the decomposition stops at, the end of the string if not given.
+        :return: Tuple of substring objects.
+        """
+        string_types = StringTypes.STRING_TYPES
+        end = len(string) if end is None else end
+        return tuple(
+            Substring(match.group(), string_types[match.lastindex - 1])
+            for match in Scanner.SCANNER_PATTERN.finditer(string, start, end)
+        )
+
+    @staticmethod
+    def scan_stream(stream: TextIO, chunk_size: int) -> Iterator[Substring]:
+        """
+        Lazily break a file-like object down into substrings, reading it in chunks of a fixed size. Line breaks are
+        kept as LINE_BREAK substrings and runs of digits split across the edge of a chunk are joined back together.
+        :param stream: File-like object opened in text mode.
+        :param chunk_size: Number of characters read from the stream at a time.
+        :return: Iterator of substring objects.
+        """
+        string_types = Scanner.STREAM_STRING_TYPES
+        stream_pattern = Scanner.get_stream_pattern()
+        carried_digits = ""
+
+        for chunk in iter(lambda: stream.read(chunk_size), ""):
+            chunk_length = len(chunk)
+            for match in stream_pattern.finditer(chunk):
+                string, string_type = match.group(), string_types[match.lastindex - 1]
+                if string_type == StringTypes.DIGITS:
+                    string = Scanner.compact_digits(carried_digits + string)
+                    carried_digits = ""
+                    if match.end() == chunk_length:
+                        carried_digits = string
+                        continue
+                elif carried_digits:
+                    yield Substring(carried_digits, StringTypes.DIGITS)
+                    carried_digits = ""
+                yield Substring(string, string_type)
+
+        if carried_digits:
+            yield Substring(carried_digits, StringTypes.DIGITS)
+
+    @staticmethod
+    def get_stream_pattern() -> re.Pattern:
+        """
+        :return: The scanner pattern with line breaks as a further alternative.
+        """
+        if Scanner._stream_pattern is None:
+            Scanner._stream_pattern = re.compile(f"{Scanner.SCANNER_PATTERN.pattern}|({Patterns.LINE_BREAK_PATTERN})")
+        return Scanner._stream_pattern
+
+    @staticmethod
+    def compact_digits(digits: str) -> str:
+        """
+        Shorten a run of digits without changing the value it is bounded to, so arbitrarily long runs take bounded
+        memory. More digits joined to the shortened run, or a minus before it, bound it the same way as the run itself.
+        :param digits: Run of digits.
+        :return: The run if it is short, otherwise the digits of its value read by GeneralMethods.read_digits.
+        """
+        if len(digits) <= Scanner._SIGNIFICANT_DIGITS_KEPT:
+            return digits
+        return str(GeneralMethods.read_digits(digits))
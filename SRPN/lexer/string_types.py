@@ -35,3 +35,5 @@ class StringTypes:
         RANDOM,
         NON_VALUE
     ]
+    # Only produced when lexing a stream, where line breaks are kept to mark where each line ends.
+    LINE_BREAK = 14
@@ -7,6 +7,7 @@ class Substring:
     """
     Class used to store information about a substring during the lexing process.
     """
+    __slots__ = ("_string", "_string_type")
 
     def __str__(self) -> str:
         return self._string
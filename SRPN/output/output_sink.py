@@ -0,0 +1,151 @@
+"""
+Destinations for everything the calculator prints.
+"""
+from __future__ import annotations
+
+import atexit
+import contextlib
+import sys
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import ContextManager, Iterator, List, TextIO
+
+
+class OutputSink:
+    """
+    Abstract OutputSink class to define the methods each OutputSink subclass must implement.
+    """
+
+    def write_line(self, line: str) -> None:
+        """
+        Output a single line, such as a stack value or an error message.
+        :param line: Line without its line break.
+        """
+        raise NotImplementedError("This is the abstract class for OutputSinks and should not be used directly.")
+
+    def end_command(self) -> None:
+        """
+        Flush point reached after every command line, nothing has to be written out here.
+        """
+
+    def capture(self) -> ContextManager[List[str]]:
+        """
+        Divert the lines written while the context is open into a list, instead of the usual destination.
+        :return: Context manager giving the list that holds the diverted lines once the context is closed.
+        """
+        raise NotImplementedError("This is the abstract class for OutputSinks and should not be used directly.")
+
+    def flush(self) -> None:
+        """
+        Write out everything held so far.
+        """
+
+
+class StreamOutputSink(OutputSink):
+    """
+    Holds lines and writes them to a text stream as one block, rather than making a write for every line.
+    """
+    DEFAULT_BUFFER_LINES = 1024
+
+    def __init__(self, stream: TextIO = None, buffer_lines: int = DEFAULT_BUFFER_LINES,
+                 line_buffered: bool = None) -> None:
+        """
+        :param stream: Stream written to, whatever sys.stdout is at the time of writing if not given.
+        :param buffer_lines: Number of lines held before they are written to the stream.
+        :param line_buffered: Flush at the end of every command line, so output is seen before the next line is typed.
+        If not given, the sink is line buffered when the stream is a terminal.
+        """
+        self._stream = stream
+        self._buffer_lines = buffer_lines
+        self._line_buffered = line_buffered
+        self._lines: List[str] = list()
+        self._captured_lines: List[str] = None
+
+    def write_line(self, line: str) -> None:
+        if self._captured_lines is not None:
+            self._captured_lines.append(line)
+            return
+        self._lines.append(line)
+        if len(self._lines) >= self._buffer_lines:
+            self._write_lines()
+
+    def end_command(self) -> None:
+        if self._line_buffered is None:
+            self._line_buffered = self._get_stream().isatty()
+        if self._line_buffered:
+            self.flush()
+
+    def flush(self) -> None:
+        self._write_lines()
+        self._get_stream().flush()
+
+    @contextlib.contextmanager
+    def capture(self) -> Iterator[List[str]]:
+        previous_captured_lines = self._captured_lines
+        self._captured_lines = captured_lines = list()
+        try:
+            yield captured_lines
+        finally:
+            self._captured_lines = previous_captured_lines
+
+    def _write_lines(self) -> None:
+        """
+        Write every held line to the stream in a single write.
+        """
+        if self._lines:
+            self._lines.append("")
+            self._get_stream().write("\n".join(self._lines))
+            self._lines.clear()
+
+    def _get_stream(self) -> TextIO:
+        """
+        :return: Stream written to.
+        """
+        return sys.stdout if self._stream is None else self._stream
+
+
+class ListOutputSink(OutputSink):
+    """
+    Keeps every line in memory, for embedding the calculator.
+    """
+
+    def __init__(self) -> None:
+        self._lines: List[str] = list()
+
+    def write_line(self, line: str) -> None:
+        self._lines.append(line)
+
+    @contextlib.contextmanager
+    def capture(self) -> Iterator[List[str]]:
+        # Lines are already kept in a list, so the ones written in the context are moved out of it afterwards.
+        captured_lines = list()
+        start = len(self._lines)
+        try:
+            yield captured_lines
+        finally:
+            captured_lines.extend(self._lines[start:])
+            del self._lines[start:]
+
+    def get_lines(self) -> List[str]:
+        """
+        :return: Every line written since the sink was created or last cleared.
+        """
+        return self._lines
+
+    def get_output(self) -> str:
+        """
+        :return: Every line written, each followed by a line break, as print would have written them.
+        """
+        return "".join(f"{line}\n" for line in self._lines)
+
+    def clear(self) -> None:
+        """
+        Remove every line written so far.
+        """
+        self._lines.clear()
+
+
+# Shared by everything that prints to standard output by default, so their lines stay in order.
+STANDARD_OUTPUT = StreamOutputSink()
+atexit.register(STANDARD_OUTPUT.flush)
@@ -0,0 +1,150 @@
+"""
+Compiler turning lines of ASCII bytes straight into instructions for the VirtualMachine, without decoding them.
+"""
+import re
+from typing import Dict, List, Tuple
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.parse.opcodes import Opcodes
+from SRPN.tokens.general_methods import GeneralMethods
+
+
+class ByteCompiler:
+    """
+    Lexes, tokenizes and compiles a line in one pass over a buffer, giving the same instructions as the Lexer,
+    Tokenizer and Compiler do for the decoded line. Only the values of operands and the strings of reported
+    unrecognised bytes become Python objects.
+    Bytes are classified by a single alternation equivalent to Patterns.PATTERNS_LIST, except that a run of minuses is
+    matched together with any digits following it, so minus operands are merged as they are matched. Spaces match no
+    alternative and are skipped over by the search. Only ASCII digits are recognised, so a line holding any byte outside
+    of ASCII must be decoded and read as a string instead.
+    """
+    _TOKEN_PATTERN = re.compile(rb"(-*)([0-9]+)|(-+)|([+*/%^d=r])|(#)|([^ ])", re.DOTALL)
+    _MINUS_DIGITS, _MINUSES, _OPERATOR, _HASHTAG = 2, 3, 4, 5
+    _SIGNIFICANT_DIGIT_PATTERN = re.compile(rb"[1-9]")
+    _OPCODES: Dict[bytes, int] = {
+        b"+": Opcodes.ADD,
+        b"*": Opcodes.MULTIPLY,
+        b"/": Opcodes.DIVIDE,
+        b"%": Opcodes.MODULO,
+        b"^": Opcodes.EXPONENT,
+        b"d": Opcodes.OUTPUT_STACK,
+        b"=": Opcodes.OUTPUT_TOP_OF_STACK,
+        b"r": Opcodes.STORE_RANDOM_INTEGER,
+    }
+    _NO_IMMEDIATE = 0
+    _SPACE = ord(" ")
+    _BOUND_DIGITS = len(str(GeneralMethods.UPPER_BOUND))
+
+    def __init__(self, lexer: Lexer, unrecognised_as_zero: bool = True) -> None:
+        """
+        :param lexer: Lexer holding whether a comment is open, kept up to date as lines are compiled.
+        :param unrecognised_as_zero: Compile bytes that are neither operators, operands nor commands as an operand of
+        zero rather than return them to be reported, see Tokenizer.reads_unrecognised_as_zero.
+        """
+        self._lexer = lexer
+        self._unrecognised_as_zero = unrecognised_as_zero
+
+    def compile_line(self, buffer, start: int, end: int, instructions: List[int]) -> Tuple[str, ...]:
+        """
+        :param buffer: Bytes or a memory map holding the line, slicing it must give bytes.
+        :param start: Index of the first byte of the line.
+        :param end: Index after the last byte of the line, excluding its line break.
+        :param instructions: List the instructions of the line are appended to, two entries per instruction.
+        :return: Strings of the unrecognised bytes to report before the line is run, if they are not read as zero.
+        """
+        unrecognised = list()
+        for region_start, region_end in self._find_uncommented_regions(buffer, start, end):
+            self._compile_region(buffer, region_start, region_end, instructions, unrecognised)
+        return tuple(unrecognised)
+
+    def _find_uncommented_regions(self, buffer, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        Jump between comment markers with a search of the buffer, as the Lexer does over a string.
+        :param buffer: Bytes or a memory map holding the line.
+        :param start: Index of the first byte of the line.
+        :param end: Index after the last byte of the line.
+        :return: List of start and end indexes of every region outside of a comment.
+        """
+        lexer = self._lexer
+        comment_open = lexer.is_comment_open()
+        regions = list()
+        region_start = start
+
+        index = buffer.find(b"#", start, end)
+        while index != -1:
+            valid_preceding_byte = (index == start) or (buffer[index - 1] == self._SPACE)
+            valid_subsequent_byte = (index == end - 1) or (buffer[index + 1] == self._SPACE)
+            if valid_preceding_byte and valid_subsequent_byte:
+                if comment_open:
+                    region_start = index + 1
+                else:
+                    regions.append((region_start, index))
+                comment_open = not comment_open
+            index = buffer.find(b"#", index + 1, end)
+
+        if not comment_open:
+            regions.append((region_start, end))
+        lexer.set_comment_open(comment_open)
+        return regions
+
+    def _compile_region(self, buffer, start: int, end: int, instructions: List[int], unrecognised: List[str]) -> None:
+        """
+        A region starts and ends at a space or the end of its line, so a run of minuses never continues into the next
+        region and every region can be compiled on its own.
+        :param buffer: Bytes or a memory map holding the region.
+        :param start: Index of the first byte of the region.
+        :param end: Index after the last byte of the region.
+        :param instructions: List the instructions of the region are appended to.
+        :param unrecognised: List the strings of unrecognised bytes are appended to, if they are not read as zero.
+        """
+        append, extend = instructions.append, instructions.extend
+        opcodes = self._OPCODES
+        subtraction = (Opcodes.SUBTRACT, self._NO_IMMEDIATE)
+        digits_end = -1
+
+        for match in self._TOKEN_PATTERN.finditer(buffer, start, end):
+            kind = match.lastindex
+            if kind == self._MINUS_DIGITS:
+                minuses_start, digits_start = match.start(1), match.start(2)
+                minuses = digits_start - minuses_start
+                negative = False
+                if minuses:
+                    # The last minus joins the operand if the run is odd, or even directly after another operand.
+                    negative = bool(minuses & 1) != (minuses_start == digits_end)
+                    extend(subtraction * (minuses - negative))
+                digits_end = match.end()
+                append(Opcodes.PUSH)
+                append(self._bound_digits(buffer, digits_start, digits_end, negative))
+            elif kind == self._MINUSES:
+                extend(subtraction * (match.end() - match.start()))
+            elif kind == self._OPERATOR:
+                append(opcodes[match.group()])
+                append(self._NO_IMMEDIATE)
+            elif kind == self._HASHTAG or self._unrecognised_as_zero:
+                append(Opcodes.PUSH)
+                append(0)
+            else:
+                unrecognised.append(match.group().decode("ascii"))
+
+    @staticmethod
+    def _bound_digits(buffer, start: int, end: int, negative: bool) -> int:
+        """
+        Equivalent to GeneralMethods.bound_digits over ASCII digits in a buffer, slicing only the significant digits.
+        :param buffer: Bytes or a memory map holding the digits.
+        :param start: Index of the first digit.
+        :param end: Index after the last digit.
+        :param negative: Whether a minus joined the digits.
+        :return: The value of the digits within a valid range.
+        """
+        if end - start > ByteCompiler._BOUND_DIGITS:
+            significant_digit = ByteCompiler._SIGNIFICANT_DIGIT_PATTERN.search(buffer, start, end)
+            if significant_digit is None:
+                return 0
+            start = significant_digit.start()
+            if end - start > ByteCompiler._BOUND_DIGITS:
+                # Saturated through bound_output, so the saturation is reported like that of any other literal.
+                out_of_bounds = GeneralMethods.OUT_OF_BOUNDS
+                return GeneralMethods.bound_output(-out_of_bounds if negative else out_of_bounds)
+        integer = int(buffer[start:end])
+        return GeneralMethods.bound_output(-integer if negative else integer)
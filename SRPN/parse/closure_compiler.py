@@ -0,0 +1,361 @@
+"""
+Compiler turning a hot line into a Python closure specialised for its tokens, the top tier of tiered execution.
+"""
+from __future__ import annotations
+
+import operator
+
+from SRPN.errors.negative_exponent_error import NegativeExponentError
+from SRPN.errors.stack_empty_error import StackEmptyError
+from SRPN.errors.underflow_error import UnderflowError
+from SRPN.parse.stack_effect import StackEffect
+from SRPN.tokens import command, operand, operators, token
+from SRPN.tokens.general_methods import GeneralMethods
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, List, Tuple, Type, Union
+
+    from SRPN.parse.constant_folder import FoldedLine
+    from SRPN.parse.parser import Parser
+    from SRPN.stack.stack import Stack
+
+    CompiledLine = Callable[[Stack, Callable[[str], None], Callable[[Exception], None]], bool]
+
+
+class ClosureCompiler:
+    """
+    Generates the source of a function evaluating a line, with the arithmetic, saturation and error checks of the
+    operators, Stack and Parser written out for every token, so nothing is dispatched or called per token. The function
+    works on the slots of the Stack held in local variables and writes them back when it returns, however it returns.
+    A function has two bodies. Where the stack effect of the line shows it cannot cause a stack error against the stack
+    of the moment, its folded tokens are evaluated without any depth check, and an operator applied to a literal uses
+    it in place rather than pushing and popping it. Any other stack takes the body checking everything, which evaluates
+    the tokens of the line exactly as the Parser would.
+    """
+    # Longer lines are left to the Parser, their source taking longer to compile than evaluating them saves.
+    MAX_TOKENS = 1024
+    _ARITHMETIC = {
+        operators.Addition: "{a} + {b}",
+        operators.Subtraction: "{a} - {b}",
+        operators.Product: "{a} * {b}",
+        operators.Modulo: "{a} % {b}",
+    }
+    # Comparison of the right operand with 0 making an operator fail, and the error it then reports.
+    _FAILURES = {
+        operators.Quotient: ("==", 'ZeroDivisionError("Divide by 0.")'),
+        operators.Modulo: ("==", 'ZeroDivisionError("Divide by 0.")'),
+        operators.Exponentiation: ("<", 'NegativeExponentError("Negative power.")'),
+    }
+    _COMPARISONS = {"==": operator.eq, "<": operator.lt}
+    _OVERFLOW = 'report_error(OverflowError("Stack overflow."))'
+    _UNDERFLOW = 'report_error(UnderflowError("Stack underflow."))'
+    _EMPTY = 'report_error(StackEmptyError("Stack Empty"))'
+
+    @staticmethod
+    def can_compile(tokens: Tuple[token.Token, ...]) -> bool:
+        """
+        :param tokens: Tokens of a line.
+        :return: Whether the line is worth compiling.
+        """
+        return 0 < len(tokens) <= ClosureCompiler.MAX_TOKENS
+
+    @staticmethod
+    def compile_line(tokens: Tuple[token.Token, ...], folded_tokens: Tuple[token.Token, ...]) -> CompiledLine:
+        """
+        :param tokens: Tokens of a line.
+        :param folded_tokens: Tokens of the line with its literal arithmetic folded, or the tokens of the line.
+        :return: Function taking the stack, the write_line method of the sink the output of the line goes to and the
+        function errors are reported to, evaluating the line against the stack and returning whether it evaluated the
+        folded tokens.
+        """
+        namespace = dict()
+        exec(compile(ClosureCompiler.generate_source(tokens, folded_tokens), "<hot line>", "exec"), namespace)
+        return namespace["make_line"](
+            GeneralMethods.bound_output, GeneralMethods.report_saturation, operators.Exponentiation().perform_operation,
+            UnderflowError, NegativeExponentError, StackEmptyError
+        )
+
+    @staticmethod
+    def generate_source(tokens: Tuple[token.Token, ...], folded_tokens: Tuple[token.Token, ...]) -> str:
+        """
+        :param tokens: Tokens of a line.
+        :param folded_tokens: Tokens of the line with its literal arithmetic folded, or the tokens of the line.
+        :return: Source of a function making the function of the line from the helpers it closes over.
+        """
+        stack_effect = StackEffect(tokens)
+        # Conditions on the depth that hold for every stack are left out.
+        conditions = list()
+        if stack_effect.get_required_depth() > 0:
+            conditions.append(f"depth >= {stack_effect.get_required_depth()}")
+        if stack_effect.get_required_headroom() > 0:
+            conditions.append(f"capacity - depth >= {stack_effect.get_required_headroom()}")
+        lines = [
+            "def make_line(bound_output, report_saturation, power, UnderflowError, NegativeExponentError,"
+            " StackEmptyError):",
+            "    def line(stack, write_line, report_error):",
+            "        memory = stack._memory",
+            "        top = stack._top",
+            "        new_stack = stack._new_stack",
+            "        capacity = stack._capacity",
+            "        try:",
+            "            depth = 0 if new_stack else top + 1",
+            f"            if {' and '.join(conditions) if conditions else 'True'}:",
+        ]
+        ClosureCompiler._add_unchecked_body(lines, 16, folded_tokens)
+        lines.append("                return True")
+        lines.append("            else:")
+        ClosureCompiler._add_checked_body(lines, 16, tokens)
+        lines.append("                return False")
+        lines.extend([
+            "        finally:",
+            "            stack._top = top",
+            "            stack._new_stack = new_stack",
+            "    return line",
+        ])
+        return "".join(f"{line}\n" for line in lines)
+
+    @staticmethod
+    def _add_unchecked_body(lines: List[str], indent: int, tokens: Tuple[token.Token, ...]) -> None:
+        """
+        Add the body evaluating tokens that cannot cause a stack error, so every operator has two values to work on
+        and every push has room, and a new stack has always been pushed to before = looks at it.
+        :param lines: Lines of source the body is added to.
+        :param indent: Indentation of the body.
+        :param tokens: Tokens evaluated.
+        """
+        pad = " " * indent
+        # Until a token pushes, the stack may still be new and have its first value replaced rather than pushed on.
+        may_be_new = True
+        index = 0
+        while index < len(tokens):
+            _token = tokens[index]
+            following = tokens[index + 1] if index + 1 < len(tokens) else None
+            if isinstance(_token, operand.Operand):
+                ClosureCompiler._add_saturations(lines, indent, _token)
+            if isinstance(_token, operand.Operand) and isinstance(following, operators.Operator):
+                ClosureCompiler._add_literal_operation(lines, indent, type(following), _token.get_value())
+                index += 2
+                continue
+            if isinstance(_token, operand.Operand):
+                ClosureCompiler._add_unchecked_push(lines, indent, str(_token.get_value()), may_be_new)
+                may_be_new = False
+            elif isinstance(_token, operators.Operator):
+                ClosureCompiler._add_unchecked_operation(lines, indent, type(_token))
+            elif isinstance(_token, command.OutputTopOfStack):
+                lines.append(f"{pad}write_line(str(memory[top]))")
+            elif isinstance(_token, command.OutputStack):
+                lines.extend([f"{pad}for value in memory[:top + 1]:", f"{pad}    write_line(str(value))"])
+            elif isinstance(_token, command.StoreRandomInteger):
+                lines.append(f"{pad}value = stack._random_generator.next_value()")
+                ClosureCompiler._add_unchecked_push(lines, indent, "value", may_be_new)
+                lines.append(f'{pad}write_line("None")')
+                may_be_new = False
+            index += 1
+
+    @staticmethod
+    def _add_saturations(lines: List[str], indent: int, _operand: operand.Operand) -> None:
+        """
+        Add the report of every saturation made in an operand, as the Parser reports them whenever it evaluates it.
+        :param lines: Lines of source the reports are added to.
+        :param indent: Indentation of the reports.
+        :param _operand: Operand evaluated.
+        """
+        pad = " " * indent
+        lines.extend(f"{pad}report_saturation({bound})" for bound in _operand.get_saturations())
+
+    @staticmethod
+    def _add_unchecked_push(lines: List[str], indent: int, value: str, may_be_new: bool) -> None:
+        """
+        :param lines: Lines of source the push is added to.
+        :param indent: Indentation of the push.
+        :param value: Expression of the value pushed.
+        :param may_be_new: Whether the stack may still be new.
+        """
+        pad = " " * indent
+        if may_be_new:
+            lines.extend([f"{pad}if new_stack:", f"{pad}    new_stack = False", f"{pad}else:", f"{pad}    top += 1"])
+        else:
+            lines.append(f"{pad}top += 1")
+        lines.append(f"{pad}memory[top] = {value}")
+
+    @staticmethod
+    def _add_literal_operation(lines: List[str], indent: int, operator_class: Type[operators.Operator],
+                               literal: int) -> None:
+        """
+        Add an operator applied to a literal and the value below it, which is known to exist. Whether the operator
+        fails only depends on the literal, so it is settled here.
+        :param lines: Lines of source the operation is added to.
+        :param indent: Indentation of the operation.
+        :param operator_class: Class of the operator.
+        :param literal: Value of the literal, the right operand.
+        """
+        pad = " " * indent
+        failure = ClosureCompiler._FAILURES.get(operator_class)
+        if failure is not None and ClosureCompiler._COMPARISONS[failure[0]](literal, 0):
+            # The literal is left on the stack along with the value below it, as a failing operator leaves both.
+            lines.extend([f"{pad}report_error({failure[1]})", f"{pad}top += 1", f"{pad}memory[top] = {literal}"])
+            return
+        lines.append(f"{pad}a = memory[top]")
+        ClosureCompiler._add_arithmetic(lines, indent, operator_class, "a", str(literal))
+        lines.append(f"{pad}memory[top] = result")
+
+    @staticmethod
+    def _add_unchecked_operation(lines: List[str], indent: int, operator_class: Type[operators.Operator]) -> None:
+        """
+        :param lines: Lines of source the operation is added to.
+        :param indent: Indentation of the operation.
+        :param operator_class: Class of the operator, whose two values are known to exist.
+        """
+        pad = " " * indent
+        lines.append(f"{pad}b = memory[top]")
+        indent = ClosureCompiler._add_failure_check(lines, indent, operator_class)
+        pad = " " * indent
+        lines.extend([f"{pad}top -= 1", f"{pad}a = memory[top]"])
+        ClosureCompiler._add_arithmetic(lines, indent, operator_class, "a", "b")
+        lines.append(f"{pad}memory[top] = result")
+
+    @staticmethod
+    def _add_checked_body(lines: List[str], indent: int, tokens: Tuple[token.Token, ...]) -> None:
+        """
+        Add the body evaluating tokens against any stack, checking everything the Stack checks.
+        :param lines: Lines of source the body is added to.
+        :param indent: Indentation of the body.
+        :param tokens: Tokens evaluated.
+        """
+        pad = " " * indent
+        # A push always leaves the stack no longer new, even one that overflows, as a new stack has room for a value.
+        may_be_new = True
+        for _token in tokens:
+            if isinstance(_token, operand.Operand):
+                ClosureCompiler._add_saturations(lines, indent, _token)
+                ClosureCompiler._add_checked_push(lines, indent, str(_token.get_value()), may_be_new, None)
+                may_be_new = False
+            elif isinstance(_token, operators.Operator):
+                lines.extend([f"{pad}if top == 0:", f"{pad}    {ClosureCompiler._UNDERFLOW}", f"{pad}else:"])
+                ClosureCompiler._add_unchecked_operation(lines, indent + 4, type(_token))
+            elif isinstance(_token, command.OutputTopOfStack):
+                if may_be_new:
+                    lines.extend([f"{pad}if new_stack:", f"{pad}    {ClosureCompiler._EMPTY}", f"{pad}else:",
+                                  f"{pad}    write_line(str(memory[top]))"])
+                else:
+                    lines.append(f"{pad}write_line(str(memory[top]))")
+            elif isinstance(_token, command.OutputStack):
+                lines.extend([f"{pad}for value in memory[:top + 1]:", f"{pad}    write_line(str(value))"])
+            elif isinstance(_token, command.StoreRandomInteger):
+                lines.append(f"{pad}value = stack._random_generator.next_value()")
+                ClosureCompiler._add_checked_push(lines, indent, "value", may_be_new, 'write_line("None")')
+                may_be_new = False
+
+    @staticmethod
+    def _add_checked_push(lines: List[str], indent: int, value: str, may_be_new: bool, on_success: str) -> None:
+        """
+        :param lines: Lines of source the push is added to.
+        :param indent: Indentation of the push.
+        :param value: Expression of the value pushed.
+        :param may_be_new: Whether the stack may still be new.
+        :param on_success: Statement run once the value is pushed, none if not given.
+        """
+        pad = " " * indent
+        if may_be_new:
+            lines.extend([f"{pad}if new_stack:", f"{pad}    memory[0] = {value}", f"{pad}    new_stack = False"])
+            if on_success is not None:
+                lines.append(f"{pad}    {on_success}")
+            lines.append(f"{pad}elif top + 1 == capacity:")
+        else:
+            lines.append(f"{pad}if top + 1 == capacity:")
+        lines.extend([f"{pad}    {ClosureCompiler._OVERFLOW}", f"{pad}else:", f"{pad}    top += 1",
+                      f"{pad}    memory[top] = {value}"])
+        if on_success is not None:
+            lines.append(f"{pad}    {on_success}")
+
+    @staticmethod
+    def _add_failure_check(lines: List[str], indent: int, operator_class: Type[operators.Operator]) -> int:
+        """
+        Add the check of an operator that can fail on its right operand, held in b.
+        :param lines: Lines of source the check is added to.
+        :param indent: Indentation of the check.
+        :param operator_class: Class of the operator.
+        :return: Indentation of the code run when the operator does not fail.
+        """
+        failure = ClosureCompiler._FAILURES.get(operator_class)
+        if failure is None:
+            return indent
+        pad = " " * indent
+        lines.extend([f"{pad}if b {failure[0]} 0:", f"{pad}    report_error({failure[1]})", f"{pad}else:"])
+        return indent + 4
+
+    @staticmethod
+    def _add_arithmetic(lines: List[str], indent: int, operator_class: Type[operators.Operator], a: str,
+                        b: str) -> None:
+        """
+        Add the arithmetic of an operator that is known not to fail, leaving its saturated result in result.
+        :param lines: Lines of source the arithmetic is added to.
+        :param indent: Indentation of the arithmetic.
+        :param operator_class: Class of the operator.
+        :param a: Expression of the left operand.
+        :param b: Expression of the right operand.
+        """
+        pad = " " * indent
+        if operator_class is operators.Exponentiation:
+            # Exponentiation saturates its own result, without building powers far beyond the bounds.
+            lines.append(f"{pad}result = power({a}, {b})")
+            return
+        if operator_class is operators.Quotient:
+            # Division truncates towards zero, where // would round down.
+            lines.extend([f"{pad}result = abs({a}) // abs({b})", f"{pad}if ({a} < 0) != ({b} < 0):",
+                          f"{pad}    result = -result"])
+        else:
+            lines.append(f"{pad}result = {ClosureCompiler._ARITHMETIC[operator_class].format(a=a, b=b)}")
+        # bound_output is only called for a result out of bounds, so saturations are still reported to it.
+        lines.extend([f"{pad}if result > {GeneralMethods.UPPER_BOUND} or result < {GeneralMethods.LOWER_BOUND}:",
+                      f"{pad}    result = bound_output(result)"])
+
+
+class TieredLine:
+    """
+    A cached line along with the number of times it is left to be evaluated before it is hot. Until then the Parser
+    evaluates its tokens, folded where they can be, and from then on a function the ClosureCompiler made for it.
+    """
+    __slots__ = ("_tokens", "_folded_line", "_evaluations_left", "_function", "_folded_tokens")
+    DEFAULT_HOT_THRESHOLD = 100
+
+    def __init__(self, tokens: Tuple[token.Token, ...], folded_line: FoldedLine = None,
+                 hot_threshold: int = DEFAULT_HOT_THRESHOLD) -> None:
+        """
+        :param tokens: Tokens of a line.
+        :param folded_line: Folded line of the tokens, none to evaluate every token.
+        :param hot_threshold: Number of times the line is evaluated before it is compiled.
+        """
+        self._tokens = tokens
+        self._folded_line = folded_line
+        # None once the line will not be compiled, or has been.
+        self._evaluations_left: Union[int, None] = hot_threshold if ClosureCompiler.can_compile(tokens) else None
+        self._function: Union[CompiledLine, None] = None
+        # Tokens the compiled function evaluates where the line is certain to cause no stack error.
+        self._folded_tokens = tokens
+
+    def evaluate(self, stack: Stack, parser: Parser) -> Tuple[token.Token, ...]:
+        """
+        :param stack: Stack the line is evaluated against.
+        :param parser: Parser evaluating the line until it is compiled, and reporting the errors of the compiled line.
+        :return: Tokens the line was evaluated as.
+        """
+        if self._function is not None:
+            return self._folded_tokens if parser.read_compiled_line(stack, self._function) else self._tokens
+        tokens = self._tokens if self._folded_line is None else self._folded_line.get_tokens(stack)
+        parser.read_tokens(stack, tokens)
+        if self._evaluations_left is not None:
+            self._evaluations_left -= 1
+            if self._evaluations_left <= 0:
+                self._evaluations_left = None
+                if self._folded_line is not None:
+                    self._folded_tokens = self._folded_line.get_folded_tokens()
+                self._function = ClosureCompiler.compile_line(self._tokens, self._folded_tokens)
+        return tokens
+
+    def is_compiled(self) -> bool:
+        """
+        :return: Whether the line has been compiled.
+        """
+        return self._function is not None
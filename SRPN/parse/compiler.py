@@ -0,0 +1,55 @@
+"""
+Compiler turning a tokenized line into a compact array of instructions for the VirtualMachine.
+"""
+from __future__ import annotations
+
+from array import array
+
+from SRPN.parse.opcodes import Opcodes
+from SRPN.tokens import command, operand, operators, token
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Sequence
+
+
+class Compiler:
+    """
+    Compiles tokens into an array of instructions, each one an opcode followed by its immediate value.
+    """
+    INSTRUCTION_TYPECODE = "q"
+    _OPCODES: Dict[type, int] = {
+        operators.Addition: Opcodes.ADD,
+        operators.Subtraction: Opcodes.SUBTRACT,
+        operators.Product: Opcodes.MULTIPLY,
+        operators.Quotient: Opcodes.DIVIDE,
+        operators.Modulo: Opcodes.MODULO,
+        operators.Exponentiation: Opcodes.EXPONENT,
+        command.OutputStack: Opcodes.OUTPUT_STACK,
+        command.OutputTopOfStack: Opcodes.OUTPUT_TOP_OF_STACK,
+        command.StoreRandomInteger: Opcodes.STORE_RANDOM_INTEGER,
+    }
+
+    @staticmethod
+    def compile_tokens(tokens: Sequence[token.Token]) -> array:
+        """
+        Operands become a PUSH of their bounded value, operators and commands an opcode with no immediate value.
+        :param tokens: Tokens of a line.
+        :return: Array of signed 64 bit instructions, two entries per instruction.
+        """
+        get_opcode = Compiler._OPCODES.get
+        # Both PUSH and the missing immediate value are 0, so only the other entries are filled in.
+        instructions = [Opcodes.PUSH] * (2 * len(tokens))
+        index = 0
+
+        for _token in tokens:
+            opcode = get_opcode(type(_token))
+            if opcode is not None:
+                instructions[index] = opcode
+            elif isinstance(_token, operand.Operand):
+                instructions[index + 1] = _token.get_value()
+            else:
+                raise TypeError(f"Token {type(_token).__name__} cannot be compiled.")
+            index += 2
+
+        return array(Compiler.INSTRUCTION_TYPECODE, instructions)
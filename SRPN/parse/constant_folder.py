@@ -0,0 +1,107 @@
+"""
+Constant folding of the literal arithmetic in a tokenized line.
+"""
+from __future__ import annotations
+
+from SRPN.errors.negative_exponent_error import NegativeExponentError
+from SRPN.parse.stack_effect import StackEffect
+from SRPN.stack.stack import Stack
+from SRPN.tokens import operand, operators, token
+from SRPN.tokens.general_methods import GeneralMethods
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Tuple, Union
+
+
+class ConstantFolder:
+    """
+    Replaces runs of operands and the operators applied only to them with the operands of their results.
+    """
+
+    @staticmethod
+    def fold_tokens(tokens: Tuple[token.Token, ...]) -> Tuple[token.Token, ...]:
+        """
+        Every operator whose operands are both literals is performed now, saturating exactly as it would when evaluated.
+        An operator that raises an error is kept, along with the literals before it, so it reports the same error
+        when evaluated. Commands are kept in place, with every literal before them.
+        The folded line only evaluates the same as the line if no push overflows and no operator underflows, see
+        StackEffect.is_safe.
+        :param tokens: Tokens of a line.
+        :return: Tokens of the folded line.
+        """
+        folded_tokens: List[token.Token] = list()
+        # Literals at the top of the stack that are not yet part of the folded line.
+        literals: List[operand.Operand] = list()
+
+        # Integers saturated in folding are not reported now, as the line has not been evaluated yet. The operand of a
+        # result reports them whenever it is evaluated instead, along with those of the literals it replaces.
+        saturations: List[int] = list()
+        listeners = GeneralMethods.SATURATION_LISTENERS.listeners
+        listeners.append(saturations.append)
+        try:
+            for _token in tokens:
+                if isinstance(_token, operand.Operand):
+                    literals.append(_token)
+                    continue
+                if isinstance(_token, operators.Operator) and len(literals) >= 2:
+                    a, b = literals[-2:]
+                    saturations.clear()
+                    try:
+                        value = _token.perform_operation(a.get_value(), b.get_value())
+                        literals[-2:] = [operand.Operand(
+                            str(value), a.get_saturations() + b.get_saturations() + tuple(saturations)
+                        )]
+                        continue
+                    except (ZeroDivisionError, NegativeExponentError):
+                        pass
+                folded_tokens.extend(literals)
+                literals.clear()
+                folded_tokens.append(_token)
+        finally:
+            listeners.pop()
+
+        folded_tokens.extend(literals)
+        return tuple(folded_tokens)
+
+
+class FoldedLine:
+    """
+    A tokenized line along with its folded tokens, choosing which to evaluate against the stack of the moment.
+    """
+    __slots__ = ("_tokens", "_folded_tokens", "_stack_effect")
+
+    def __init__(self, tokens: Tuple[token.Token, ...]) -> None:
+        """
+        :param tokens: Tokens of a line.
+        """
+        folded_tokens = ConstantFolder.fold_tokens(tokens)
+        self._tokens = tokens
+        self._folded_tokens: Union[Tuple[token.Token, ...], None] = None
+        self._stack_effect: Union[StackEffect, None] = None
+        if len(folded_tokens) < len(tokens):
+            self._folded_tokens = folded_tokens
+            self._stack_effect = StackEffect(tokens)
+
+    def get_tokens(self, stack: Stack) -> Tuple[token.Token, ...]:
+        """
+        :param stack: Stack the line is about to be evaluated against.
+        :return: The folded tokens if the line is certain to cause no stack error against the stack, otherwise the
+        tokens of the line.
+        """
+        if self._folded_tokens is not None and self._stack_effect.is_safe(stack):
+            return self._folded_tokens
+        return self._tokens
+
+    def get_folded_tokens(self) -> Tuple[token.Token, ...]:
+        """
+        :return: The folded tokens, only evaluated the same as the line where get_tokens gives them, or the tokens of
+        the line if folding removed none.
+        """
+        return self._tokens if self._folded_tokens is None else self._folded_tokens
+
+    def is_folded(self) -> bool:
+        """
+        :return: Whether folding removed any tokens from the line.
+        """
+        return self._folded_tokens is not None
@@ -0,0 +1,20 @@
+"""
+Constants used as instruction opcodes by the Compiler and VirtualMachine.
+"""
+
+
+class Opcodes:
+    """
+    Class of opcode constants, operators are numbered first so they can be recognised with a single comparison.
+    """
+    PUSH = 0
+    ADD = 1
+    SUBTRACT = 2
+    MULTIPLY = 3
+    DIVIDE = 4
+    MODULO = 5
+    EXPONENT = 6
+    OUTPUT_STACK = 7
+    OUTPUT_TOP_OF_STACK = 8
+    STORE_RANDOM_INTEGER = 9
+    LAST_OPERATOR = EXPONENT
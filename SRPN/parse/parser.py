@@ -1,15 +1,29 @@
-from typing import Tuple
+from __future__ import annotations
 
 from SRPN.errors.negative_exponent_error import NegativeExponentError
 from SRPN.errors.stack_empty_error import StackEmptyError
 from SRPN.errors.underflow_error import UnderflowError
 from SRPN.errors.zero_modulus_error import ZeroModulusError
+from SRPN.output.output_sink import OutputSink, STANDARD_OUTPUT
 from SRPN.stack.stack import Stack
 from SRPN.tokens import operand, token, operators, command
+from SRPN.tokens.general_methods import GeneralMethods
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterable
+
+    from SRPN.parse.closure_compiler import CompiledLine
+    from SRPN.profiling.metrics_registry import MetricsRegistry
 
 
 class Parser:
-    def read_tokens(self, stack: Stack, tokens: Tuple[token.Token, ...]):
+    def __init__(self, output_sink: OutputSink = STANDARD_OUTPUT, metrics: MetricsRegistry = None):
+        self._output_sink = output_sink
+        # Counts the errors reported, none if not given.
+        self._metrics = metrics
+
+    def read_tokens(self, stack: Stack, tokens: Iterable[token.Token]):
         for _token in tokens:
             token_class = type(_token)
             if issubclass(token_class, operand.Operand):
@@ -19,23 +33,40 @@ class Parser:
             elif issubclass(token_class, command.Command):
                 self._read_command_token(_token, stack)
 
+    def read_compiled_line(self, stack: Stack, function: CompiledLine) -> bool:
+        """
+        :param stack: Stack the line is evaluated against.
+        :param function: Function compiled for the line by the ClosureCompiler, writing and reporting errors as the
+        parser does.
+        :return: Whether the function evaluated the folded tokens of the line.
+        """
+        return function(stack, self._output_sink.write_line, self._report_error)
+
     def _read_operand_token(self, _operand: operand.Operand, stack: Stack):
+        for bound in _operand.get_saturations():
+            GeneralMethods.report_saturation(bound)
         try:
             stack.add_int_to_stack(_operand.get_value())
         except OverflowError as e:
-            print(e)
+            self._report_error(e)
 
     def _read_operator_token(self, _operator: operators.Operator, stack: Stack):
+        # The result now on top of the stack is returned, None if the operator failed.
         try:
-            stack.perform_operand(_operator)
+            return stack.perform_operand(_operator)
         except (UnderflowError, ZeroDivisionError, NegativeExponentError,) as e:
-            print(e)
+            self._report_error(e)
         except ZeroModulusError as e:
-            print(e)
+            self._report_error(e)
             exit(136)
 
     def _read_command_token(self, _command: command.Command, stack: Stack):
         try:
-            _command.perform_command(stack)
+            _command.perform_command(stack, self._output_sink)
         except (StackEmptyError, OverflowError) as e:
-            print(e)
+            self._report_error(e)
+
+    def _report_error(self, error: Exception):
+        self._output_sink.write_line(str(error))
+        if self._metrics is not None:
+            self._metrics.record_error(error)
@@ -0,0 +1,117 @@
+"""
+Static analysis of how a tokenized line changes the depth of the stack.
+"""
+from __future__ import annotations
+
+from SRPN.stack.stack import Stack
+from SRPN.tokens import command, operand, operators, token
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterable
+
+
+class StackEffect:
+    """
+    Follows the number of values on the stack through a line without evaluating it, relative to the number at its
+    start. A new stack holds no values here, as its first push replaces the value it shows.
+    Division, modulo and exponentiation leave their operands on the stack when they fail, depending on their values, so
+    the depth is followed both where every such operator succeeds and where every one fails. Any evaluation lies
+    between the two until a stack error occurs, so a line that neither underflows on the first nor overflows on the
+    second cannot cause a stack error at all.
+    """
+    __slots__ = ("_net_effect", "_minimum_depth", "_maximum_depth", "_required_depth", "_required_headroom")
+    _FALLIBLE_OPERATORS = (operators.Quotient, operators.Modulo, operators.Exponentiation)
+
+    def __init__(self, tokens: Iterable[token.Token]) -> None:
+        """
+        :param tokens: Tokens of a line.
+        """
+        fallible_operators = self._FALLIBLE_OPERATORS
+        # Depth where every fallible operator succeeds, and where every one fails.
+        lower_depth = upper_depth = 0
+        minimum_depth = maximum_depth = 0
+        required_depth = required_headroom = 0
+
+        for _token in tokens:
+            if isinstance(_token, (operand.Operand, command.StoreRandomInteger)):
+                required_headroom = max(required_headroom, upper_depth + 1)
+                lower_depth += 1
+                upper_depth += 1
+                maximum_depth = max(maximum_depth, lower_depth)
+            elif isinstance(_token, operators.Operator):
+                required_depth = max(required_depth, 2 - lower_depth)
+                lower_depth -= 1
+                if not isinstance(_token, fallible_operators):
+                    upper_depth -= 1
+                minimum_depth = min(minimum_depth, lower_depth)
+            elif isinstance(_token, command.OutputTopOfStack):
+                required_depth = max(required_depth, 1 - lower_depth)
+
+        self._net_effect = lower_depth
+        self._minimum_depth = minimum_depth
+        self._maximum_depth = maximum_depth
+        self._required_depth = required_depth
+        self._required_headroom = required_headroom
+
+    def get_net_effect(self) -> int:
+        """
+        :return: Change in the number of values over the line, if every operation succeeds.
+        """
+        return self._net_effect
+
+    def get_minimum_depth(self) -> int:
+        """
+        :return: Lowest number of values reached relative to the start of the line, if every operation succeeds.
+        """
+        return self._minimum_depth
+
+    def get_maximum_depth(self) -> int:
+        """
+        :return: Highest number of values reached relative to the start of the line, if every operation succeeds.
+        """
+        return self._maximum_depth
+
+    def get_required_depth(self) -> int:
+        """
+        :return: Number of values the stack must hold for no operator to underflow and no = to find it empty.
+        """
+        return self._required_depth
+
+    def get_required_headroom(self) -> int:
+        """
+        :return: Number of values the stack must have room for so that no push overflows.
+        """
+        return self._required_headroom
+
+    def may_underflow(self, stack: Stack) -> bool:
+        """
+        :param stack: Stack the line would be evaluated against.
+        :return: Whether an operator may underflow or = find the stack empty, unless a push overflows first. Exact for
+        lines without fallible operators.
+        """
+        return self._get_depth(stack) < self._required_depth
+
+    def may_overflow(self, stack: Stack) -> bool:
+        """
+        :param stack: Stack the line would be evaluated against.
+        :return: Whether a push may overflow, unless an operator underflows first. Exact for lines without fallible
+        operators.
+        """
+        return stack.get_capacity() - self._get_depth(stack) < self._required_headroom
+
+    def is_safe(self, stack: Stack) -> bool:
+        """
+        :param stack: Stack the line would be evaluated against.
+        :return: Whether the line is certain to cause no stack overflow, stack underflow or empty stack error.
+        """
+        depth = self._get_depth(stack)
+        return depth >= self._required_depth and stack.get_capacity() - depth >= self._required_headroom
+
+    @staticmethod
+    def _get_depth(stack: Stack) -> int:
+        """
+        :param stack: Stack of a session.
+        :return: Number of values the stack holds, none for a new stack.
+        """
+        return 0 if stack.is_new_stack() else len(stack)
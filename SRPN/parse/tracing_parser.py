@@ -0,0 +1,176 @@
+"""
+Parser keeping a trace of what it evaluates, to find out afterwards what a session actually did.
+"""
+from __future__ import annotations
+
+import json
+
+from SRPN.output.output_sink import OutputSink, STANDARD_OUTPUT
+from SRPN.parse.parser import Parser
+from SRPN.stack.stack import Stack
+from SRPN.tokens import command, operand, operators, token
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, Iterator, List, TextIO, Union
+
+    from SRPN.profiling.metrics_registry import MetricsRegistry
+
+
+class TracingParser(Parser):
+    """
+    Records every line evaluated and every token of it, along with the value on top of the stack after the token and
+    any error it reported. Entries are written in place into lists allocated once at full capacity, wrapping around so
+    only the most recent are kept. Recording is part of the evaluation loop itself rather than wrapping methods as the
+    Profiler does, so it costs a few stores per token and allocates nothing.
+    The trace is written as JSON lines on demand, and after every token reporting an error if given an error file. The
+    error file only gets the entries it has not been given before, so a session with an error on every line does not
+    write out its whole trace every time.
+    Tokens are traced as they are evaluated, so a line whose literal arithmetic was folded shows its folded tokens.
+    A line is recorded along with its tokens when given to read_tokens, streamed input only records tokens.
+    """
+    DEFAULT_CAPACITY = 4096
+    _SYMBOLS = {
+        operators.Addition: "+", operators.Subtraction: "-", operators.Product: "*", operators.Quotient: "/",
+        operators.Modulo: "%", operators.Exponentiation: "^",
+        command.OutputStack: "d", command.OutputTopOfStack: "=", command.StoreRandomInteger: "r",
+    }
+
+    def __init__(self, output_sink: OutputSink = STANDARD_OUTPUT, capacity: int = DEFAULT_CAPACITY,
+                 error_file: TextIO = None, metrics: MetricsRegistry = None):
+        """
+        :param output_sink: Sink the parser writes to.
+        :param capacity: Number of entries kept.
+        :param error_file: Text stream the trace is written to after every error, none if not given.
+        :param metrics: Registry counting the errors reported, none if not given.
+        :raises ValueError: If the capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError(f"A trace must keep at least 1 entry, not {capacity}.")
+        super().__init__(output_sink, metrics)
+        self._capacity = capacity
+        # Line or token of every entry, and the value on top of the stack after every token that needs it kept.
+        self._entries: List[Union[str, token.Token, None]] = [None] * capacity
+        self._tops: List[Union[int, None]] = [None] * capacity
+        # Number of entries ever recorded, an entry is kept at its sequence number modulo the capacity.
+        self._sequence = 0
+        # Errors reported by the token being evaluated, which are recorded once it has been.
+        self._pending_errors: List[str] = list()
+        self._errors: Dict[int, str] = dict()
+        self._error_file = error_file
+        self._error_file_sequence = 0
+
+    def read_tokens(self, stack: Stack, tokens: Iterable[token.Token], line: str = None):
+        """
+        :param stack: Stack the tokens are evaluated on.
+        :param tokens: Tokens evaluated.
+        :param line: Line the tokens were read from, recorded before them if given.
+        """
+        entries, tops, capacity, pending_errors = self._entries, self._tops, self._capacity, self._pending_errors
+        # The position in the lists is followed rather than worked out for every entry, along with the sequence number
+        # of the entry at its start, so the sequence number of an entry is their sum.
+        index = self._sequence % capacity
+        lap_sequence = self._sequence - index
+        if line is not None:
+            entries[index] = line
+            index += 1
+            if index == capacity:
+                index = 0
+                lap_sequence += capacity
+        # Bound even if the tokens fail before their first, for the finally block.
+        _token = None
+        try:
+            for _token in tokens:
+                token_class = type(_token)
+                # An operand is the value on top of the stack after it and an operator returns it, unless they fail,
+                # which is an error and has the value recorded with it. Only commands look the value up.
+                if issubclass(token_class, operand.Operand):
+                    self._read_operand_token(_token, stack)
+                    entries[index] = _token
+                elif issubclass(token_class, operators.Operator):
+                    tops[index] = self._read_operator_token(_token, stack)
+                    entries[index] = _token
+                else:
+                    if issubclass(token_class, command.Command):
+                        self._read_command_token(_token, stack)
+                    entries[index] = _token
+                    tops[index] = stack.get_top()
+                index += 1
+                if index == capacity:
+                    index = 0
+                    lap_sequence += capacity
+                if pending_errors:
+                    self._sequence = lap_sequence + index
+                    self._record_errors(self._sequence - 1, stack.get_top())
+        finally:
+            self._sequence = lap_sequence + index
+            if pending_errors:
+                # A zero modulus ends the session while its token is still being evaluated.
+                entries[index] = _token
+                self._sequence += 1
+                self._record_errors(self._sequence - 1, stack.get_top())
+
+    def get_capacity(self) -> int:
+        """
+        :return: Number of entries kept.
+        """
+        return self._capacity
+
+    def iter_entries(self, start: int = 0) -> Iterator[Dict[str, object]]:
+        """
+        :param start: Sequence number of the first entry wanted, earlier entries that are still kept are skipped.
+        :return: Iterator of the entries kept from oldest to newest. A line is given by its sequence number and text,
+        a token by its sequence number, symbol, or value for an operand, the value on top of the stack after it and the
+        message of the error it reported if any.
+        """
+        for sequence in range(max(start, self._sequence - self._capacity, 0), self._sequence):
+            index = sequence % self._capacity
+            entry = self._entries[index]
+            if isinstance(entry, str):
+                yield {"sequence": sequence, "line": entry}
+                continue
+            record = {"sequence": sequence, "token": self._get_symbol(entry), "top": self._tops[index]}
+            if sequence in self._errors:
+                record["error"] = self._errors[sequence]
+            elif isinstance(entry, operand.Operand):
+                record["top"] = entry.get_value()
+            yield record
+
+    def dump(self, file: TextIO, start: int = 0) -> None:
+        """
+        Write the entries kept as JSON lines.
+        :param file: Text stream the entries are written to.
+        :param start: Sequence number of the first entry written.
+        """
+        file.writelines(f"{json.dumps(record)}\n" for record in self.iter_entries(start))
+        file.flush()
+
+    def _report_error(self, error: Exception):
+        super()._report_error(error)
+        self._pending_errors.append(str(error))
+
+    def _record_errors(self, sequence: int, top: int) -> None:
+        """
+        Attach the errors reported to the entry of the token that reported them, and write the trace to the error file.
+        :param sequence: Sequence number of the entry of the token.
+        :param top: Value on top of the stack after the token.
+        """
+        self._tops[sequence % self._capacity] = top
+        # Every token reports at most one error.
+        self._errors[sequence] = self._pending_errors.pop()
+        # Errors of entries that have been overwritten are dropped once they could make up half of those held.
+        if len(self._errors) > 2 * self._capacity:
+            oldest_sequence = self._sequence - self._capacity
+            self._errors = {key: message for key, message in self._errors.items() if key >= oldest_sequence}
+        if self._error_file is not None:
+            self.dump(self._error_file, self._error_file_sequence)
+            self._error_file_sequence = self._sequence
+
+    def _get_symbol(self, _token: token.Token) -> str:
+        """
+        :param _token: Token evaluated.
+        :return: The value of an operand, or the symbol of an operator or command.
+        """
+        if isinstance(_token, operand.Operand):
+            return str(_token.get_value())
+        return self._SYMBOLS.get(type(_token), type(_token).__name__)
@@ -0,0 +1,134 @@
+"""
+Interpreter running compiled instructions against a Stack.
+"""
+from __future__ import annotations
+
+from SRPN.errors.negative_exponent_error import NegativeExponentError
+from SRPN.errors.stack_empty_error import StackEmptyError
+from SRPN.errors.underflow_error import UnderflowError
+from SRPN.output.output_sink import OutputSink, STANDARD_OUTPUT
+from SRPN.parse.opcodes import Opcodes
+from SRPN.stack.stack import Stack
+from SRPN.tokens import operators
+from SRPN.tokens.general_methods import GeneralMethods
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from array import array
+
+    from SRPN.profiling.metrics_registry import MetricsRegistry
+
+
+class VirtualMachine:
+    """
+    Runs the instructions made by the Compiler, reporting errors exactly as the Parser does for the same tokens.
+    The arithmetic, saturation and error checks of the operators, Stack and commands are written out in the loop, which
+    works on the slots of the Stack held in local variables, so no method is called for an instruction that succeeds.
+    A failing instruction raises the error the Stack or operator would, which is reported before the loop resumes at
+    the next instruction, leaving the stack as it was before the instruction.
+    """
+    # Exponentiation saturates its own result, without building powers far beyond the bounds.
+    _POWER = operators.Exponentiation().perform_operation
+
+    def __init__(self, output_sink: OutputSink = STANDARD_OUTPUT, metrics: MetricsRegistry = None) -> None:
+        """
+        :param output_sink: Sink that command output and error messages are written to.
+        :param metrics: Registry counting the errors reported, none if not given.
+        """
+        self._output_sink = output_sink
+        self._metrics = metrics
+
+    def run(self, stack: Stack, instructions: array) -> None:
+        """
+        Execute every instruction in order against the stack.
+        :param stack: Stack the instructions operate on.
+        :param instructions: Instructions made by Compiler.compile_tokens.
+        """
+        write_line = self._output_sink.write_line
+        power = self._POWER
+        bound_output = GeneralMethods.bound_output
+        upper_bound, lower_bound = GeneralMethods.UPPER_BOUND, GeneralMethods.LOWER_BOUND
+        push, last_operator = Opcodes.PUSH, Opcodes.LAST_OPERATOR
+        add, subtract, multiply, divide, modulo = (
+            Opcodes.ADD, Opcodes.SUBTRACT, Opcodes.MULTIPLY, Opcodes.DIVIDE, Opcodes.MODULO
+        )
+        output_top_of_stack, output_stack = Opcodes.OUTPUT_TOP_OF_STACK, Opcodes.OUTPUT_STACK
+        memory, capacity = stack._memory, stack._capacity
+        top, new_stack = stack._top, stack._new_stack
+        # Zipping one iterator with itself pairs every opcode with the immediate value that follows it, and after an
+        # error the same pairs carry on from the instruction after the failing one.
+        instruction_iterator = iter(instructions)
+        pairs = zip(instruction_iterator, instruction_iterator)
+        finished = False
+
+        try:
+            while not finished:
+                try:
+                    for opcode, immediate in pairs:
+                        if opcode == push:
+                            if new_stack:
+                                memory[0] = immediate
+                                new_stack = False
+                            elif top + 1 == capacity:
+                                raise OverflowError("Stack overflow.")
+                            else:
+                                top += 1
+                                memory[top] = immediate
+                        elif opcode <= last_operator:
+                            if top == 0:
+                                raise UnderflowError("Stack underflow.")
+                            b = memory[top]
+                            a = memory[top - 1]
+                            if opcode == add:
+                                result = a + b
+                            elif opcode == subtract:
+                                result = a - b
+                            elif opcode == multiply:
+                                result = a * b
+                            elif opcode == divide:
+                                if b == 0:
+                                    raise ZeroDivisionError("Divide by 0.")
+                                # Division truncates towards zero, where // would round down.
+                                result = abs(a) // abs(b)
+                                if (a < 0) != (b < 0):
+                                    result = -result
+                            elif opcode == modulo:
+                                if b == 0:
+                                    raise ZeroDivisionError("Divide by 0.")
+                                result = a % b
+                            else:
+                                result = power(a, b)
+                            # bound_output is only called for a result out of bounds, so saturations are still reported
+                            # to it.
+                            if result > upper_bound or result < lower_bound:
+                                result = bound_output(result)
+                            top -= 1
+                            memory[top] = result
+                        elif opcode == output_top_of_stack:
+                            if new_stack:
+                                raise StackEmptyError("Stack Empty")
+                            write_line(str(memory[top]))
+                        elif opcode == output_stack:
+                            for value in memory[:top + 1]:
+                                write_line(str(value))
+                        else:
+                            # The value is drawn even when the push then overflows, as Stack.add_random_int_to_stack
+                            # draws it.
+                            value = stack._random_generator.next_value()
+                            if new_stack:
+                                memory[0] = value
+                                new_stack = False
+                            elif top + 1 == capacity:
+                                raise OverflowError("Stack overflow.")
+                            else:
+                                top += 1
+                                memory[top] = value
+                            write_line("None")
+                    finished = True
+                except (UnderflowError, OverflowError, ZeroDivisionError, NegativeExponentError, StackEmptyError) as e:
+                    write_line(str(e))
+                    if self._metrics is not None:
+                        self._metrics.record_error(e)
+        finally:
+            stack._top = top
+            stack._new_stack = new_stack
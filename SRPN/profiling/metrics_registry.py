@@ -0,0 +1,273 @@
+"""
+Operational metrics of calculator sessions, exported in the Prometheus text format.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import os
+import threading
+import time
+from collections import Counter
+
+from SRPN.tokens.general_methods import GeneralMethods
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List, Tuple
+
+    from SRPN.tokens import token
+
+
+class _MetricsShard:
+    """
+    Counts recorded by a single thread, which is the only one to change them.
+    """
+    __slots__ = ("lines", "tokens", "line_seconds", "line_seconds_buckets", "line_tokens_buckets", "evaluations",
+                 "errors", "saturations", "line_counts", "line_counts_tokens")
+
+    def __init__(self) -> None:
+        self.lines = 0
+        self.tokens = 0
+        self.line_seconds = 0.0
+        self.line_seconds_buckets: List[int] = [0] * (MetricsRegistry.LINE_SECONDS_BUCKETS + 1)
+        self.line_tokens_buckets: List[int] = [0] * (MetricsRegistry.LINE_TOKENS_BUCKETS + 1)
+        # Keyed by class rather than name, which is only looked up once the counts are read.
+        self.evaluations: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.saturations: Counter = Counter()
+        # Times every tuple of tokens was evaluated that is not yet part of the counts above. The line cache gives back
+        # the same tuple for a line every time, so counting a line is a single dictionary update however long it is.
+        self.line_counts: Dict[Tuple[token.Token, ...], int] = dict()
+        self.line_counts_tokens = 0
+
+    def add_line_counts(self, line_counts: Dict[Tuple[token.Token, ...], int]) -> None:
+        """
+        :param line_counts: Times tuples of tokens were evaluated, added to the lines, tokens and evaluations.
+        """
+        line_tokens_limit = MetricsRegistry.LINE_TOKENS_BUCKETS
+        # Most tuples are only evaluated once, and their tokens are all counted together by Counter in C.
+        single_lines = list()
+        for tokens, count in line_counts.items():
+            self.lines += count
+            self.tokens += len(tokens) * count
+            self.line_tokens_buckets[min(len(tokens).bit_length(), line_tokens_limit)] += count
+            if count == 1:
+                single_lines.append(tokens)
+                continue
+            for _token in tokens:
+                self.evaluations[type(_token)] += count
+        self.evaluations.update(map(type, itertools.chain.from_iterable(single_lines)))
+
+
+class MetricsRegistry:
+    """
+    Counts the lines, tokens, errors and saturations of every session given it, and keeps histograms of the time taken
+    to evaluate a line and of the number of tokens in one.
+    Every thread records into a shard of its own, so recording takes no lock and threads never contend, and reading the
+    metrics adds the shards up. Histogram buckets double in size and hold values up to their bound included, as
+    Prometheus buckets do: bucket k holds lines taking more than 2**(k - 1) and at most 2**k microseconds, and lines of
+    2**(k - 1) to 2**k - 1 tokens, found from a bit length rather than a logarithm. The sum of the tokens histogram is
+    the number of tokens evaluated, its observations being the tokens of every line.
+    In multi-worker mode every worker process fills a registry of its own, whose state is merged into one in the parent.
+    Lines are recorded when evaluated through Session.process_command, streamed input and scripts only record errors
+    and saturations. A line whose literal arithmetic was folded is counted as the tokens it was folded to. Saturations
+    are counted every time a line is evaluated, those of its literals and of the arithmetic folded in advance included,
+    however often the line cache gives the line back. A session reports them to its own registry alone.
+    """
+    # Buckets of the time taken by a line are powers of two microseconds, the last ending above 16 seconds.
+    LINE_SECONDS_BUCKETS = 25
+    # Buckets of the tokens in a line are one less than powers of two, the last ending at 65535.
+    LINE_TOKENS_BUCKETS = 17
+    # Tokens in the distinct tuples a thread counts before adding them to its totals, bounding the tokens kept alive.
+    _LINE_COUNTS_TOKENS_LIMIT = 1 << 16
+    _PREFIX = "srpn"
+    # Exported even before they are first reported, so their rates start from 0.
+    _ERROR_TYPES = ("NegativeExponentError", "OverflowError", "StackEmptyError", "UnderflowError", "ZeroDivisionError",
+                    "ZeroModulusError")
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: List[_MetricsShard] = list()
+        self._shards_lock = threading.Lock()
+        self._start_time = time.time()
+        self._start_counter = time.perf_counter()
+
+    def record_line(self, seconds: float, tokens: Tuple[token.Token, ...]) -> None:
+        """
+        :param seconds: Time taken to evaluate the line.
+        :param tokens: Tokens the line was evaluated as.
+        """
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._get_shard()
+        shard.line_seconds += seconds
+        bucket = (math.ceil(seconds * 1_000_000) - 1).bit_length() if seconds > 0 else 0
+        shard.line_seconds_buckets[bucket if bucket < self.LINE_SECONDS_BUCKETS else self.LINE_SECONDS_BUCKETS] += 1
+        line_counts = shard.line_counts
+        count = line_counts.get(tokens)
+        if count is not None:
+            line_counts[tokens] = count + 1
+            return
+        line_counts[tokens] = 1
+        shard.line_counts_tokens += len(tokens)
+        if shard.line_counts_tokens > self._LINE_COUNTS_TOKENS_LIMIT:
+            shard.line_counts, shard.line_counts_tokens = dict(), 0
+            shard.add_line_counts(line_counts)
+
+    def record_error(self, error: Exception) -> None:
+        """
+        :param error: Error reported by a token.
+        """
+        self._get_shard().errors[type(error)] += 1
+
+    def record_saturation(self, bound: int) -> None:
+        """
+        :param bound: Bound an integer was saturated to.
+        """
+        self._get_shard().saturations["upper" if bound == GeneralMethods.UPPER_BOUND else "lower"] += 1
+
+    def get_state(self) -> Dict[str, object]:
+        """
+        The shards are read while their threads keep recording into them, so the state may be torn: a line being
+        recorded may be missing, or be counted in some metrics and not yet in others. The next state includes it.
+        :return: Every count recorded, as built-in types that can be sent to another process and merged there.
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+        # Every dictionary and list of a shard is copied in one step before it is read, as iterating over one while its
+        # thread records into it could fail. The lines a shard has not added to its totals yet are added to a shard of
+        # their own, as only its thread changes it.
+        pending = _MetricsShard()
+        for shard in shards:
+            pending.add_line_counts(dict(shard.line_counts))
+        shards.append(pending)
+        state = {
+            "lines": 0, "tokens": 0, "line_seconds": 0.0,
+            "line_seconds_buckets": [0] * (self.LINE_SECONDS_BUCKETS + 1),
+            "line_tokens_buckets": [0] * (self.LINE_TOKENS_BUCKETS + 1),
+            "evaluations": Counter(), "errors": Counter(), "saturations": Counter(),
+        }
+        for shard in shards:
+            state["lines"] += shard.lines
+            state["tokens"] += shard.tokens
+            state["line_seconds"] += shard.line_seconds
+            for key in ("line_seconds_buckets", "line_tokens_buckets"):
+                state[key] = [total + count for total, count in zip(state[key], list(getattr(shard, key)))]
+            for key in ("evaluations", "errors"):
+                state[key].update({self._get_name(name): count for name, count in dict(getattr(shard, key)).items()})
+            state["saturations"].update(dict(shard.saturations))
+        for key in ("evaluations", "errors", "saturations"):
+            state[key] = dict(state[key])
+        return state
+
+    def merge_state(self, state: Dict[str, object]) -> None:
+        """
+        Add the counts of another registry, such as that of a worker process, to the current thread's.
+        :param state: State from get_state.
+        """
+        shard = self._get_shard()
+        shard.lines += state["lines"]
+        shard.tokens += state["tokens"]
+        shard.line_seconds += state["line_seconds"]
+        shard.line_seconds_buckets = [
+            total + count for total, count in zip(shard.line_seconds_buckets, state["line_seconds_buckets"])
+        ]
+        shard.line_tokens_buckets = [
+            total + count for total, count in zip(shard.line_tokens_buckets, state["line_tokens_buckets"])
+        ]
+        shard.evaluations.update(state["evaluations"])
+        shard.errors.update(state["errors"])
+        shard.saturations.update(state["saturations"])
+
+    def format_prometheus(self) -> str:
+        """
+        :return: The metrics in the Prometheus text exposition format.
+        """
+        state = self.get_state()
+        elapsed = time.perf_counter() - self._start_counter
+        lines = list()
+        self._add_metric(lines, "lines_total", "counter", "Lines evaluated.", [("", state["lines"])])
+        self._add_metric(lines, "tokens_total", "counter", "Tokens evaluated.", [("", state["tokens"])])
+        self._add_metric(lines, "lines_per_second", "gauge", "Lines evaluated per second since the registry was made.",
+                         [("", state["lines"] / elapsed if elapsed else 0.0)])
+        self._add_metric(lines, "evaluations_total", "counter", "Tokens evaluated, by class.",
+                         [(f'{{token="{name}"}}', count) for name, count in sorted(state["evaluations"].items())])
+        errors = dict.fromkeys(self._ERROR_TYPES, 0)
+        errors.update(state["errors"])
+        self._add_metric(lines, "errors_total", "counter", "Errors reported, by type.",
+                         [(f'{{type="{name}"}}', count) for name, count in sorted(errors.items())])
+        self._add_metric(lines, "saturations_total", "counter", "Integers saturated to a bound, by bound.",
+                         [(f'{{bound="{bound}"}}', state["saturations"].get(bound, 0)) for bound in ("upper", "lower")])
+        self._add_histogram(lines, "line_seconds", "Time taken to evaluate a line.",
+                            [2 ** bucket / 1_000_000 for bucket in range(self.LINE_SECONDS_BUCKETS)],
+                            state["line_seconds_buckets"], state["line_seconds"])
+        self._add_histogram(lines, "line_tokens", "Tokens in a line evaluated.",
+                            [2 ** bucket - 1 for bucket in range(self.LINE_TOKENS_BUCKETS)],
+                            state["line_tokens_buckets"], state["tokens"])
+        self._add_metric(lines, "start_time_seconds", "gauge", "Unix time the registry was made.",
+                         [("", self._start_time)])
+        return "".join(f"{line}\n" for line in lines)
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Write the metrics to a file, replacing it in one step so a collector reading it never sees half of them.
+        :param path: Path of the file, for example in the text file directory of the node exporter.
+        """
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.format_prometheus())
+        os.replace(temporary_path, path)
+
+    def _get_shard(self) -> _MetricsShard:
+        """
+        :return: Shard of the current thread, made the first time the thread records.
+        """
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _MetricsShard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    @staticmethod
+    def _get_name(key) -> str:
+        """
+        :param key: Class counted, or the name it was merged under.
+        :return: Name it is exported under.
+        """
+        return key if isinstance(key, str) else key.__name__
+
+    @staticmethod
+    def _add_metric(lines: List[str], name: str, metric_type: str, description: str, samples: List[tuple]) -> None:
+        """
+        :param lines: Lines of the exposition the metric is added to.
+        :param name: Name of the metric without the prefix.
+        :param metric_type: Prometheus type of the metric.
+        :param description: Help text of the metric.
+        :param samples: Suffix and labels of every sample, written straight after the name, and its value.
+        """
+        lines.append(f"# HELP {MetricsRegistry._PREFIX}_{name} {description}")
+        lines.append(f"# TYPE {MetricsRegistry._PREFIX}_{name} {metric_type}")
+        lines.extend(f"{MetricsRegistry._PREFIX}_{name}{labels} {value}" for labels, value in samples)
+
+    @staticmethod
+    def _add_histogram(lines: List[str], name: str, description: str, bounds: List[float], buckets: List[int],
+                       total: float) -> None:
+        """
+        :param lines: Lines of the exposition the histogram is added to.
+        :param name: Name of the histogram without the prefix.
+        :param description: Help text of the histogram.
+        :param bounds: Upper bound of every bucket but the last, which has none.
+        :param buckets: Number of values in every bucket, not cumulative.
+        :param total: Sum of the values.
+        """
+        samples, cumulative = list(), 0
+        for bound, count in zip(bounds, buckets):
+            cumulative += count
+            samples.append((f'_bucket{{le="{bound}"}}', cumulative))
+        cumulative += buckets[-1]
+        samples.extend([('_bucket{le="+Inf"}', cumulative), ("_sum", total), ("_count", cumulative)])
+        MetricsRegistry._add_metric(lines, name, "histogram", description, samples)
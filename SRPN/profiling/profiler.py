@@ -0,0 +1,167 @@
+"""
+Opt-in instrumentation of where the time of a session goes.
+"""
+import functools
+import time
+from collections import Counter
+from typing import Callable, Dict, TextIO
+
+from SRPN.cache.line_cache import LineCache
+from SRPN.lexer.lexer import Lexer
+from SRPN.parse.parser import Parser
+from SRPN.tokens.tokenizer import Tokenizer
+
+
+class Profiler:
+    """
+    Records the wall time of every stage a line goes through, the number of lines, substrings and tokens read, and how
+    often each operator and command is evaluated.
+    Instrumentation replaces methods on the instances of a single session with timed wrappers, so the classes are left
+    untouched and a session without a profiler runs exactly the same code it always has. Stage times are exclusive, a
+    stage called from another stage is subtracted from it, so they add up to the total.
+    A profiler keeps no per-thread state, so it should only be given to sessions running on the same thread.
+    In stream mode every stage runs lazily as the Parser pulls tokens, so all of the time is recorded as evaluate.
+    A line compiled by a tiered session is timed as evaluate, but its operators and commands are not counted.
+    """
+    STAGES = ("line_cache", "decompose", "comments", "minus_merging", "tokenize", "evaluate")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clear everything recorded so far, instrumented sessions keep recording.
+        """
+        self._seconds: Dict[str, float] = dict.fromkeys(self.STAGES, 0.0)
+        self._stage_calls: Dict[str, int] = dict.fromkeys(self.STAGES, 0)
+        # Lines missing from the line cache are the only ones lexed, so the difference between the two is its hits.
+        self._counts: Dict[str, int] = {"lines": 0, "lexed_lines": 0, "substrings": 0, "tokens": 0}
+        self._evaluations: Counter = Counter()
+        # Time taken by the stages called from the stage currently running, which is excluded from its own time.
+        self._child_seconds = 0.0
+
+    def instrument(self, lexer: Lexer, tokenizer: Tokenizer, parser: Parser, line_cache: LineCache) -> None:
+        """
+        Start recording the stages of a session.
+        :param lexer: Lexer of the session.
+        :param tokenizer: Tokenizer of the session.
+        :param parser: Parser of the session.
+        :param line_cache: Line cache of the session.
+        """
+        self._time_method(line_cache, "read_line", "line_cache")
+        self._time_method(lexer, "_decompose_command", "decompose")
+        self._time_method(lexer, "_decompose_uncommented_command", "decompose")
+        self._time_method(lexer, "_find_uncommented_regions", "comments")
+        self._time_method(lexer, "_verify_hashtag_commands", "comments")
+        self._time_method(lexer, "_verify_minus_operands", "minus_merging")
+        self._time_method(tokenizer, "read_substrings", "tokenize")
+        self._time_method(parser, "read_tokens", "evaluate")
+        self._time_method(parser, "read_compiled_line", "evaluate")
+
+        self._count_method(line_cache, "read_line", lambda arguments, result: self._count("lines", 1))
+        self._count_method(lexer, "read_user_input", self._count_lexed_line)
+        self._count_method(tokenizer, "read_substrings", lambda arguments, result: self._count("tokens", len(result)))
+        self._count_method(parser, "_read_operator_token", self._count_evaluation)
+        self._count_method(parser, "_read_command_token", self._count_evaluation)
+
+    def get_summary(self) -> Dict[str, object]:
+        """
+        :return: Seconds and calls of every stage, counts of lines, lexed lines, substrings and tokens, and evaluations
+        of every operator and command by class name.
+        """
+        return {
+            "seconds": dict(self._seconds),
+            "calls": dict(self._stage_calls),
+            "counts": dict(self._counts),
+            "evaluations": dict(self._evaluations),
+        }
+
+    def format_summary(self) -> str:
+        """
+        :return: The summary as a human readable table.
+        """
+        total_seconds = sum(self._seconds.values())
+        lines = [f"{'stage':<14} {'calls':>9} {'seconds':>10} {'share':>7}"]
+        for stage in self.STAGES:
+            share = self._seconds[stage] / total_seconds if total_seconds else 0.0
+            lines.append(f"{stage:<14} {self._stage_calls[stage]:>9} {self._seconds[stage]:>10.6f} {share:>7.1%}")
+        lines.append(f"{'total':<14} {'':>9} {total_seconds:>10.6f}")
+        lines.append(", ".join(f"{name} {count}" for name, count in self._counts.items()))
+        lines.append("evaluations: " + (", ".join(
+            f"{name} {count}" for name, count in self._evaluations.most_common()
+        ) or "none"))
+        cache_hits = self._counts["lines"] - self._counts["lexed_lines"]
+        lines.append(f"line cache: {cache_hits} hits, {self._counts['lexed_lines']} misses")
+        return "\n".join(lines)
+
+    def dump(self, file: TextIO) -> None:
+        """
+        Write the summary, for example at exit or whenever it is wanted.
+        :param file: Text stream the summary is written to.
+        """
+        file.write(self.format_summary() + "\n")
+        file.flush()
+
+    def _time_method(self, owner: object, name: str, stage: str) -> None:
+        """
+        Replace a method of an instance with one recording its exclusive time under a stage.
+        :param owner: Instance the method is replaced on.
+        :param name: Name of the method.
+        :param stage: Stage the time is recorded under.
+        """
+        method = getattr(owner, name)
+
+        @functools.wraps(method)
+        def timed_method(*arguments):
+            parent_child_seconds = self._child_seconds
+            self._child_seconds = 0.0
+            start = time.perf_counter()
+            try:
+                return method(*arguments)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._seconds[stage] += elapsed - self._child_seconds
+                self._stage_calls[stage] += 1
+                self._child_seconds = parent_child_seconds + elapsed
+
+        setattr(owner, name, timed_method)
+
+    @staticmethod
+    def _count_method(owner: object, name: str, count: Callable[[tuple, object], None]) -> None:
+        """
+        Replace a method of an instance with one passing its arguments and result to a counting function.
+        :param owner: Instance the method is replaced on.
+        :param name: Name of the method.
+        :param count: Function given the arguments and result of every call.
+        """
+        method = getattr(owner, name)
+
+        @functools.wraps(method)
+        def counted_method(*arguments):
+            result = method(*arguments)
+            count(arguments, result)
+            return result
+
+        setattr(owner, name, counted_method)
+
+    def _count(self, name: str, amount: int) -> None:
+        """
+        :param name: Name of the count.
+        :param amount: Amount added to the count.
+        """
+        self._counts[name] += amount
+
+    def _count_lexed_line(self, arguments: tuple, result: tuple) -> None:
+        """
+        :param arguments: Line read by the Lexer.
+        :param result: Substrings of the line.
+        """
+        self._counts["lexed_lines"] += 1
+        self._counts["substrings"] += len(result)
+
+    def _count_evaluation(self, arguments: tuple, result: object) -> None:
+        """
+        :param arguments: Token evaluated by the Parser and the stack it was evaluated on.
+        :param result: Unused.
+        """
+        self._evaluations[type(arguments[0]).__name__] += 1
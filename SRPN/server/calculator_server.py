@@ -0,0 +1,171 @@
+"""
+Asyncio server hosting a calculator session for every connection.
+"""
+import asyncio
+from typing import Tuple, Union
+
+from SRPN.output.output_sink import ListOutputSink
+from SRPN.profiling.metrics_registry import MetricsRegistry
+from SRPN.profiling.profiler import Profiler
+from SRPN.server.server_defaults import ServerDefaults
+from SRPN.session.session import Session
+from SRPN.stack.stack import Stack
+
+
+class CalculatorServer:
+    """
+    Serves calculator sessions over TCP or a Unix socket. Every connection gets its own Session and is read one line at
+    a time, so a line is evaluated as soon as it arrives. The output of a line is written back before the next line is
+    read, and waiting for the write buffer to drain stops a client that never reads from growing it without bound.
+    A session ends, and its connection is closed, wherever srpn.py would exit.
+    Given a metrics registry, every session is counted in it and the metrics can be scraped by Prometheus over HTTP.
+    """
+    DEFAULT_PORT = ServerDefaults.PORT
+    DEFAULT_CACHE_SIZE = ServerDefaults.CACHE_SIZE
+    DEFAULT_MAX_LINE_LENGTH = ServerDefaults.MAX_LINE_LENGTH
+
+    def __init__(self, advanced: bool = False, stack_capacity: int = Stack.DEFAULT_CAPACITY,
+                 cache_size: int = DEFAULT_CACHE_SIZE, max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+                 profiler: Profiler = None, metrics: MetricsRegistry = None) -> None:
+        """
+        :param advanced: Report unrecognised operators and operands instead of reading them as 0.
+        :param stack_capacity: Number of values the stack of every session holds before overflowing.
+        :param cache_size: Number of tokenized lines every session keeps for reuse, 0 disables caching.
+        :param max_line_length: Longest line read from a client, in bytes, a longer line ends its session.
+        :param profiler: Profiler recording the stages of every session, sessions all run on the event loop's thread.
+        :param metrics: Registry every session is counted in, nothing is counted if not given.
+        """
+        self._advanced = advanced
+        self._stack_capacity = stack_capacity
+        self._cache_size = cache_size
+        self._max_line_length = max_line_length
+        self._profiler = profiler
+        self._metrics = metrics
+        self._connection_count = 0
+        self._server: Union[asyncio.AbstractServer, None] = None
+
+    def get_connection_count(self) -> int:
+        """
+        :return: Number of connections currently open.
+        """
+        return self._connection_count
+
+    def get_server(self) -> Union[asyncio.AbstractServer, None]:
+        """
+        :return: The listening server once started, for example to find the port it was bound to.
+        """
+        return self._server
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """
+        :param host: Address to listen on.
+        :param port: Port to listen on, 0 picks a free one.
+        :return: The listening server.
+        """
+        self._server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=self._max_line_length, backlog=4096
+        )
+        return self._server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        """
+        :param path: Path of the Unix socket to listen on.
+        :return: The listening server.
+        """
+        self._server = await asyncio.start_unix_server(
+            self.handle_connection, path, limit=self._max_line_length, backlog=4096
+        )
+        return self._server
+
+    async def start_metrics(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """
+        Serve the metrics in the Prometheus text format over HTTP, whatever the path asked for.
+        :param host: Address to listen on.
+        :param port: Port to listen on, 0 picks a free one.
+        :return: The listening metrics server.
+        :raises ValueError: If the server was not given a metrics registry.
+        """
+        if self._metrics is None:
+            raise ValueError("The server has no metrics to serve, give it a metrics registry.")
+        return await asyncio.start_server(self.handle_metrics_request, host, port)
+
+    async def handle_metrics_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answer one HTTP request with the metrics and close the connection.
+        :param reader: Stream the request is read from.
+        :param writer: Stream the response is written to.
+        """
+        try:
+            # The request line and headers are read and ignored, every request gets the metrics.
+            while (await reader.readline()).strip():
+                pass
+            body = self._metrics.format_prometheus().encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body)
+            await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Run a session over a connection until the client stops sending or the session ends.
+        :param reader: Stream the client's lines are read from.
+        :param writer: Stream the session's output is written to.
+        """
+        session = Session(
+            self._advanced, ListOutputSink(), self._stack_capacity, self._cache_size, self._profiler,
+            metrics=self._metrics
+        )
+        self._connection_count += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line is longer than the stream's limit.
+                    break
+                if not line:
+                    break
+                output, session_ended = self._process_line(session, line)
+                if output:
+                    writer.write(output.encode())
+                    await writer.drain()
+                if session_ended:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connection_count -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def _process_line(session: Session, line: bytes) -> Tuple[str, bool]:
+        """
+        Evaluate a line from a client the way srpn.py evaluates a line of standard input, which only ever strips the
+        line feed from the end of a line.
+        :param session: Session of the connection, writing to a ListOutputSink.
+        :param line: Line as received, including its line feed.
+        :return: Output of the line and whether the session has ended.
+        """
+        session_ended = False
+        try:
+            command = line.decode()
+            session.process_command(command[:-1] if command.endswith("\n") else command)
+        except (Exception, SystemExit):
+            # srpn.py exits on any error, ending the session with whatever it printed before the error.
+            session_ended = True
+
+        output_sink = session.get_output_sink()
+        output = output_sink.get_output()
+        output_sink.clear()
+        return output, session_ended
@@ -0,0 +1,10 @@
+"""
+Defaults of the calculator server, kept apart from it so the command line can show them without importing asyncio.
+"""
+
+
+class ServerDefaults:
+    PORT = 7878
+    # Sessions are small, so thousands of them can share a process, as long as their line caches are kept small too.
+    CACHE_SIZE = 64
+    MAX_LINE_LENGTH = 1 << 20
@@ -0,0 +1,114 @@
+"""
+Runner of script files that memory maps them and compiles their bytes without decoding them.
+"""
+import mmap
+import os
+import re
+from array import array
+from typing import List
+
+from SRPN.cache.line_cache import LineCache
+from SRPN.lexer.lexer import Lexer
+from SRPN.output.output_sink import OutputSink
+from SRPN.parse.byte_compiler import ByteCompiler
+from SRPN.parse.compiler import Compiler
+from SRPN.parse.virtual_machine import VirtualMachine
+from SRPN.stack.stack import Stack
+from SRPN.tokens.general_methods import GeneralMethods
+from SRPN.tokens.operand import Operand
+from SRPN.tokens.tokenizer import Tokenizer
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from SRPN.profiling.metrics_registry import MetricsRegistry
+
+
+class ScriptRunner:
+    """
+    Runs a script against the state of a session with the same output as typing its lines in turn. Lines are found by
+    searching the buffer for line breaks and ASCII lines are compiled by the ByteCompiler in place. The rare line
+    holding other bytes is decoded and read through the line cache, so unicode digits are still recognised.
+    Instructions of many lines are run by the VirtualMachine at a time, except that unrecognised substrings are
+    reported between the lines before them and their own line, as typing them would.
+    """
+    BATCH_INSTRUCTIONS = 1 << 16
+    _NON_ASCII_PATTERN = re.compile(rb"[\x80-\xff]")
+
+    def __init__(self, stack: Stack, lexer: Lexer, tokenizer: Tokenizer, line_cache: LineCache,
+                 output_sink: OutputSink, metrics: "MetricsRegistry" = None) -> None:
+        """
+        :param stack: Stack the script runs against.
+        :param lexer: Lexer holding whether a comment is open.
+        :param tokenizer: Tokenizer deciding how unrecognised substrings are read and reporting them.
+        :param line_cache: Cache reading lines that are not ASCII.
+        :param output_sink: Sink the script writes to.
+        :param metrics: Registry counting the errors the script reports, none if not given.
+        """
+        self._stack = stack
+        self._tokenizer = tokenizer
+        self._line_cache = line_cache
+        self._byte_compiler = ByteCompiler(lexer, tokenizer.reads_unrecognised_as_zero())
+        self._virtual_machine = VirtualMachine(output_sink, metrics)
+
+    def run_file(self, path: str) -> None:
+        """
+        :param path: Path of the script, read as UTF-8.
+        :raises UnicodeDecodeError: If a line is not valid UTF-8, after running the lines before it.
+        """
+        with open(path, "rb") as script_file:
+            if os.fstat(script_file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(script_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                self.run_buffer(buffer)
+
+    def run_buffer(self, buffer) -> None:
+        """
+        :param buffer: Bytes or a memory map holding the script, slicing it must give bytes.
+        :raises UnicodeDecodeError: If a line is not valid UTF-8, after running the lines before it.
+        """
+        compile_line = self._byte_compiler.compile_line
+        size = len(buffer)
+        instructions: List[int] = list()
+        non_ascii_index = -1
+        start = 0
+
+        while start < size:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                end = size
+            if non_ascii_index < start:
+                non_ascii_match = self._NON_ASCII_PATTERN.search(buffer, start)
+                non_ascii_index = size if non_ascii_match is None else non_ascii_match.start()
+
+            if non_ascii_index >= end:
+                line_start = len(instructions)
+                unrecognised = compile_line(buffer, start, end, instructions)
+                if unrecognised:
+                    self._run(instructions[:line_start])
+                    del instructions[:line_start]
+                    self._tokenizer.report_unrecognised(unrecognised)
+            else:
+                self._run(instructions)
+                instructions.clear()
+                tokens = self._line_cache.read_line(buffer[start:end].decode("utf-8"))
+                instructions.extend(Compiler.compile_tokens(tokens))
+                # Instructions only hold the saturated values of operands, so their saturations are reported as the
+                # line is compiled, as the ByteCompiler reports those of the literals it reads.
+                for _token in tokens:
+                    if isinstance(_token, Operand):
+                        for bound in _token.get_saturations():
+                            GeneralMethods.report_saturation(bound)
+
+            if len(instructions) >= self.BATCH_INSTRUCTIONS:
+                self._run(instructions)
+                instructions.clear()
+            start = end + 1
+
+        self._run(instructions)
+
+    def _run(self, instructions: List[int]) -> None:
+        """
+        :param instructions: Instructions of whole lines, run against the stack.
+        """
+        if instructions:
+            self._virtual_machine.run(self._stack, array(Compiler.INSTRUCTION_TYPECODE, instructions))
@@ -0,0 +1,267 @@
+"""
+Self-contained calculator session, so several can run in one process.
+"""
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+
+from SRPN.cache.line_cache import LineCache
+from SRPN.lexer.lexer import Lexer
+from SRPN.output.output_sink import ListOutputSink, OutputSink
+from SRPN.parse.parser import Parser
+from SRPN.stack.random_generator import RandomGenerator
+from SRPN.stack.stack import Stack
+from SRPN.tokens.advanced_tokenizer import AdvancedTokenizer
+from SRPN.tokens.general_methods import GeneralMethods
+from SRPN.tokens.tokenizer import Tokenizer
+
+# Only what evaluating a line needs is imported up front so the calculator starts quickly, everything else where it is
+# first used.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import ContextManager, Sequence, TextIO, Union
+
+    from SRPN.profiling.metrics_registry import MetricsRegistry
+    from SRPN.profiling.profiler import Profiler
+    from SRPN.tokens.token import Token
+
+
+class Session:
+    """
+    Owns every piece of state a calculator session changes: the comment state of its Lexer, its Stack and the
+    generator ``r`` draws from, its line cache and the sink it writes to. Nothing is shared with other sessions beyond
+    immutable tokens and compiled patterns, so sessions on different threads never contend.
+    A session serialises its own commands with a reentrant lock, so it can also be shared between threads.
+    """
+
+    def __init__(self, advanced: bool = False, output_sink: OutputSink = None,
+                 stack_capacity: int = Stack.DEFAULT_CAPACITY, cache_size: int = LineCache.DEFAULT_MAX_SIZE,
+                 profiler: Profiler = None, constant_folding: bool = True, trace_capacity: int = 0,
+                 trace_error_file: TextIO = None, metrics: MetricsRegistry = None, hot_threshold: int = 0) -> None:
+        """
+        :param advanced: Report unrecognised operators and operands instead of reading them as 0.
+        :param output_sink: Sink the session writes to, a new ListOutputSink if not given.
+        :param stack_capacity: Number of values the stack holds before overflowing.
+        :param cache_size: Number of tokenized lines kept for reuse, 0 disables caching, see LineCache for the bound on
+        their characters.
+        :param profiler: Profiler recording the stages of the session, nothing is recorded if not given.
+        :param constant_folding: Evaluate lines with their literal arithmetic folded whenever that is certain to give
+        the same result, see FoldedLine.
+        :param trace_capacity: Number of entries kept in a trace of the lines and tokens evaluated, 0 disables tracing,
+        see TracingParser. Scripts run with process_file are not traced.
+        :param trace_error_file: Text stream the trace is written to after every error, none if not given.
+        :param metrics: Registry the lines, errors and saturations of the session are counted in, which may be shared
+        with other sessions, nothing is counted if not given.
+        :param hot_threshold: Number of times a cached line is evaluated before it is compiled to a Python function,
+        0 never compiles lines, see TieredLine. Lines are only compiled in sessions without a trace.
+        :raises ValueError: If the session is given both a trace and a hot threshold, or a stack capacity below 1
+        or above Stack.MAX_CAPACITY.
+        """
+        if trace_capacity > 0 and hot_threshold > 0:
+            raise ValueError("A traced session evaluates every token one at a time, so it cannot compile lines.")
+        self._output_sink = ListOutputSink() if output_sink is None else output_sink
+        self._random_generator = RandomGenerator()
+        self._lexer = Lexer()
+        self._tokenizer = AdvancedTokenizer(self._output_sink) if advanced else Tokenizer(self._output_sink)
+        self._tracing = trace_capacity > 0
+        if self._tracing:
+            from SRPN.parse.tracing_parser import TracingParser
+
+            self._parser = TracingParser(self._output_sink, trace_capacity, trace_error_file, metrics)
+        else:
+            self._parser = Parser(self._output_sink, metrics)
+        self._stack = Stack(stack_capacity, self._random_generator)
+        self._line_cache = LineCache(self._lexer, self._tokenizer, cache_size)
+        self._constant_folding = constant_folding
+        self._hot_threshold = hot_threshold
+        self._metrics = metrics
+        # Told the bound of every integer saturated while a line is measured, see GeneralMethods.report_saturation.
+        self._record_saturation = None if metrics is None else metrics.record_saturation
+        self._lock = threading.RLock()
+        if profiler is not None:
+            profiler.instrument(self._lexer, self._tokenizer, self._parser, self._line_cache)
+
+    def get_output_sink(self) -> OutputSink:
+        """
+        :return: Sink the session writes to.
+        """
+        return self._output_sink
+
+    def get_stack(self) -> Stack:
+        """
+        :return: Stack of the session.
+        """
+        return self._stack
+
+    def get_line_cache(self) -> LineCache:
+        """
+        :return: Cache of the session's tokenized lines.
+        """
+        return self._line_cache
+
+    def dump_trace(self, file: TextIO) -> None:
+        """
+        Write the trace of the session as JSON lines, see TracingParser.iter_entries.
+        :param file: Text stream the trace is written to.
+        :raises ValueError: If the session is not traced.
+        """
+        if not self._tracing:
+            raise ValueError("The session is not traced, give it a trace capacity.")
+        with self._lock:
+            self._parser.dump(file)
+
+    def process_command(self, command: str, return_output: bool = False) -> Union[str, None]:
+        """
+        Evaluate one line of user input.
+        :param command: User input line, without its line break.
+        :param return_output: Return the output of the line instead of writing it to the sink.
+        :return: The output of the line if asked for, otherwise None.
+        """
+        with self._lock:
+            evaluate = self._evaluate_command if self._metrics is None else self._evaluate_measured_command
+            if return_output:
+                with self._output_sink.capture() as lines:
+                    evaluate(command)
+                return "".join(f"{line}\n" for line in lines)
+            evaluate(command)
+            self._output_sink.end_command()
+
+    def process_stream(self, stream: TextIO, chunk_size: int = Lexer.STREAM_CHUNK_SIZE) -> None:
+        """
+        Evaluate every line of a file-like object, reading it in chunks with bounded memory.
+        :param stream: File-like object opened in text mode.
+        :param chunk_size: Number of characters read from the stream at a time.
+        """
+        with self._lock, self._report_saturations():
+            substrings = self._lexer.read_stream(stream, chunk_size)
+            tokens = self._tokenizer.read_substring_stream(substrings)
+            self._parser.read_tokens(self._stack, tokens)
+            self._output_sink.flush()
+
+    def process_file(self, path: str) -> None:
+        """
+        Evaluate every line of a script file, memory mapping it rather than reading it line by line.
+        :param path: Path of the script, read as UTF-8.
+        """
+        from SRPN.session.script_runner import ScriptRunner
+
+        with self._lock, self._report_saturations():
+            runner = ScriptRunner(
+                self._stack, self._lexer, self._tokenizer, self._line_cache, self._output_sink, self._metrics
+            )
+            try:
+                runner.run_file(path)
+            finally:
+                self._output_sink.flush()
+
+    def snapshot(self) -> bytes:
+        """
+        :return: Binary record of the state of the session, see SessionSnapshot.
+        """
+        from SRPN.session.snapshot import SessionSnapshot
+
+        with self._lock:
+            return SessionSnapshot.pack(self._stack, self._lexer, self._random_generator)
+
+    def restore(self, buffer, offset: int = 0) -> int:
+        """
+        Replace the state of the session with that of a snapshot, which may have been taken in another process. The
+        line cache is kept, as tokens do not depend on the state.
+        :param buffer: Any object supporting the buffer protocol holding a snapshot, read in place.
+        :param offset: Position in the buffer the snapshot starts at.
+        :return: Position in the buffer after the snapshot.
+        :raises ValueError: If the buffer holds no valid snapshot at the offset, leaving the session as it was.
+        """
+        from SRPN.session.snapshot import SessionSnapshot
+
+        with self._lock:
+            return SessionSnapshot.unpack_from(buffer, offset, self._stack, self._lexer, self._random_generator)
+
+    @staticmethod
+    def snapshot_many(sessions: Sequence["Session"]) -> bytearray:
+        """
+        Snapshot many sessions into one buffer, sized up front so every record is written in place.
+        :param sessions: Sessions to snapshot.
+        :return: Batch of snapshots in the order of the sessions, see SessionSnapshot.
+        """
+        from SRPN.session.snapshot import SessionSnapshot
+
+        offsets = [SessionSnapshot.get_batch_header_size(len(sessions))]
+        for session in sessions:
+            session._lock.acquire()
+        try:
+            for session in sessions:
+                offsets.append(offsets[-1] + SessionSnapshot.get_size(session._stack, session._random_generator))
+            buffer = bytearray(offsets[-1])
+            SessionSnapshot.pack_batch_header(buffer, tuple(offsets))
+            for session, offset in zip(sessions, offsets):
+                SessionSnapshot.pack_into(buffer, offset, session._stack, session._lexer, session._random_generator)
+        finally:
+            for session in sessions:
+                session._lock.release()
+        return buffer
+
+    @staticmethod
+    def restore_many(buffer, sessions: Sequence["Session"]) -> None:
+        """
+        :param buffer: Any object supporting the buffer protocol holding a batch from snapshot_many, read in place.
+        :param sessions: Sessions restored, one for every snapshot of the batch in order.
+        :raises ValueError: If the batch does not hold one valid snapshot for every session, leaving every session as
+        it was.
+        """
+        from SRPN.session.snapshot import SessionSnapshot
+
+        offsets = SessionSnapshot.unpack_batch_header(buffer)
+        if len(offsets) - 1 != len(sessions):
+            raise ValueError(f"Snapshot batch holds {len(offsets) - 1} sessions, not {len(sessions)}.")
+        # Every snapshot is read and checked before any session is restored.
+        states = [SessionSnapshot.read_state(buffer, offset)[0] for offset in offsets[:-1]]
+        for session, state in zip(sessions, states):
+            with session._lock:
+                SessionSnapshot.restore_state(state, session._stack, session._lexer, session._random_generator)
+
+    def _report_saturations(self) -> ContextManager[None]:
+        """
+        :return: Context in which the integers saturated on the current thread are counted in the metrics of the
+        session, and not in those of any other session, or one doing nothing if the session has no metrics.
+        """
+        if self._metrics is None:
+            return contextlib.nullcontext()
+        return GeneralMethods.report_saturations(self._metrics.record_saturation)
+
+    def _evaluate_measured_command(self, command: str) -> None:
+        """
+        Evaluate a line and record it in the metrics of the session, even if it ends the session.
+        :param command: User input line, without its line break.
+        """
+        tokens = ()
+        # The listener is appended directly rather than by _report_saturations, which would cost a good part of a short
+        # line.
+        saturation_listeners = GeneralMethods.SATURATION_LISTENERS.listeners
+        saturation_listeners.append(self._record_saturation)
+        start = time.perf_counter()
+        try:
+            tokens = self._evaluate_command(command)
+        finally:
+            self._metrics.record_line(time.perf_counter() - start, tokens)
+            saturation_listeners.pop()
+
+    def _evaluate_command(self, command: str) -> Sequence[Token]:
+        """
+        :param command: User input line, without its line break.
+        :return: Tokens the line was evaluated as.
+        """
+        if self._hot_threshold:
+            tiered_line = self._line_cache.read_tiered_line(command, self._constant_folding, self._hot_threshold)
+            return tiered_line.evaluate(self._stack, self._parser)
+        if self._constant_folding:
+            tokens = self._line_cache.read_folded_line(command).get_tokens(self._stack)
+        else:
+            tokens = self._line_cache.read_line(command)
+        if self._tracing:
+            self._parser.read_tokens(self._stack, tokens, command)
+        else:
+            self._parser.read_tokens(self._stack, tokens)
+        return tokens
@@ -0,0 +1,296 @@
+"""
+Compact binary snapshots of session state, for moving live sessions between workers.
+"""
+import struct
+import sys
+from array import array
+from typing import Tuple, Union
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.stack.random_generator import RandomGenerator
+from SRPN.stack.stack import Stack
+from SRPN.tokens.general_methods import GeneralMethods
+
+# Values of the stack from the bottom up, whether it is new, its capacity, whether a comment is open and the generator
+# r is drawn from, as read from a record.
+SnapshotState = Tuple[Tuple[int, ...], bool, int, bool, RandomGenerator]
+
+
+class SessionSnapshot:
+    """
+    Packs the state a session changes into a versioned little-endian record and unpacks it again:
+
+    - header: magic ``SRPS``, version, flags, stack capacity, at most Stack.MAX_CAPACITY, and stack depth
+    - the stack from the bottom up as signed 32 bit integers
+    - with FLAG_RANDOM_POSITION, the position of the generator ``r`` draws from: its seed, the blocks it drew and the
+      values drawn from the last block, all unsigned 32 bit integers
+    - with FLAG_RANDOM_STATE, the state of the generator instead: the size of its next block, the position of the
+      Mersenne Twister, the number of values made but not drawn, the 624 words of the Mersenne Twister and those
+      values, all unsigned 32 bit integers
+
+    A generator with neither flag is as SRPN seeds it, so a session that never used ``r`` takes 14 bytes plus 4 for
+    every value on the stack. Restoring a position draws its blocks again, so it is only recorded for generators that
+    drew few blocks, which are most of them, and the 2.5 KB state for the rest. Records are packed into and unpacked
+    from any buffer at an offset, so many of them share one buffer and are read in place without slicing it.
+    """
+    MAGIC = b"SRPS"
+    BATCH_MAGIC = b"SRPB"
+    VERSION = 1
+
+    FLAG_NEW_STACK = 1
+    FLAG_COMMENT_OPEN = 2
+    FLAG_RANDOM_POSITION = 4
+    FLAG_RANDOM_STATE = 8
+    # Restoring the position of 4 blocks draws 120 words again, the state is quicker beyond that.
+    MAX_REPLAYED_BLOCKS = 4
+
+    _HEADER = struct.Struct("<4sBBII")
+    _RANDOM_POSITION = struct.Struct("<III")
+    _RANDOM_HEADER = struct.Struct("<III")
+    _BATCH_HEADER = struct.Struct("<4sBI")
+    _OFFSET = struct.Struct("<I")
+    _TWISTER_WORDS = 624
+    _TWISTER_VERSION = 3
+    _LITTLE_ENDIAN = sys.byteorder == "little"
+
+    @staticmethod
+    def get_size(stack: Stack, random_generator: RandomGenerator) -> int:
+        """
+        :param stack: Stack of the session.
+        :param random_generator: Generator the stack draws r from.
+        :return: Number of bytes the record of the session takes.
+        """
+        size = SessionSnapshot._HEADER.size + 4 * len(stack)
+        position = SessionSnapshot._get_recorded_position(random_generator)
+        if position is None:
+            _, values, _ = random_generator.get_state()
+            size += SessionSnapshot._RANDOM_HEADER.size + 4 * (SessionSnapshot._TWISTER_WORDS + len(values))
+        elif position != (0, 0, 0):
+            size += SessionSnapshot._RANDOM_POSITION.size
+        return size
+
+    @staticmethod
+    def pack(stack: Stack, lexer: Lexer, random_generator: RandomGenerator) -> bytes:
+        """
+        :param stack: Stack of the session.
+        :param lexer: Lexer of the session, holding whether a comment is open.
+        :param random_generator: Generator the stack draws r from.
+        :return: The record of the session.
+        """
+        buffer = bytearray(SessionSnapshot.get_size(stack, random_generator))
+        SessionSnapshot.pack_into(buffer, 0, stack, lexer, random_generator)
+        return bytes(buffer)
+
+    @staticmethod
+    def pack_into(buffer: bytearray, offset: int, stack: Stack, lexer: Lexer, random_generator: RandomGenerator) -> int:
+        """
+        Write the record of a session into a buffer, which must have get_size bytes free at the offset.
+        :param buffer: Writable buffer.
+        :param offset: Position in the buffer the record starts at.
+        :param stack: Stack of the session.
+        :param lexer: Lexer of the session, holding whether a comment is open.
+        :param random_generator: Generator the stack draws r from.
+        :return: Position in the buffer after the record.
+        """
+        flags = SessionSnapshot.FLAG_NEW_STACK if stack.is_new_stack() else 0
+        if lexer.is_comment_open():
+            flags |= SessionSnapshot.FLAG_COMMENT_OPEN
+        position = SessionSnapshot._get_recorded_position(random_generator)
+        if position is None:
+            flags |= SessionSnapshot.FLAG_RANDOM_STATE
+        elif position != (0, 0, 0):
+            flags |= SessionSnapshot.FLAG_RANDOM_POSITION
+
+        depth = len(stack)
+        header = SessionSnapshot._HEADER
+        header.pack_into(
+            buffer, offset, SessionSnapshot.MAGIC, SessionSnapshot.VERSION, flags, stack.get_capacity(), depth
+        )
+        offset += header.size
+        struct.pack_into(f"<{depth}i", buffer, offset, *stack.iter_stack_memory())
+        offset += 4 * depth
+
+        if flags & SessionSnapshot.FLAG_RANDOM_POSITION:
+            SessionSnapshot._RANDOM_POSITION.pack_into(buffer, offset, *position)
+            return offset + SessionSnapshot._RANDOM_POSITION.size
+        if not flags & SessionSnapshot.FLAG_RANDOM_STATE:
+            return offset
+
+        (_, twister_state, _), values, block_words = random_generator.get_state()
+        random_header = SessionSnapshot._RANDOM_HEADER
+        random_header.pack_into(buffer, offset, block_words, twister_state[-1], len(values))
+        offset = SessionSnapshot._write_words(buffer, offset + random_header.size, array("I", twister_state[:-1]))
+        return SessionSnapshot._write_words(buffer, offset, array("I", values))
+
+    @staticmethod
+    def unpack_from(buffer, offset: int, stack: Stack, lexer: Lexer, random_generator: RandomGenerator) -> int:
+        """
+        Restore the state of a session from a record in a buffer, reading the buffer in place. The whole record is read
+        and checked before anything is restored, so a record that is rejected leaves the session as it was.
+        :param buffer: Any object supporting the buffer protocol.
+        :param offset: Position in the buffer the record starts at.
+        :param stack: Stack restored, its capacity becomes that of the record.
+        :param lexer: Lexer restored.
+        :param random_generator: Generator restored.
+        :return: Position in the buffer after the record.
+        :raises ValueError: If the buffer holds no valid record of a known version at the offset.
+        """
+        state, offset = SessionSnapshot.read_state(buffer, offset)
+        SessionSnapshot.restore_state(state, stack, lexer, random_generator)
+        return offset
+
+    @staticmethod
+    def read_state(buffer, offset: int) -> Tuple[SnapshotState, int]:
+        """
+        Read and check a record without restoring it.
+        :param buffer: Any object supporting the buffer protocol.
+        :param offset: Position in the buffer the record starts at.
+        :return: State held by the record, for restore_state, and the position in the buffer after the record.
+        :raises ValueError: If the buffer holds no valid record of a known version at the offset.
+        """
+        header = SessionSnapshot._HEADER
+        if len(buffer) < offset + header.size:
+            raise ValueError("Snapshot is truncated.")
+        magic, version, flags, capacity, depth = header.unpack_from(buffer, offset)
+        if magic != SessionSnapshot.MAGIC:
+            raise ValueError("Not a session snapshot.")
+        if version != SessionSnapshot.VERSION:
+            raise ValueError(f"Unsupported session snapshot version {version}.")
+        new_stack = bool(flags & SessionSnapshot.FLAG_NEW_STACK)
+        Stack.check_state(depth, new_stack, capacity)
+
+        offset += header.size
+        if len(buffer) < offset + 4 * depth:
+            raise ValueError("Snapshot is truncated.")
+        memory = struct.unpack_from(f"<{depth}i", buffer, offset)
+        offset += 4 * depth
+
+        # The generator is restored into one of its own, which the session's generator takes over once every check
+        # has passed.
+        restored_generator = RandomGenerator()
+        if flags & SessionSnapshot.FLAG_RANDOM_POSITION:
+            random_position = SessionSnapshot._RANDOM_POSITION
+            if len(buffer) < offset + random_position.size:
+                raise ValueError("Snapshot is truncated.")
+            seed, blocks, index = random_position.unpack_from(buffer, offset)
+            if blocks > SessionSnapshot.MAX_REPLAYED_BLOCKS:
+                raise ValueError(f"Snapshot replays {blocks} random blocks, more than are ever recorded.")
+            restored_generator.set_position(seed, blocks, index)
+            offset += random_position.size
+        elif flags & SessionSnapshot.FLAG_RANDOM_STATE:
+            random_header = SessionSnapshot._RANDOM_HEADER
+            if len(buffer) < offset + random_header.size:
+                raise ValueError("Snapshot is truncated.")
+            block_words, position, value_count = random_header.unpack_from(buffer, offset)
+            if not 1 <= block_words <= RandomGenerator.MAX_BLOCK_WORDS:
+                raise ValueError(f"Snapshot random block size {block_words} is out of range.")
+            if position > SessionSnapshot._TWISTER_WORDS:
+                raise ValueError(f"Snapshot Mersenne Twister position {position} is out of range.")
+            words, offset = SessionSnapshot._read_words(
+                buffer, offset + random_header.size, "I", SessionSnapshot._TWISTER_WORDS
+            )
+            values, offset = SessionSnapshot._read_words(buffer, offset, "I", value_count)
+            if values and max(values) > GeneralMethods.UPPER_BOUND:
+                raise ValueError("Snapshot holds a random value out of range.")
+            twister_state = (SessionSnapshot._TWISTER_VERSION, (*words, position), None)
+            restored_generator.set_state((twister_state, values, block_words))
+
+        comment_open = bool(flags & SessionSnapshot.FLAG_COMMENT_OPEN)
+        return (memory, new_stack, capacity, comment_open, restored_generator), offset
+
+    @staticmethod
+    def restore_state(state: SnapshotState, stack: Stack, lexer: Lexer, random_generator: RandomGenerator) -> None:
+        """
+        :param state: State read by read_state, which has already been checked.
+        :param stack: Stack restored, its capacity becomes that of the state.
+        :param lexer: Lexer restored.
+        :param random_generator: Generator restored, taking over the generator of the state.
+        """
+        memory, new_stack, capacity, comment_open, restored_generator = state
+        stack.set_state(memory, new_stack, capacity)
+        lexer.set_comment_open(comment_open)
+        random_generator.take_over(restored_generator)
+
+    @staticmethod
+    def get_batch_header_size(count: int) -> int:
+        """
+        :param count: Number of records in the batch.
+        :return: Number of bytes before the first record of a batch: magic, version, count and the offset of every
+        record followed by the end of the last.
+        """
+        return SessionSnapshot._BATCH_HEADER.size + SessionSnapshot._OFFSET.size * (count + 1)
+
+    @staticmethod
+    def pack_batch_header(buffer: bytearray, offsets: Tuple[int, ...]) -> None:
+        """
+        :param buffer: Buffer of the batch, the header is written at its start.
+        :param offsets: Offset of every record from the start of the buffer, followed by the end of the last.
+        """
+        count = len(offsets) - 1
+        SessionSnapshot._BATCH_HEADER.pack_into(buffer, 0, SessionSnapshot.BATCH_MAGIC, SessionSnapshot.VERSION, count)
+        SessionSnapshot._write_words(buffer, SessionSnapshot._BATCH_HEADER.size, array("I", offsets))
+
+    @staticmethod
+    def unpack_batch_header(buffer) -> Tuple[int, ...]:
+        """
+        :param buffer: Any object supporting the buffer protocol, holding a batch.
+        :return: Offset of every record from the start of the buffer, followed by the end of the last.
+        :raises ValueError: If the buffer holds no batch of a known version.
+        """
+        batch_header = SessionSnapshot._BATCH_HEADER
+        if len(buffer) < batch_header.size:
+            raise ValueError("Snapshot batch is truncated.")
+        magic, version, count = batch_header.unpack_from(buffer, 0)
+        if magic != SessionSnapshot.BATCH_MAGIC:
+            raise ValueError("Not a session snapshot batch.")
+        if version != SessionSnapshot.VERSION:
+            raise ValueError(f"Unsupported session snapshot batch version {version}.")
+        offsets, _ = SessionSnapshot._read_words(buffer, batch_header.size, "I", count + 1)
+        return tuple(offsets)
+
+    @staticmethod
+    def _get_recorded_position(random_generator: RandomGenerator) -> Union[Tuple[int, int, int], None]:
+        """
+        :param random_generator: Generator of a session.
+        :return: The position of the generator if it is recorded rather than its state, otherwise None.
+        """
+        position = random_generator.get_position()
+        if position is None:
+            return None
+        seed, blocks, _ = position
+        if not 0 <= seed <= 0xFFFFFFFF or blocks > SessionSnapshot.MAX_REPLAYED_BLOCKS:
+            return None
+        return position
+
+    @staticmethod
+    def _write_words(buffer: bytearray, offset: int, words: array) -> int:
+        """
+        :param buffer: Writable buffer.
+        :param offset: Position the words are written at.
+        :param words: Array of 32 bit integers, in native byte order.
+        :return: Position in the buffer after the words.
+        """
+        if not SessionSnapshot._LITTLE_ENDIAN:
+            words.byteswap()
+        end = offset + 4 * len(words)
+        buffer[offset:end] = words
+        return end
+
+    @staticmethod
+    def _read_words(buffer, offset: int, typecode: str, count: int) -> Tuple[array, int]:
+        """
+        :param buffer: Any object supporting the buffer protocol.
+        :param offset: Position the words are read from.
+        :param typecode: "i" for signed or "I" for unsigned 32 bit integers.
+        :param count: Number of words.
+        :return: The words in native byte order and the position in the buffer after them.
+        """
+        end = offset + 4 * count
+        if len(buffer) < end:
+            raise ValueError("Snapshot is truncated.")
+        words = array(typecode)
+        with memoryview(buffer) as view:
+            words.frombytes(view[offset:end])
+        if not SessionSnapshot._LITTLE_ENDIAN:
+            words.byteswap()
+        return words, end
@@ -1,19 +1,17 @@
 # This is your SRPN file. Make your changes here.
 from SRPN.lexer.lexer import Lexer
-from SRPN.parse.parser import Parser
-from SRPN.stack.stack import Stack
-from SRPN.tokens.advanced_tokenizer import AdvancedTokenizer
+from SRPN.output.output_sink import STANDARD_OUTPUT
+from SRPN.session.session import Session
 
-tokenizer = AdvancedTokenizer()
-lexer = Lexer()
-parser = Parser()
-stack = Stack()
+session = Session(advanced=True, output_sink=STANDARD_OUTPUT)
 
 
-def process_command(command):
-    substrings = lexer.read_user_input(command)
-    tokens = tokenizer.read_substrings(substrings)
-    parser.read_tokens(stack, tokens)
+def process_command(command, return_output=False):
+    return session.process_command(command, return_output)
+
+
+def process_stream(stream, chunk_size=Lexer.STREAM_CHUNK_SIZE):
+    session.process_stream(stream, chunk_size)
 
 
 # This is the entry point for the program.
@@ -0,0 +1,176 @@
+"""
+Generator of the integers the r command pushes.
+"""
+from __future__ import annotations
+
+import sys
+from array import array
+
+from SRPN.tokens.general_methods import GeneralMethods
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from random import Random
+    from typing import List, Tuple, Union
+
+
+class RandomGenerator:
+    """
+    Reproduces the values of ``randint(0, 2147483647)`` after ``seed(0)``, which SRPN draws ``r`` from, with state of
+    its own so that sessions never disturb each other.
+    randint draws a 32 bit word from the Mersenne Twister for a range of 2 ** 31 and rejects words outside of it, so
+    the same values are every word below 2 ** 31 in order. Words are made in blocks by a single getrandbits call, which
+    fills its result from the least significant word upwards, and block sizes double up to a limit so a session that
+    draws a few values does not pay for thousands.
+    """
+    __slots__ = ("_random", "_values", "_index", "_block_words", "_seed", "_blocks")
+    INITIAL_BLOCK_WORDS = 8
+    MAX_BLOCK_WORDS = 4096
+    _RANGE = GeneralMethods.UPPER_BOUND + 1
+
+    def __init__(self, seed: int = 0) -> None:
+        """
+        :param seed: Seed of the Mersenne Twister, SRPN uses 0.
+        """
+        self._random: Union[Random, None] = None
+        self.reset(seed)
+
+    def reset(self, seed: int = 0) -> None:
+        """
+        Start the sequence again from a seed. The Mersenne Twister is only seeded once a value is drawn.
+        :param seed: Seed of the Mersenne Twister, SRPN uses 0.
+        """
+        self._random = None
+        self._values: List[int] = list()
+        self._index = 0
+        self._block_words = self.INITIAL_BLOCK_WORDS
+        self._seed = seed
+        self._blocks = 0
+
+    def next_value(self) -> int:
+        """
+        :return: The next value of the sequence.
+        """
+        if self._index == len(self._values):
+            self._refill()
+        value = self._values[self._index]
+        self._index += 1
+        return value
+
+    def take(self, count: int) -> List[int]:
+        """
+        Draw many values at once.
+        :param count: Number of values.
+        :return: The next values of the sequence, in order.
+        """
+        values = self._values[self._index:self._index + count]
+        self._index += len(values)
+        while len(values) < count:
+            self._refill()
+            needed = count - len(values)
+            values.extend(self._values[:needed])
+            self._index = min(needed, len(self._values))
+        return values
+
+    def clone(self) -> "RandomGenerator":
+        """
+        Copy the generator in time independent of how far along the sequence it is, for forking a session.
+        :return: A generator continuing the same sequence independently.
+        """
+        clone = RandomGenerator()
+        clone.set_state(self.get_state())
+        return clone
+
+    def get_position(self) -> Union[Tuple[int, int, int], None]:
+        """
+        The position is far smaller than the state, but restoring it makes every block drawn so far again.
+        :return: The seed, the number of blocks drawn since and the number of values drawn from the last block, or
+        None if the state of the generator was set since it was seeded.
+        """
+        if self._seed is None:
+            return None
+        return self._seed, self._blocks, self._index
+
+    def set_position(self, seed: int, blocks: int, index: int) -> None:
+        """
+        :param seed: Seed returned by get_position.
+        :param blocks: Number of blocks returned by get_position.
+        :param index: Number of values drawn from the last block returned by get_position.
+        :raises ValueError: If more values are drawn from the last block than it holds.
+        """
+        self.reset(seed)
+        for _ in range(blocks):
+            self._draw_block()
+        if index > len(self._values):
+            raise ValueError(f"The last block holds {len(self._values)} values, {index} cannot have been drawn.")
+        self._index = index
+
+    def take_over(self, other: "RandomGenerator") -> None:
+        """
+        Continue the sequence of another generator, which must not be used afterwards as the two share its state.
+        :param other: Generator taken over.
+        """
+        self._random = other._random
+        self._values = other._values
+        self._index = other._index
+        self._block_words = other._block_words
+        self._seed = other._seed
+        self._blocks = other._blocks
+
+    def get_state(self) -> Tuple[tuple, Tuple[int, ...], int]:
+        """
+        :return: State of the Mersenne Twister, the values made but not drawn yet and the size of the next block.
+        """
+        return self._get_random().getstate(), tuple(self._values[self._index:]), self._block_words
+
+    def set_state(self, state: Tuple[tuple, Tuple[int, ...], int]) -> None:
+        """
+        :param state: State returned by get_state.
+        """
+        random_state, values, block_words = state
+        if self._random is None:
+            from random import Random
+
+            # A fixed seed is quicker than the operating system's entropy, and the state replaces it anyway.
+            self._random = Random(0)
+        self._random.setstate(random_state)
+        self._values = list(values)
+        self._index = 0
+        self._block_words = block_words
+        self._seed = None
+        self._blocks = 0
+
+    def _get_random(self) -> Random:
+        """
+        The random module is only imported here, as most sessions never draw a value.
+        :return: The Mersenne Twister, seeded if it was not yet.
+        """
+        if self._random is None:
+            from random import Random
+
+            self._random = Random(self._seed)
+        return self._random
+
+    def _refill(self) -> None:
+        """
+        Replace the drawn values with the accepted words of new blocks, until one accepts any.
+        """
+        self._draw_block()
+        while not self._values:
+            self._draw_block()
+
+    def _draw_block(self) -> None:
+        """
+        Replace the drawn values with the accepted words of a new block, doubling the size of the next block.
+        """
+        words = array("I")
+        block_words = self._block_words
+        words.frombytes(self._get_random().getrandbits(32 * block_words).to_bytes(4 * block_words, "little"))
+        if sys.byteorder == "big":
+            words.byteswap()
+
+        value_range = self._RANGE
+        self._values = [word for word in words if word < value_range]
+        self._index = 0
+        self._block_words = min(block_words * 2, self.MAX_BLOCK_WORDS)
+        self._blocks += 1
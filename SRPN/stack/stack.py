@@ -1,49 +1,127 @@
-from random import randint, seed
+from __future__ import annotations
+
+from itertools import islice
 
 from SRPN.errors.stack_empty_error import StackEmptyError
 from SRPN.errors.underflow_error import UnderflowError
+from SRPN.stack.random_generator import RandomGenerator
 from SRPN.tokens.general_methods import GeneralMethods
 from SRPN.tokens.operators import Operator
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, Sequence, Tuple
+
 
 class Stack:
     # I know this isn't really a stack but it's to fit with the output used in SRPN.
+    # Memory is allocated once at full capacity and _top indexes the value on top, so no operation copies the memory.
+    __slots__ = ("_memory", "_top", "_capacity", "_new_stack", "_random_generator")
+    DEFAULT_CAPACITY = 23
+    # Largest capacity a stack is made or restored with, whose memory alone takes 128 MiB of pointers, so a corrupt
+    # snapshot cannot have gigabytes allocated.
+    MAX_CAPACITY = 1 << 24
+
     def __len__(self):
-        return len(self._memory)
+        return self._top + 1
 
-    def __init__(self):
-        seed(a=0, version=2)
-        self._memory = [-2147483648]
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, random_generator: RandomGenerator = None):
+        Stack.check_capacity(capacity)
+        # Each stack draws r from its own generator seeded the way SRPN seeds it, rather than reseeding the shared one.
+        self._random_generator = RandomGenerator() if random_generator is None else random_generator
+        self._memory = [0] * capacity
+        self._memory[0] = GeneralMethods.LOWER_BOUND
+        self._top = 0
+        self._capacity = capacity
         self._new_stack = True
 
     def is_new_stack(self):
         return self._new_stack
 
-    def get_stack_memory(self):
-        return tuple(self._memory)
+    def get_capacity(self) -> int:
+        return self._capacity
+
+    def get_top(self) -> int:
+        # A new stack shows its sentinel value, as d does.
+        return self._memory[self._top]
+
+    def get_stack_memory(self) -> Tuple[int, ...]:
+        return tuple(self._memory[:self._top + 1])
+
+    def iter_stack_memory(self) -> Iterator[int]:
+        return islice(self._memory, self._top + 1)
+
+    def get_random_generator(self) -> RandomGenerator:
+        return self._random_generator
+
+    def set_state(self, values: Sequence[int], new_stack: bool, capacity: int = None):
+        """
+        Replace the contents of the stack, for restoring a snapshot.
+        :param values: Values from the bottom of the stack up, the sentinel value alone for a new stack.
+        :param new_stack: Whether the stack is new.
+        :param capacity: Capacity of the restored stack, unchanged if not given.
+        :raises ValueError: If the values do not fit the capacity, leaving the stack unchanged.
+        """
+        if capacity is None:
+            capacity = self._capacity
+        Stack.check_state(len(values), new_stack, capacity)
+        if capacity != self._capacity:
+            self._memory = [0] * capacity
+            self._capacity = capacity
+        self._memory[:len(values)] = values
+        self._top = len(values) - 1
+        self._new_stack = new_stack
+
+    @staticmethod
+    def check_state(depth: int, new_stack: bool, capacity: int):
+        """
+        :param depth: Number of values on the stack, the sentinel value of a new stack included.
+        :param new_stack: Whether the stack is new.
+        :param capacity: Capacity of the stack.
+        :raises ValueError: If a stack cannot be in the state.
+        """
+        Stack.check_capacity(capacity)
+        if not 1 <= depth <= capacity:
+            raise ValueError(f"A stack of capacity {capacity} cannot hold {depth} values.")
+        if new_stack and depth != 1:
+            raise ValueError(f"A new stack holds its sentinel value alone, not {depth} values.")
+
+    @staticmethod
+    def check_capacity(capacity: int):
+        """
+        :param capacity: Capacity of a stack.
+        :raises ValueError: If the capacity is below 1 or above MAX_CAPACITY.
+        """
+        if capacity < 1:
+            raise ValueError(f"A stack must hold at least 1 value, not {capacity}.")
+        if capacity > Stack.MAX_CAPACITY:
+            raise ValueError(f"A stack holds at most {Stack.MAX_CAPACITY} values, not {capacity}.")
 
     def get_equals(self):
         if self._new_stack:
             raise StackEmptyError("Stack Empty")
         else:
-            return self._memory[-1]
+            return self._memory[self._top]
 
     def add_int_to_stack(self, value: int) -> bool:
         if self._new_stack:
-            self._memory = [value]
+            self._memory[0] = value
             self._new_stack = False
-        elif len(self._memory) == 23:
+        elif self._top + 1 == self._capacity:
             raise OverflowError("Stack overflow.")
         else:
-            self._memory.append(value)
+            self._top += 1
+            self._memory[self._top] = value
 
     def add_random_int_to_stack(self):
-        self.add_int_to_stack(randint(0, GeneralMethods.UPPER_BOUND))
+        self.add_int_to_stack(self._random_generator.next_value())
 
-    def perform_operand(self, operator: Operator):
-        if len(self._memory) == 1:
+    def perform_operand(self, operator: Operator) -> int:
+        if self._top == 0:
             raise UnderflowError("Stack underflow.")
         else:
-            output = operator.perform_operation(self._memory[-2], self._memory[-1])
-            self._memory[-2] = output
-            self._memory = self._memory[:-1]
+            top = self._top
+            memory = self._memory
+            result = memory[top - 1] = operator.perform_operation(memory[top - 1], memory[top])
+            self._top = top - 1
+            return result
@@ -1,45 +1,62 @@
-from typing import Tuple, Union
+from __future__ import annotations
 
 from SRPN.lexer.string_types import StringTypes
 from SRPN.lexer.substrings import Substring
-from SRPN.tokens import command, operand, operators, token
+from SRPN.tokens import token
+from SRPN.tokens.tokenizer import Tokenizer
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Iterator, Tuple, Union
 
-class AdvancedTokenizer:
-    _STRING_VALUE_OF_ZERO = "0"
 
-    def read_substrings(self, substrings: Tuple[Substring, ...]) -> Tuple[token.Token, ...]:
-        # I know this is an unintuitive function but I find it both funny and clean so it stays :P
-        tokens = (self._convert_substring_to_token(substring) for substring in substrings)
-        tokens = tuple(_token for _token in tokens if _token)
-        return tokens
+class AdvancedTokenizer(Tokenizer):
+    # Unrecognised substrings are reported rather than read as zero, so they are left out of the table.
+    _TOKEN_TABLE: Dict[int, token.Token] = {
+        string_type: _token for string_type, _token in Tokenizer._TOKEN_TABLE.items()
+        if string_type != StringTypes.NON_VALUE
+    }
 
-    @staticmethod
-    def _convert_substring_to_token(substring: Substring) -> Union[token.Token, None]:
-        if substring.get_string_type() == StringTypes.SPACE_CHARACTER:
-            return None
-        elif substring.get_string_type() == StringTypes.PLUS:
-            return operators.Addition()
-        elif substring.get_string_type() == StringTypes.MINUS:
-            return operators.Subtraction()
-        elif substring.get_string_type() == StringTypes.MULTIPLY:
-            return operators.Product()
-        elif substring.get_string_type() == StringTypes.DIVIDE:
-            return operators.Quotient()
-        elif substring.get_string_type() == StringTypes.MODULO:
-            return operators.Modulo()
-        elif substring.get_string_type() == StringTypes.EXPONENT:
-            return operators.Exponentiation()
-        elif substring.get_string_type() == StringTypes.DIGITS:
-            return operand.Operand(substring.get_string())
-        elif substring.get_string_type() == StringTypes.LETTER_D:
-            return command.OutputStack()
-        elif substring.get_string_type() == StringTypes.EQUALS:
-            return command.OutputTopOfStack()
-        elif substring.get_string_type() == StringTypes.HASHTAG:
-            return operand.Operand(AdvancedTokenizer._STRING_VALUE_OF_ZERO)
-        elif substring.get_string_type() == StringTypes.RANDOM:
-            return command.StoreRandomInteger()
-        elif substring.get_string_type() == StringTypes.NON_VALUE:
-            print(f'Unrecognised operator or operand "{substring.get_string()}".')
+    def read_substring_stream(self, substrings: Iterator[Substring]) -> Iterator[token.Token]:
+        """
+        Lazily convert a stream of substrings into tokens, for use with Lexer.read_stream. A whole line reports its
+        unrecognised substrings before any of its tokens are evaluated, so the reports of every streamed line and the
+        output of its tokens are held back until its line break, and written in that order. Memory still stays bounded
+        for a line that outputs nothing.
+        :param substrings: Iterator of substrings, with LINE_BREAK substrings marking the end of each line.
+        :return: Iterator of tokens.
+        """
+        substrings = iter(substrings)
+        line_ended = True
+        while line_ended:
+            line_ended = False
+            unrecognised = list()
+            with self._output_sink.capture() as line_output:
+                for substring in substrings:
+                    string_type = substring.get_string_type()
+                    if string_type == StringTypes.LINE_BREAK:
+                        line_ended = True
+                        break
+                    if string_type == StringTypes.NON_VALUE:
+                        unrecognised.append(substring.get_string())
+                        continue
+                    _token = super()._convert_substring_to_token(substring)
+                    if _token:
+                        yield _token
+            self.report_unrecognised(tuple(unrecognised))
+            for line in line_output:
+                self._output_sink.write_line(line)
+
+    def report_unrecognised(self, strings: Tuple[str, ...]) -> None:
+        """
+        Report substrings that are neither operators, operands nor commands.
+        :param strings: Strings of the unrecognised substrings.
+        """
+        for string in strings:
+            self._output_sink.write_line(f'Unrecognised operator or operand "{string}".')
+
+    def _convert_substring_to_token(self, substring: Substring) -> Union[token.Token, None]:
+        if substring.get_string_type() == StringTypes.NON_VALUE:
+            self.report_unrecognised((substring.get_string(),))
             return None
+        return super()._convert_substring_to_token(substring)
@@ -1,25 +1,35 @@
+from SRPN.output.output_sink import OutputSink
 from SRPN.stack.stack import Stack
 from SRPN.tokens.token import Token
 
 
 class Command(Token):
-    def perform_command(self, stack: Stack):
+    __slots__ = ()
+
+    def perform_command(self, stack: Stack, output_sink: OutputSink):
         NotImplementedError("Abstract class.")
 
 
 class OutputStack(Command):
-    def perform_command(self, stack: Stack):
-        for i in stack.get_stack_memory():
-            print(i)
+    __slots__ = ()
+
+    def perform_command(self, stack: Stack, output_sink: OutputSink):
+        write_line = output_sink.write_line
+        for i in stack.iter_stack_memory():
+            write_line(str(i))
 
 
 class OutputTopOfStack(Command):
-    def perform_command(self, stack: Stack):
+    __slots__ = ()
+
+    def perform_command(self, stack: Stack, output_sink: OutputSink):
         string = stack.get_equals()
-        print(string)
+        output_sink.write_line(str(string))
 
 
 class StoreRandomInteger(Command):
-    def perform_command(self, stack: Stack):
+    __slots__ = ()
+
+    def perform_command(self, stack: Stack, output_sink: OutputSink):
         string = stack.add_random_int_to_stack()
-        print(string)
+        output_sink.write_line(str(string))
@@ -1,6 +1,37 @@
+from __future__ import annotations
+
+import re
+import threading
+from contextlib import contextmanager
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Iterator, List
+
+
+class SaturationListeners(threading.local):
+    """
+    Listeners of the current thread, the last of which is told the bound of every integer saturated to one on it. A
+    session appends its listener while it evaluates lines on the thread and pops it afterwards, so the integers it
+    saturates are reported to it alone. The list is looked up once for both, which costs far less than a method call
+    where it is done for every line.
+    """
+
+    def __init__(self) -> None:
+        self.listeners: List[Callable[[int], None]] = list()
+
+
 class GeneralMethods:
     UPPER_BOUND = 2147483647
     LOWER_BOUND = -2147483648
+    # Any number with more significant digits than the bounds is outside of them.
+    _BOUND_DIGITS = len(str(UPPER_BOUND))
+    # Smallest number with more significant digits than the bounds.
+    OUT_OF_BOUNDS = 10 ** _BOUND_DIGITS
+    # Matching a run of zeros stops at the first other digit, and is far quicker over long runs than str.lstrip. It is
+    # compiled the first time a number too long for the bounds is read.
+    _leading_zeros_pattern = None
+    SATURATION_LISTENERS = SaturationListeners()
 
     @staticmethod
     def bound_output(integer: int) -> int:
@@ -11,8 +42,68 @@ class GeneralMethods:
         :return: The given integer within a valid range.
         """
         if integer > GeneralMethods.UPPER_BOUND:
+            GeneralMethods.report_saturation(GeneralMethods.UPPER_BOUND)
             return GeneralMethods.UPPER_BOUND
         elif integer < GeneralMethods.LOWER_BOUND:
+            GeneralMethods.report_saturation(GeneralMethods.LOWER_BOUND)
             return GeneralMethods.LOWER_BOUND
         else:
             return integer
+
+    @staticmethod
+    def report_saturation(bound: int) -> None:
+        """
+        :param bound: Bound an integer was saturated to, told to the last listener of the current thread if it has any.
+        """
+        listeners = GeneralMethods.SATURATION_LISTENERS.listeners
+        if listeners:
+            listeners[-1](bound)
+
+    @staticmethod
+    @contextmanager
+    def report_saturations(listener: Callable[[int], None]) -> Iterator[None]:
+        """
+        Report the integers saturated on the current thread to a listener until the context exits, then to the listener
+        before it again.
+        :param listener: Function called with the bound every time an integer is saturated to one.
+        """
+        listeners = GeneralMethods.SATURATION_LISTENERS.listeners
+        listeners.append(listener)
+        try:
+            yield
+        finally:
+            listeners.pop()
+
+    @staticmethod
+    def bound_digits(string: str) -> int:
+        """
+        Read a run of digits, optionally after a minus, within the upper and lower bounds of the SRPN calculator.
+        :param string: Digits to be read, which may be any unicode decimal digits.
+        :return: The value of the digits within a valid range.
+        """
+        return GeneralMethods.bound_output(GeneralMethods.read_digits(string))
+
+    @staticmethod
+    def read_digits(string: str) -> int:
+        """
+        Read a run of digits, optionally after a minus, without building an integer far beyond the bounds of the SRPN
+        calculator. Only the significant digits that fit in the bounds are ever converted.
+        :param string: Digits to be read, which may be any unicode decimal digits.
+        :return: The value of the digits, or OUT_OF_BOUNDS with their sign if they have more significant digits than the
+        bounds, which is beyond both bounds so it saturates the same way as the digits whichever sign they are given.
+        """
+        is_negative = string.startswith("-")
+        digits = string[1:] if is_negative else string
+        if len(digits) <= GeneralMethods._BOUND_DIGITS:
+            return int(string)
+        if not digits.isascii():
+            digits = "".join(str(int(digit)) for digit in digits)
+
+        if GeneralMethods._leading_zeros_pattern is None:
+            GeneralMethods._leading_zeros_pattern = re.compile("0*")
+        leading_zeros = GeneralMethods._leading_zeros_pattern.match(digits).end()
+        if len(digits) - leading_zeros > GeneralMethods._BOUND_DIGITS:
+            integer = GeneralMethods.OUT_OF_BOUNDS
+        else:
+            integer = int(digits[leading_zeros:]) if leading_zeros < len(digits) else 0
+        return -integer if is_negative else integer
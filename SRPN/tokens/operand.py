@@ -1,10 +1,30 @@
+from __future__ import annotations
+
 from SRPN.tokens.general_methods import GeneralMethods
 from SRPN.tokens.token import Token
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Tuple
+
 
 class Operand(Token):
-    def __init__(self, string: str):
-        self._value = GeneralMethods.bound_output(int(string))
+    __slots__ = ("_value", "_saturations")
+
+    def __init__(self, string: str, saturations: Tuple[int, ...] = ()):
+        value = GeneralMethods.read_digits(string)
+        if value > GeneralMethods.UPPER_BOUND:
+            value, saturations = GeneralMethods.UPPER_BOUND, saturations + (GeneralMethods.UPPER_BOUND,)
+        elif value < GeneralMethods.LOWER_BOUND:
+            value, saturations = GeneralMethods.LOWER_BOUND, saturations + (GeneralMethods.LOWER_BOUND,)
+        self._value = value
+        # Bounds of the integers saturated in making the operand, including those of any arithmetic folded into it.
+        # They are reported every time the operand is evaluated rather than once when it is made, as the same operand is
+        # given back for every line it is read in.
+        self._saturations = saturations
 
     def get_value(self) -> int:
         return self._value
+
+    def get_saturations(self) -> Tuple[int, ...]:
+        return self._saturations
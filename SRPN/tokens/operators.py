@@ -6,6 +6,7 @@ class Operator(token.Token):
     """
     Abstract Operator class to define the methods each Operator subclass must implement.
     """
+    __slots__ = ()
 
     def _error_check(self, operand1: int, operand2: int) -> bool:
         """
@@ -28,6 +29,7 @@ class Product(Operator):
     """
     Token for multiplication in the Parser.
     """
+    __slots__ = ()
 
     def _error_check(self, operand1: int, operand2: int) -> bool:
         """
@@ -52,6 +54,7 @@ class Quotient(Operator):
     """
     Token for division in the Parser.
     """
+    __slots__ = ()
 
     def _error_check(self, operand1: int, operand2: int) -> bool:
         """
@@ -83,6 +86,7 @@ class Addition(Operator):
     """
     Token for Addition in the Parser.
     """
+    __slots__ = ()
 
     def _error_check(self, operand1: int, operand2: int) -> bool:
         """
@@ -101,6 +105,7 @@ class Subtraction(Operator):
     """
     Token for subtraction in the Parser.
     """
+    __slots__ = ()
 
     def _error_check(self, operand1: int, operand2: int) -> bool:
         """
@@ -125,6 +130,7 @@ class Exponentiation(Operator):
     """
     Token for exponentiation in the Parser.
     """
+    __slots__ = ()
 
     def _error_check(self, operand1: int, operand2: int) -> bool:
         """
@@ -145,13 +151,37 @@ class Exponentiation(Operator):
         if not self._error_check(operand1, operand2):
             raise NegativeExponentError("Negative power.")
 
-        return general_methods.GeneralMethods.bound_output(operand1 ** operand2)
+        return general_methods.GeneralMethods.bound_output(self._saturating_power(operand1, operand2))
+
+    @staticmethod
+    def _saturating_power(base: int, exponent: int) -> int:
+        """
+        Raise base to a non-negative exponent without building a result that is known to be outside the calculator
+        bounds. A magnitude of at least 2 ** (bit_length - 1) raised to the exponent is at least 2 ** 32 once their
+        product reaches 32, beyond both bounds, so only the sign of the result is needed. Any result that is computed
+        in full is below 2 ** 63.
+        :param base: The operand to the left of the operator.
+        :param exponent: The operand to the right of the operator, not negative.
+        :return: The power, or a value beyond the bound it saturates to.
+        """
+        if exponent == 0 or base == 1:
+            return 1
+        if base == 0:
+            return 0
+        if base == -1:
+            return -1 if exponent & 1 else 1
+        if exponent * (abs(base).bit_length() - 1) >= 32:
+            if base < 0 and exponent & 1:
+                return general_methods.GeneralMethods.LOWER_BOUND - 1
+            return general_methods.GeneralMethods.UPPER_BOUND + 1
+        return base ** exponent
 
 
 class Modulo(Operator):
     """
     Token for performing modulus in the Parser.
     """
+    __slots__ = ()
 
     def _error_check(self, operand1: int, operand2: int) -> bool:
         """
@@ -1,2 +1,2 @@
 class Token:
-    pass
+    __slots__ = ()
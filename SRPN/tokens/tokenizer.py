@@ -1,12 +1,40 @@
-from typing import Tuple, Union
+from __future__ import annotations
 
 from SRPN.lexer.string_types import StringTypes
 from SRPN.lexer.substrings import Substring
+from SRPN.output.output_sink import OutputSink, STANDARD_OUTPUT
 from SRPN.tokens import command, operand, operators, token
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Iterator, Tuple, Union
+
 
 class Tokenizer:
     _STRING_VALUE_OF_ZERO = "0"
+    _OPERAND_CACHE_SIZE = 4096
+    # Operators and commands hold no state, so a single shared instance of each is handed out for every occurrence.
+    # Types missing from the table, such as spaces, produce no token.
+    _TOKEN_TABLE: Dict[int, token.Token] = {
+        StringTypes.PLUS: operators.Addition(),
+        StringTypes.MINUS: operators.Subtraction(),
+        StringTypes.MULTIPLY: operators.Product(),
+        StringTypes.DIVIDE: operators.Quotient(),
+        StringTypes.MODULO: operators.Modulo(),
+        StringTypes.EXPONENT: operators.Exponentiation(),
+        StringTypes.LETTER_D: command.OutputStack(),
+        StringTypes.EQUALS: command.OutputTopOfStack(),
+        StringTypes.HASHTAG: operand.Operand(_STRING_VALUE_OF_ZERO),
+        StringTypes.RANDOM: command.StoreRandomInteger(),
+        StringTypes.NON_VALUE: operand.Operand(_STRING_VALUE_OF_ZERO),
+    }
+
+    def __init__(self, output_sink: OutputSink = STANDARD_OUTPUT) -> None:
+        """
+        :param output_sink: Sink that unrecognised substrings are reported to.
+        """
+        self._operand_cache: Dict[str, operand.Operand] = dict()
+        self._output_sink = output_sink
 
     def read_substrings(self, substrings: Tuple[Substring, ...]) -> Tuple[token.Token, ...]:
         # I know this is an unintuitive function but I find it both funny and clean so it stays :P
@@ -14,31 +42,45 @@ class Tokenizer:
         tokens = tuple(_token for _token in tokens if _token)
         return tokens
 
-    @staticmethod
-    def _convert_substring_to_token(substring: Substring) -> Union[token.Token, None]:
-        if substring.get_string_type() == StringTypes.SPACE_CHARACTER:
-            return None
-        elif substring.get_string_type() == StringTypes.PLUS:
-            return operators.Addition()
-        elif substring.get_string_type() == StringTypes.MINUS:
-            return operators.Subtraction()
-        elif substring.get_string_type() == StringTypes.MULTIPLY:
-            return operators.Product()
-        elif substring.get_string_type() == StringTypes.DIVIDE:
-            return operators.Quotient()
-        elif substring.get_string_type() == StringTypes.MODULO:
-            return operators.Modulo()
-        elif substring.get_string_type() == StringTypes.EXPONENT:
-            return operators.Exponentiation()
-        elif substring.get_string_type() == StringTypes.DIGITS:
-            return operand.Operand(substring.get_string())
-        elif substring.get_string_type() == StringTypes.LETTER_D:
-            return command.OutputStack()
-        elif substring.get_string_type() == StringTypes.EQUALS:
-            return command.OutputTopOfStack()
-        elif substring.get_string_type() == StringTypes.HASHTAG:
-            return operand.Operand(Tokenizer._STRING_VALUE_OF_ZERO)
-        elif substring.get_string_type() == StringTypes.RANDOM:
-            return command.StoreRandomInteger()
-        elif substring.get_string_type() == StringTypes.NON_VALUE:
-            return operand.Operand(Tokenizer._STRING_VALUE_OF_ZERO)
+    def read_substring_stream(self, substrings: Iterator[Substring]) -> Iterator[token.Token]:
+        """
+        Lazily convert a stream of substrings into tokens, for use with Lexer.read_stream.
+        :param substrings: Iterator of substrings.
+        :return: Iterator of tokens.
+        """
+        for substring in substrings:
+            _token = self._convert_substring_to_token(substring)
+            if _token:
+                yield _token
+
+    def reads_unrecognised_as_zero(self) -> bool:
+        """
+        :return: Whether substrings that are neither operators, operands nor commands become an operand of zero.
+        """
+        return StringTypes.NON_VALUE in self._TOKEN_TABLE
+
+    def report_unrecognised(self, strings: Tuple[str, ...]) -> None:
+        """
+        Report substrings that are neither operators, operands nor commands. They are read as zero here, so there is
+        nothing to report.
+        :param strings: Strings of the unrecognised substrings.
+        """
+
+    def _convert_substring_to_token(self, substring: Substring) -> Union[token.Token, None]:
+        string_type = substring.get_string_type()
+        if string_type == StringTypes.DIGITS:
+            return self._get_operand(substring.get_string())
+        return self._TOKEN_TABLE.get(string_type)
+
+    def _get_operand(self, string: str) -> operand.Operand:
+        """
+        Operands are immutable, so repeated literals share the operand created for their first occurrence.
+        :param string: String of the operand.
+        :return: Operand for the string.
+        """
+        _operand = self._operand_cache.get(string)
+        if _operand is None:
+            if len(self._operand_cache) == self._OPERAND_CACHE_SIZE:
+                self._operand_cache.clear()
+            _operand = self._operand_cache[string] = operand.Operand(string)
+        return _operand
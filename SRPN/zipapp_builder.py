@@ -0,0 +1,88 @@
+"""
+Builder of the calculator as a single file zipapp with every module precompiled, run with
+``python -m SRPN.zipapp_builder --output srpn.pyz`` and then ``python srpn.pyz`` in place of ``python SRPN/srpn.py``.
+"""
+import argparse
+import os
+import py_compile
+import stat
+import tempfile
+import zipfile
+
+
+class ZipappBuilder:
+    """
+    Archives the package uncompressed, so modules are read without inflating them, along with bytecode compiled for the
+    running interpreter. The bytecode sits beside every module where zipimport looks for it and is never checked
+    against the module, as an archive cannot change. Interpreters with a different bytecode format read the modules.
+    """
+    _PACKAGE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+    _PACKAGE_NAME = os.path.basename(_PACKAGE_DIRECTORY)
+    # Run the same way as the script, so the archive behaves exactly as python SRPN/srpn.py does.
+    _MAIN_SOURCE = 'import runpy\n\nrunpy.run_module("{module}", run_name="__main__", alter_sys=True)\n'
+
+    def __init__(self, advanced: bool = False, interpreter: str = None) -> None:
+        """
+        :param advanced: Run srpn_advanced.py rather than srpn.py.
+        :param interpreter: Interpreter written on the first line of the archive so it can be run directly, such as
+        "/usr/bin/env python3", none if not given.
+        """
+        self._main_module = f"{self._PACKAGE_NAME}.{'srpn_advanced' if advanced else 'srpn'}"
+        self._interpreter = interpreter
+
+    def build(self, path: str) -> None:
+        """
+        :param path: Path the archive is written to.
+        """
+        with open(path, "wb") as archive_file:
+            if self._interpreter:
+                archive_file.write(f"#!{self._interpreter}\n".encode())
+            with zipfile.ZipFile(archive_file, "w", zipfile.ZIP_STORED) as archive, \
+                    tempfile.TemporaryDirectory() as directory:
+                main_path = os.path.join(directory, "__main__.py")
+                with open(main_path, "w", encoding="utf-8") as main_file:
+                    main_file.write(self._MAIN_SOURCE.format(module=self._main_module))
+                self._add_module(archive, main_path, "__main__.py", directory)
+
+                for source_path, archive_name in self._find_modules():
+                    self._add_module(archive, source_path, archive_name, directory)
+
+        if self._interpreter:
+            os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    def _find_modules(self):
+        """
+        :return: Iterator of the path of every module of the package and its name in the archive.
+        """
+        parent_directory = os.path.dirname(self._PACKAGE_DIRECTORY)
+        for directory, subdirectories, file_names in os.walk(self._PACKAGE_DIRECTORY):
+            subdirectories[:] = sorted(name for name in subdirectories if name != "__pycache__")
+            for file_name in sorted(file_names):
+                if file_name.endswith(".py"):
+                    source_path = os.path.join(directory, file_name)
+                    yield source_path, os.path.relpath(source_path, parent_directory).replace(os.sep, "/")
+
+    @staticmethod
+    def _add_module(archive: zipfile.ZipFile, source_path: str, archive_name: str, directory: str) -> None:
+        """
+        :param archive: Archive the module and its bytecode are written to.
+        :param source_path: Path of the module.
+        :param archive_name: Name of the module in the archive.
+        :param directory: Directory the bytecode is compiled into.
+        """
+        bytecode_path = os.path.join(directory, "module.pyc")
+        py_compile.compile(
+            source_path, bytecode_path, archive_name, doraise=True,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH
+        )
+        archive.write(source_path, archive_name)
+        archive.write(bytecode_path, f"{archive_name}c")
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Build the calculator as a single file zipapp.")
+    argument_parser.add_argument("--output", default="srpn.pyz", help="path the archive is written to")
+    argument_parser.add_argument("--advanced", action="store_true", help="run srpn_advanced.py rather than srpn.py")
+    argument_parser.add_argument("--python", help="interpreter the archive is run with when executed directly")
+    parsed_arguments = argument_parser.parse_args()
+    ZipappBuilder(parsed_arguments.advanced, parsed_arguments.python).build(parsed_arguments.output)
@@ -0,0 +1,308 @@
+"""
+Behaviour checks of the modules otherwise only run by benchmarks: the session snapshot format, the parameter sweep, the
+metrics registry and the batch runner. Each check compares a module against the Parser or a Session evaluating the same
+input line by line, or against values worked out by hand, and reports the first behaviour that differs.
+
+Run from the repository root with ``python -m benchmarks.behaviour``, NumPy is required. It exits with status 1 if any
+check fails.
+"""
+import os
+import random
+import struct
+import sys
+import tempfile
+from typing import Callable, Dict, List
+
+import numpy
+
+from SRPN.batch.parameter_sweep import ParameterSweep
+from SRPN.batch.session_runner import SessionRunner, run_session
+from SRPN.lexer.lexer import Lexer
+from SRPN.output.output_sink import ListOutputSink
+from SRPN.parse.parser import Parser
+from SRPN.profiling.metrics_registry import MetricsRegistry
+from SRPN.session.session import Session
+from SRPN.session.snapshot import SessionSnapshot
+from SRPN.stack.stack import Stack
+from SRPN.tokens.tokenizer import Tokenizer
+from benchmarks.differential import random_session
+
+SESSIONS = 200
+LANES = 300
+# Header of a snapshot record: magic, version, flags, stack capacity and stack depth, see SessionSnapshot.
+_SNAPSHOT_HEADER = struct.Struct("<4sBBII")
+# Sweep scripts with the range their bindings are drawn from, those joining a minus to a placeholder only bind values
+# that are not negative, as substituting a negative literal there would read as a run of minuses.
+_SWEEP_SCRIPTS = (
+    ("$0 $1 * 3 + $0 -7 %\n2 ^ / $1 - =", -100_000, 100_000),
+    ("$0 $1 / = $0 $1 % = $0 $1 ^ =", -40, 40),
+    ("$0 $1 + = $0 $1 - = $0 $1 * =", -3_000_000_000, 3_000_000_000),
+    ("= $0 + + 1 2 3 4 5 = r r $1 * + =", -10, 10),
+    ("-$0 $1 - = 10 -$1 ^ =", 0, 20),
+)
+# Error written by the Parser for every error flag of a sweep.
+_SWEEP_ERRORS = {
+    "Divide by 0.": "divide_by_zero",
+    "Negative power.": "negative_power",
+    "Stack underflow.": "underflow",
+    "Stack overflow.": "overflow",
+    "Stack Empty": "stack_empty",
+}
+
+
+class CheckFailed(Exception):
+    """
+    A module behaved differently from what its check expects.
+    """
+
+
+def _expect(condition: bool, message: str) -> None:
+    """
+    :param condition: Behaviour the check expects.
+    :param message: Description of the behaviour, reported if it did not happen.
+    :raises CheckFailed: If the condition is false.
+    """
+    if not condition:
+        raise CheckFailed(message)
+
+
+def _run_lines(session: Session, lines: List[str]) -> str:
+    """
+    :param session: Session the lines are evaluated in.
+    :param lines: Lines evaluated one at a time.
+    :return: Everything the lines printed.
+    """
+    return "".join(session.process_command(line, return_output=True) for line in lines)
+
+
+def check_snapshot_round_trip() -> None:
+    """
+    A session restored from a snapshot, into a session of another capacity, continues exactly as the one snapshotted,
+    however far its generator has drawn and with a comment left open.
+    """
+    random_generator = random.Random(1)
+    for index in range(SESSIONS):
+        lines = random_session(random_generator)
+        capacity = random_generator.choice((3, Stack.DEFAULT_CAPACITY, 400))
+        split = random_generator.randint(0, len(lines))
+        prefix = lines[:split] + random_generator.choice(([], ["r " * 300], ["# open comment"]))
+        original = Session(stack_capacity=capacity)
+        _run_lines(original, prefix)
+        restored = Session(stack_capacity=Stack.DEFAULT_CAPACITY if capacity != Stack.DEFAULT_CAPACITY else 5)
+        restored.restore(original.snapshot())
+        _expect(restored.snapshot() == original.snapshot(), f"session {index} snapshots differently once restored")
+        _expect(_run_lines(restored, lines[split:]) == _run_lines(original, lines[split:]),
+                f"session {index} prints differently once restored")
+        _expect(restored.get_stack().get_stack_memory() == original.get_stack().get_stack_memory(),
+                f"session {index} leaves a different stack once restored")
+
+
+def check_snapshot_rejects_corrupt_records() -> None:
+    """
+    A truncated, corrupt or unknown record raises ValueError and leaves the session restored into as it was, in a
+    batch every session.
+    """
+    source = Session(stack_capacity=40)
+    _run_lines(source, ["1 2 3 r r", "r " * 200, "#"])
+    record = source.snapshot()
+    magic, version, flags, _, depth = _SNAPSHOT_HEADER.unpack_from(record, 0)
+    corrupt_records = [record[:length] for length in range(len(record))]
+    for fields in ((b"SRPX", version, flags, 40, depth), (magic, version + 1, flags, 40, depth),
+                   (magic, version, flags, 0xFFFFFFFF, depth), (magic, version, flags, 0, depth),
+                   (magic, version, flags, 40, 41),
+                   (magic, version, flags | SessionSnapshot.FLAG_NEW_STACK, 40, depth)):
+        corrupt_record = bytearray(record)
+        _SNAPSHOT_HEADER.pack_into(corrupt_record, 0, *fields)
+        corrupt_records.append(bytes(corrupt_record))
+
+    target = Session()
+    _run_lines(target, ["5 6 r"])
+    state = target.snapshot()
+    for corrupt_record in corrupt_records:
+        try:
+            target.restore(corrupt_record)
+        except ValueError:
+            pass
+        else:
+            raise CheckFailed(f"a corrupt record of {len(corrupt_record)} bytes was restored")
+        _expect(target.snapshot() == state, "a corrupt record changed the session restored into")
+
+    targets = [Session(), Session()]
+    _run_lines(targets[1], ["7 8 9"])
+    states = [session.snapshot() for session in targets]
+    batch = Session.snapshot_many([source, source])
+    corrupt_batch = bytearray(batch)
+    # The second record loses its magic, so the first is read and checked but must not be restored.
+    corrupt_batch[SessionSnapshot.unpack_batch_header(batch)[1]] ^= 0xFF
+    try:
+        Session.restore_many(corrupt_batch, targets)
+    except ValueError:
+        pass
+    else:
+        raise CheckFailed("a batch holding a corrupt record was restored")
+    _expect([session.snapshot() for session in targets] == states, "a corrupt batch changed a session")
+    Session.restore_many(batch, targets)
+    _expect(all(session.snapshot() == record for session in targets), "a batch restored differently")
+
+
+def check_parameter_sweep() -> None:
+    """
+    Every lane of a sweep prints, flags and leaves what the Parser does evaluating the script with the lane's values in
+    place of the placeholders.
+    """
+    random_generator = random.Random(2)
+    for script, low, high in _SWEEP_SCRIPTS:
+        bindings = numpy.array(
+            [[random_generator.randint(low, high) for _ in range(2)] for _ in range(LANES)], dtype=numpy.int64
+        )
+        result = ParameterSweep(script).evaluate(bindings)
+        for lane, (value0, value1) in enumerate(bindings.tolist()):
+            output_sink, lexer, stack = ListOutputSink(), Lexer(), Stack()
+            tokenizer, parser = Tokenizer(output_sink), Parser(output_sink)
+            for line in script.replace("$0", str(value0)).replace("$1", str(value1)).split("\n"):
+                parser.read_tokens(stack, tokenizer.read_substrings(lexer.read_user_input(line)))
+            # Every r prints None, as it always has, which a sweep has no output for.
+            printed = [line for line in output_sink.get_output().splitlines() if line != "None"]
+            outputs = [int(line) for line in printed if line not in _SWEEP_ERRORS]
+            errors = {_SWEEP_ERRORS[line] for line in printed if line in _SWEEP_ERRORS}
+            context = f"script {script!r} with {value0}, {value1}"
+            valid = result.get_output_valid()[lane]
+            _expect(result.get_outputs()[lane][valid].tolist() == outputs, f"{context} outputs differently")
+            _expect({name for name, flags in result.get_error_flags().items() if flags[lane]} == errors,
+                    f"{context} flags different errors")
+            depth = int(result.get_depths()[lane])
+            _expect(tuple(result.get_stacks()[lane][:depth].tolist()) == tuple(stack.get_stack_memory()),
+                    f"{context} leaves a different stack")
+            _expect(result.is_new_stack() == stack.is_new_stack(), f"{context} leaves a stack of another kind")
+    try:
+        ParameterSweep("$0 d")
+    except ValueError:
+        pass
+    else:
+        raise CheckFailed("a sweep accepted the d command")
+
+
+def check_metrics_counts() -> None:
+    """
+    A registry counts the lines, tokens, errors and saturations of its own sessions alone, every time a line is
+    evaluated, cached, folded or compiled.
+    """
+    lines = ["2147483648 1 +", "1 0 /", "2147483647 1 +", "=", "-99999999999", "1 0 /", "2147483648 1 +"]
+    for options in ({}, {"constant_folding": False}, {"hot_threshold": 1}, {"cache_size": 0}):
+        metrics, other_metrics = MetricsRegistry(), MetricsRegistry()
+        session = Session(metrics=metrics, stack_capacity=8, **options)
+        other_session = Session(metrics=other_metrics, **options)
+        for line in lines:
+            session.process_command(line)
+            other_session.process_command("1")
+        state = metrics.get_state()
+        context = f"a session with {options or 'default options'}"
+        _expect(state["lines"] == len(lines), f"{context} counts {state['lines']} lines")
+        _expect(state["errors"] == {"ZeroDivisionError": 2, "OverflowError": 1},
+                f"{context} counts the errors {state['errors']}")
+        # Both 2147483648 saturate when read, as does -99999999999, and the first two sums when added, folded or not.
+        # The last 1 overflows the stack, so the last sum adds 2147483647 to 0.
+        _expect(state["saturations"] == {"upper": 4, "lower": 1},
+                f"{context} counts the saturations {state['saturations']}")
+        other_state = other_metrics.get_state()
+        _expect(other_state["lines"] == len(lines) and not other_state["saturations"],
+                f"{context} counts in the registry of another session")
+
+
+def check_metrics_export() -> None:
+    """
+    Histogram buckets hold values up to their bound included, merged states add up and the exported file is the
+    exposition.
+    """
+    metrics = MetricsRegistry()
+    # Microseconds and tokens of every line, each at or just past a bucket bound.
+    for microseconds, tokens in ((1, 1), (1.5, 2), (2, 3), (4, 4), (100_000_000, 7)):
+        metrics.record_line(microseconds / 1_000_000, (None,) * tokens)
+    exposition = metrics.format_prometheus().splitlines()
+    for sample in ('srpn_line_seconds_bucket{le="1e-06"} 1', 'srpn_line_seconds_bucket{le="2e-06"} 3',
+                   'srpn_line_seconds_bucket{le="4e-06"} 4', 'srpn_line_seconds_bucket{le="+Inf"} 5',
+                   'srpn_line_tokens_bucket{le="1"} 1', 'srpn_line_tokens_bucket{le="3"} 3',
+                   'srpn_line_tokens_bucket{le="7"} 5', "srpn_line_tokens_sum 17", "srpn_line_tokens_count 5",
+                   "srpn_lines_total 5"):
+        _expect(sample in exposition, f"the exposition lacks {sample}")
+
+    merged = MetricsRegistry()
+    merged.merge_state(metrics.get_state())
+    merged.merge_state(metrics.get_state())
+    _expect(merged.get_state()["tokens"] == 34, "merging two states does not add their tokens")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "srpn.prom")
+        metrics.write_prometheus(path)
+        with open(path, encoding="utf-8") as metrics_file:
+            written = metrics_file.read().splitlines()
+        # Only the rate of lines changes between the two.
+        exposition = metrics.format_prometheus().splitlines()
+        _expect([line for line in written if not line.startswith("srpn_lines_per_second ")]
+                == [line for line in exposition if not line.startswith("srpn_lines_per_second ")],
+                "the written metrics differ")
+        _expect(os.listdir(directory) == ["srpn.prom"], "writing the metrics left a temporary file")
+
+
+def check_batch_runner() -> None:
+    """
+    A batch prints what every session does run alone, in order, and an input that cannot be read fails its own session
+    alone.
+    """
+    random_generator = random.Random(3)
+    sessions = ["\n".join(random_session(random_generator)) + "\n" for _ in range(20)]
+    with tempfile.TemporaryDirectory() as directory:
+        for index, user_input in enumerate(sessions):
+            with open(os.path.join(directory, f"{index:02}"), "w", encoding="utf-8", newline="\n") as session_input:
+                session_input.write(user_input)
+        manifest_path = os.path.join(directory, "manifest")
+        with open(manifest_path, "w", encoding="utf-8") as manifest:
+            manifest.write("03\nmissing\n01\n")
+
+        paths = SessionRunner.find_session_inputs(directory)
+        paths.remove(manifest_path)
+        results = SessionRunner(workers=2, chunk_size=3, collect_metrics=True).run(paths)
+        _expect([result.get_output() for result in results] == [run_session(text) for text in sessions],
+                "a batch prints differently from its sessions run alone")
+        _expect(all(result.get_error() is None for result in results), "a readable input failed")
+        metrics = MetricsRegistry()
+        SessionRunner.merge_metrics(results, metrics)
+        line_count = sum(len(text.splitlines()) for text in sessions)
+        _expect(metrics.get_state()["lines"] == line_count, "the metrics of a batch miss lines")
+
+        results = SessionRunner(workers=2).run(SessionRunner.find_session_inputs(manifest_path))
+        _expect([result.get_error() is not None for result in results] == [False, True, False],
+                "an unreadable input was not reported alone")
+        _expect([results[0].get_output(), results[2].get_output()] == [run_session(sessions[3]),
+                                                                       run_session(sessions[1])],
+                "the sessions beside an unreadable input print differently")
+
+
+CHECKS: Dict[str, Callable[[], None]] = {
+    "snapshot round trip": check_snapshot_round_trip,
+    "snapshot corrupt records": check_snapshot_rejects_corrupt_records,
+    "parameter sweep": check_parameter_sweep,
+    "metrics counts": check_metrics_counts,
+    "metrics export": check_metrics_export,
+    "batch runner": check_batch_runner,
+}
+
+
+def run() -> bool:
+    """
+    Print whether every check passed, with the first behaviour that differs for those that failed.
+    :return: Whether every check passed.
+    """
+    all_passed = True
+    for name, check in CHECKS.items():
+        try:
+            check()
+        except CheckFailed as e:
+            all_passed = False
+            print(f"{name:<32} FAILED: {e}")
+        else:
+            print(f"{name:<32} ok")
+    return all_passed
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run() else 1)
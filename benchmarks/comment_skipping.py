@@ -0,0 +1,66 @@
+"""
+Benchmark comparing comment removal after decomposition with skipping comment bodies before decomposition.
+
+Run from the repository root with ``python -m benchmarks.comment_skipping``.
+"""
+import timeit
+from typing import Tuple
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.lexer.scanner import Scanner
+
+COMMENT_FRACTIONS = (0.5, 0.9, 0.99)
+LINE_LENGTH = 100_000
+_CODE = "1 2 + d "
+_COMMENT_TEXT = "the sum of 1 and 2, printed with d - see #12 "
+
+
+def generate_line(comment_fraction: float, length: int = LINE_LENGTH) -> str:
+    """
+    Build an annotated line where roughly the given fraction of characters sits inside comments.
+    :param comment_fraction: Fraction of the line that is comment text.
+    :param length: Number of characters in the line.
+    :return: The generated line.
+    """
+    comment_length = round(len(_CODE) * comment_fraction / (1 - comment_fraction))
+    comment_body = (_COMMENT_TEXT * (comment_length // len(_COMMENT_TEXT) + 1))[:comment_length]
+    block = f"{_CODE}# {comment_body} # "
+    return (block * (length // len(block) + 1))[:length]
+
+
+def time_removal_after_decomposition(line: str) -> float:
+    """
+    :param line: Line to lex.
+    :return: Best time in seconds to decompose the whole line and then remove the comment substrings.
+    """
+    lexer = Lexer()
+    return min(timeit.repeat(
+        lambda: lexer._verify_hashtag_commands(Scanner.decompose_command(line)), number=1, repeat=5
+    ))
+
+
+def time_skipping(line: str) -> float:
+    """
+    :param line: Line to lex.
+    :return: Best time in seconds to decompose only the parts of the line outside of comments.
+    """
+    lexer = Lexer()
+    return min(timeit.repeat(lambda: lexer._decompose_uncommented_command(line), number=1, repeat=5))
+
+
+def run(comment_fractions: Tuple[float, ...] = COMMENT_FRACTIONS) -> None:
+    """
+    Print both timings for lines with increasing amounts of comment text.
+    :param comment_fractions: Fractions of comment text to sweep.
+    """
+    print(f"{'comment':>8} {'remove after (s)':>17} {'skip (s)':>10} {'speedup':>9}")
+    for comment_fraction in comment_fractions:
+        line = generate_line(comment_fraction)
+        removal_time = time_removal_after_decomposition(line)
+        skipping_time = time_skipping(line)
+        speedup = removal_time / skipping_time
+        print(f"{comment_fraction:8.0%} {removal_time:17.4f} {skipping_time:10.4f} {speedup:8.1f}x")
+
+
+if __name__ == '__main__':
+    run()
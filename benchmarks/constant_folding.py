@@ -0,0 +1,42 @@
+"""
+Benchmark of sessions evaluating repeated lines of literal arithmetic with and without constant folding, along with a
+line that cannot be folded to show the cost of choosing between the folded and original tokens.
+
+Run from the repository root with ``python -m benchmarks.constant_folding``.
+"""
+import timeit
+
+from SRPN.session.session import Session
+from SRPN.tokens.general_methods import GeneralMethods
+
+_LINES = {
+    "literal arithmetic": "3 4 + 5 * 2 - 7 % 9 9 * + 2147483647 * 10 / 1 2 3 4 5 6 + + + + + -",
+    "mixed": "r 3 4 + * 2 ^ 9 - = 1 2 + 3 * 4 + 5 * +",
+    "unfoldable": "+ + d 1 + r * =",
+}
+REPETITIONS = 20_000
+
+
+def run(repetitions: int = REPETITIONS) -> None:
+    """
+    Print the time taken to evaluate every line repeatedly with and without folding.
+    :param repetitions: Number of times every line is evaluated.
+    """
+    for name, line in _LINES.items():
+        timings = dict()
+        for constant_folding in (False, True):
+            session = Session(constant_folding=constant_folding)
+
+            def evaluate() -> None:
+                for _ in range(repetitions):
+                    # Clearing the stack keeps every evaluation starting from the same depth.
+                    session.get_stack().set_state((GeneralMethods.LOWER_BOUND,), True)
+                    session.process_command(line, return_output=True)
+
+            timings[constant_folding] = min(timeit.repeat(evaluate, number=1, repeat=3))
+        print(f"{name:<20} unfolded {timings[False] / repetitions * 1e6:6.2f} us/line  "
+              f"folded {timings[True] / repetitions * 1e6:6.2f} us/line  ({timings[False] / timings[True]:.2f}x)")
+
+
+if __name__ == '__main__':
+    run()
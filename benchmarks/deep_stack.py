@@ -0,0 +1,38 @@
+"""
+Benchmark of pushes and binary operations on stacks of increasing depth, the cost of each should not grow with depth.
+
+Run from the repository root with ``python -m benchmarks.deep_stack``.
+"""
+import time
+
+from SRPN.stack.stack import Stack
+from SRPN.tokens.operators import Addition
+
+DEPTHS = (23, 1_000, 100_000, 1_000_000)
+
+
+def run(depths: tuple = DEPTHS) -> None:
+    """
+    Print the time taken to fill a stack of every depth and to reduce it back to one value with additions.
+    :param depths: Stack capacities to fill.
+    """
+    addition = Addition()
+    for depth in depths:
+        stack = Stack(depth)
+
+        start = time.perf_counter()
+        for value in range(depth):
+            stack.add_int_to_stack(value % 7)
+        push_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(depth - 1):
+            stack.perform_operand(addition)
+        operation_time = time.perf_counter() - start
+
+        print(f"depth {depth:>9}: push {push_time / depth * 1e9:7.1f} ns/op, "
+              f"add {operation_time / max(depth - 1, 1) * 1e9:7.1f} ns/op, top {stack.get_equals()}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,276 @@
+"""
+Differential check of the evaluation paths that replace the Parser, over randomly generated sessions. The reference
+is the Parser evaluating the tokens of every line as they are typed, the rest must give the same output and leave the
+same stack, at every stack capacity. Sessions mix literals beyond the bounds, every error, comments and runs of minuses.
+Half the lines of a session repeat earlier ones, so tiered sessions compile them. Scripts are written to a temporary
+file and run as with ``--script``.
+As a change shared by the Parser and every other path would go unnoticed, the Parser and every path are also checked
+against the output recorded from ``srpn.py`` before any of them was written, in ``differential_baseline.json``, for
+the inputs of the ``t-*`` fixture directories and random sessions at the default stack capacity, the only one it had.
+
+Run from the repository root with ``python -m benchmarks.differential``, it exits with status 1 if any output differs.
+The recorded output is made again from a checkout of that code with ``--record PATH``.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+from SRPN.batch.session_runner import SessionRunner
+from SRPN.lexer.lexer import Lexer
+from SRPN.output.output_sink import ListOutputSink
+from SRPN.parse.compiler import Compiler
+from SRPN.parse.parser import Parser
+from SRPN.parse.virtual_machine import VirtualMachine
+from SRPN.session.session import Session
+from SRPN.stack.stack import Stack
+from SRPN.tokens.advanced_tokenizer import AdvancedTokenizer
+from SRPN.tokens.tokenizer import Tokenizer
+
+_PIECES = (
+    "1", "2", "3", "17", "0", "-1", "-2", "10", "2147483647", "-2147483648", "2147483648", "99999999999",
+    "-99999999999", "0000000000003", "٣",
+    "+", "-", "*", "/", "%", "^", "=", "d", "r", "#", "--", "- -", "3--2", "x", " ",
+)
+_CAPACITIES = (1, 2, 3, 5, Stack.DEFAULT_CAPACITY, 40)
+SESSIONS = 400
+LINES = 12
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "differential_baseline.json")
+BASELINE_SESSIONS = 100
+# Exponents of literals beyond the bounds took the code before the evaluation paths minutes, such sessions are left out.
+_BASELINE_TIMEOUT = 10
+_FIXTURE_DIRECTORIES = ("t-advanced", "t-advanced2", "t-multiple", "t-obscure", "t-saturation", "t-single")
+
+# Output of a session and the state its stack is left in.
+Result = Tuple[str, Tuple[int, ...], bool]
+
+
+def random_session(random_generator: random.Random, line_count: int = LINES) -> List[str]:
+    """
+    :param random_generator: Generator the session is drawn from.
+    :param line_count: Number of lines in the session.
+    :return: Lines of the session.
+    """
+    lines = list()
+    for _ in range(line_count):
+        # Half the lines repeat an earlier one, so tiered sessions compile them.
+        if lines and random_generator.random() < 0.5:
+            lines.append(random_generator.choice(lines))
+        else:
+            lines.append(" ".join(random_generator.choice(_PIECES) for _ in range(random_generator.randint(0, 16))))
+    return lines
+
+
+def _make_tokenizer(advanced: bool, output_sink: ListOutputSink) -> Tokenizer:
+    """
+    :param advanced: Report unrecognised substrings instead of reading them as 0.
+    :param output_sink: Sink unrecognised substrings are reported to.
+    :return: Tokenizer of the mode.
+    """
+    return AdvancedTokenizer(output_sink) if advanced else Tokenizer(output_sink)
+
+
+def _run_parser(lines: List[str], advanced: bool, capacity: int) -> Result:
+    """
+    :param lines: Lines of the session.
+    :param advanced: Run the session in advanced mode.
+    :param capacity: Capacity of the stack.
+    :return: Result of the Parser evaluating the tokens of every line in turn.
+    """
+    output_sink, lexer, stack = ListOutputSink(), Lexer(), Stack(capacity)
+    tokenizer, parser = _make_tokenizer(advanced, output_sink), Parser(output_sink)
+    for line in lines:
+        parser.read_tokens(stack, tokenizer.read_substrings(lexer.read_user_input(line)))
+    return output_sink.get_output(), stack.get_stack_memory(), stack.is_new_stack()
+
+
+def _run_virtual_machine(lines: List[str], advanced: bool, capacity: int) -> Result:
+    """
+    :param lines: Lines of the session.
+    :param advanced: Run the session in advanced mode.
+    :param capacity: Capacity of the stack.
+    :return: Result of the VirtualMachine running the instructions compiled for every line in turn.
+    """
+    output_sink, lexer, stack = ListOutputSink(), Lexer(), Stack(capacity)
+    tokenizer, virtual_machine = _make_tokenizer(advanced, output_sink), VirtualMachine(output_sink)
+    for line in lines:
+        virtual_machine.run(stack, Compiler.compile_tokens(tokenizer.read_substrings(lexer.read_user_input(line))))
+    return output_sink.get_output(), stack.get_stack_memory(), stack.is_new_stack()
+
+
+def _get_session_result(session: Session) -> Result:
+    """
+    :param session: Session that has run.
+    :return: Result of the session.
+    """
+    stack = session.get_stack()
+    return session.get_output_sink().get_output(), stack.get_stack_memory(), stack.is_new_stack()
+
+
+def _run_folded_session(lines: List[str], advanced: bool, capacity: int) -> Result:
+    """
+    :param lines: Lines of the session.
+    :param advanced: Run the session in advanced mode.
+    :param capacity: Capacity of the stack.
+    :return: Result of a session evaluating every line with its literal arithmetic folded.
+    """
+    session = Session(advanced, stack_capacity=capacity, constant_folding=True)
+    for line in lines:
+        session.process_command(line)
+    return _get_session_result(session)
+
+
+def _run_tiered_session(lines: List[str], advanced: bool, capacity: int, constant_folding: bool,
+                        hot_threshold: int) -> Result:
+    """
+    :param lines: Lines of the session.
+    :param advanced: Run the session in advanced mode.
+    :param capacity: Capacity of the stack.
+    :param constant_folding: Fold the literal arithmetic of lines before they are evaluated or compiled.
+    :param hot_threshold: Number of times a line is evaluated before it is compiled.
+    :return: Result of a session compiling its hot lines to Python functions.
+    """
+    session = Session(advanced, stack_capacity=capacity, constant_folding=constant_folding,
+                      hot_threshold=hot_threshold)
+    for line in lines:
+        session.process_command(line)
+    return _get_session_result(session)
+
+
+def _run_script(lines: List[str], advanced: bool, capacity: int) -> Result:
+    """
+    :param lines: Lines of the session.
+    :param advanced: Run the session in advanced mode.
+    :param capacity: Capacity of the stack.
+    :return: Result of a session running the lines as a script file, compiled from its bytes by the ByteCompiler.
+    """
+    session = Session(advanced, stack_capacity=capacity)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.srpn")
+        with open(path, "w", encoding="utf-8") as script_file:
+            script_file.write("".join(f"{line}\n" for line in lines))
+        session.process_file(path)
+    return _get_session_result(session)
+
+
+# Every path checked against the Parser, by name.
+PATHS: Dict[str, Callable[[List[str], bool, int], Result]] = {
+    "virtual machine": _run_virtual_machine,
+    "constant folding": _run_folded_session,
+    "tiered, threshold 1": partial(_run_tiered_session, constant_folding=True, hot_threshold=1),
+    "tiered, threshold 3, no folding": partial(_run_tiered_session, constant_folding=False, hot_threshold=3),
+    "script file": _run_script,
+}
+
+
+def _report(name: str, cases: list, differences: list) -> None:
+    """
+    :param name: Name of the path checked.
+    :param cases: Every case the path was checked on.
+    :param differences: Cases whose result differs.
+    """
+    print(f"{name:<42} {'outputs match' if not differences else 'OUTPUTS DIFFER'} "
+          f"({len(cases) - len(differences)} of {len(cases)} sessions)")
+    if differences:
+        print(f"  first difference: {differences[0]!r}")
+
+
+def _read_fixture_sessions() -> List[List[str]]:
+    """
+    :return: Lines of every session input of the fixture directories, split as standard input is read.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sessions = list()
+    for directory in _FIXTURE_DIRECTORIES:
+        for path in SessionRunner.find_session_inputs(os.path.join(root, directory)):
+            with open(path, encoding="utf-8") as session_input:
+                sessions.append(session_input.read().splitlines())
+    return sessions
+
+
+def record_baseline(checkout: str, sessions: int = BASELINE_SESSIONS, seed: int = 0) -> None:
+    """
+    Run the fixture inputs and random sessions in both modes through ``srpn.py`` and ``srpn_advanced.py`` of a
+    checkout, one process for every session reading it from standard input, and save their output to BASELINE_PATH.
+    :param checkout: Root of a checkout of the code from before the evaluation paths were added.
+    :param sessions: Number of random sessions.
+    :param seed: Seed of the generator the random sessions are drawn from.
+    """
+    random_generator = random.Random(seed)
+    inputs = _read_fixture_sessions() + [random_session(random_generator) for _ in range(sessions)]
+    environment = dict(os.environ, PYTHONPATH=checkout, PYTHONIOENCODING="utf-8")
+    records = list()
+    for lines in inputs:
+        for advanced in (False, True):
+            script = os.path.join("SRPN", "srpn_advanced.py" if advanced else "srpn.py")
+            try:
+                completed = subprocess.run(
+                    [sys.executable, script], input="".join(f"{line}\n" for line in lines), capture_output=True,
+                    cwd=checkout, env=environment, encoding="utf-8", timeout=_BASELINE_TIMEOUT, check=False
+                )
+            except subprocess.TimeoutExpired:
+                continue
+            records.append({"lines": lines, "advanced": advanced, "output": completed.stdout})
+    with open(BASELINE_PATH, "w", encoding="utf-8") as baseline_file:
+        # One session a line, so changes to the recording read well in a diff.
+        baseline_file.write("[\n" + ",\n".join(json.dumps(record, ensure_ascii=False) for record in records) + "\n]\n")
+    print(f"recorded {len(records)} sessions to {BASELINE_PATH}")
+
+
+def check_baseline() -> bool:
+    """
+    Print for the Parser and every path the number of recorded sessions whose output differs from the recording.
+    :return: Whether every path gives the recorded output of every session.
+    """
+    with open(BASELINE_PATH, encoding="utf-8") as baseline_file:
+        records = json.load(baseline_file)
+    cases = [(record["lines"], record["advanced"], Stack.DEFAULT_CAPACITY) for record in records]
+    all_match = True
+    for name, path in {"parser": _run_parser, **PATHS}.items():
+        differences = [
+            case for case, record in zip(cases, records) if path(*case)[0] != record["output"]
+        ]
+        all_match = all_match and not differences
+        _report(f"{name}, recorded", cases, differences)
+    return all_match
+
+
+def run(sessions: int = SESSIONS, seed: int = 0) -> bool:
+    """
+    Print for every path the number of sessions whose output or stack differ from those of the Parser, then check
+    every path against the recorded output.
+    :param sessions: Number of random sessions, each run in both modes at a random stack capacity.
+    :param seed: Seed of the generator the sessions are drawn from.
+    :return: Whether every path matches the Parser on every session and the recording on every recorded session.
+    """
+    random_generator = random.Random(seed)
+    cases = [
+        (random_session(random_generator), advanced, random_generator.choice(_CAPACITIES))
+        for _ in range(sessions) for advanced in (False, True)
+    ]
+    expected = [_run_parser(*case) for case in cases]
+    all_match = True
+    for name, path in PATHS.items():
+        differences = [case for case, result in zip(cases, expected) if path(*case) != result]
+        all_match = all_match and not differences
+        _report(name, cases, differences)
+    return check_baseline() and all_match
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Check evaluation paths against the Parser.")
+    argument_parser.add_argument("--sessions", type=int, default=SESSIONS)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument(
+        "--record", metavar="PATH", help="record the output of a checkout of the code before the evaluation paths"
+    )
+    parsed_arguments = argument_parser.parse_args()
+    if parsed_arguments.record:
+        record_baseline(parsed_arguments.record, seed=parsed_arguments.seed)
+        sys.exit(0)
+    sys.exit(0 if run(parsed_arguments.sessions, parsed_arguments.seed) else 1)
@@ -0,0 +1,39 @@
+"""
+Benchmark of exponentiation over a grid of the operands that are slowest to raise, from the calculator bounds to the
+bases with short cuts.
+
+Run from the repository root with ``python -m benchmarks.exponentiation``.
+"""
+import timeit
+
+from SRPN.tokens.general_methods import GeneralMethods
+from SRPN.tokens.operators import Exponentiation
+
+BASES = (GeneralMethods.LOWER_BOUND, -46341, -2, -1, 0, 1, 2, 46341, GeneralMethods.UPPER_BOUND)
+EXPONENTS = (0, 1, 2, 31, 32, 1_000_000, GeneralMethods.UPPER_BOUND)
+NUMBER = 2_000
+
+
+def run(number: int = NUMBER) -> None:
+    """
+    Print the best time a single exponentiation takes for every pair of operands in the grid.
+    :param number: Number of times each pair is raised.
+    """
+    exponentiation = Exponentiation()
+    worst_time = 0.0
+
+    print(f"{'base':>12} " + " ".join(f"{exponent:>11}" for exponent in EXPONENTS) + "   (ns/op)")
+    for base in BASES:
+        times = list()
+        for exponent in EXPONENTS:
+            seconds = min(timeit.repeat(
+                lambda: exponentiation.perform_operation(base, exponent), number=number, repeat=5
+            )) / number
+            worst_time = max(worst_time, seconds)
+            times.append(f"{seconds * 1e9:>11.0f}")
+        print(f"{base:>12} " + " ".join(times))
+    print(f"worst case: {worst_time * 1e9:.0f} ns")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,66 @@
+"""
+Throughput benchmark comparing the single pass Scanner with the original pattern by pattern decomposition.
+
+Run from the repository root with ``python -m benchmarks.lexer_throughput``.
+"""
+import random
+import timeit
+from typing import Tuple
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.lexer.scanner import Scanner
+
+LINE_LENGTHS = (100, 1_000, 10_000, 100_000, 1_000_000)
+# The original decomposition is quadratic in the line length, past this it takes minutes per line.
+LEGACY_LENGTH_LIMIT = 100_000
+_FRAGMENTS = ("1", "22", "333", "4444", " ", " ", "+", "-", "*", "/", "%", "^", "d", "=", "#", "r", "x")
+
+
+def generate_line(length: int, seed: int = 0) -> str:
+    """
+    Build a machine generated looking line of roughly mixed operands, operators and commands.
+    :param length: Number of characters in the line.
+    :param seed: Seed used for the fragment choice so runs are comparable.
+    :return: The generated line.
+    """
+    generator = random.Random(seed)
+    fragments, size = list(), 0
+    while size < length:
+        fragment = generator.choice(_FRAGMENTS)
+        fragments.append(fragment)
+        size += len(fragment)
+    return "".join(fragments)[:length]
+
+
+def time_decomposition(line: str, single_pass: bool) -> float:
+    """
+    :param line: Line to decompose.
+    :param single_pass: Whether to time the single pass Scanner or the original decomposition.
+    :return: The best time in seconds out of the repeated runs.
+    """
+    decompose = Scanner.decompose_command if single_pass else Lexer._decompose_command
+    number = max(1, 100_000 // len(line))
+    return min(timeit.repeat(lambda: decompose(line), number=number, repeat=3)) / number
+
+
+def run(line_lengths: Tuple[int, ...] = LINE_LENGTHS) -> None:
+    """
+    Print the throughput of both decompositions for every line length.
+    :param line_lengths: Line lengths to sweep.
+    """
+    print(f"{'length':>10} {'scanner MB/s':>14} {'legacy MB/s':>14} {'speedup':>10}")
+    for length in line_lengths:
+        line = generate_line(length)
+        scanner_time = time_decomposition(line, single_pass=True)
+        scanner_rate = length / scanner_time / 1e6
+        if length <= LEGACY_LENGTH_LIMIT:
+            legacy_time = time_decomposition(line, single_pass=False)
+            legacy_rate = f"{length / legacy_time / 1e6:14.2f}"
+            speedup = f"{legacy_time / scanner_time:9.1f}x"
+        else:
+            legacy_rate, speedup = f"{'skipped':>14}", f"{'-':>10}"
+        print(f"{length:>10} {scanner_rate:14.2f} {legacy_rate} {speedup}")
+
+
+if __name__ == '__main__':
+    run()
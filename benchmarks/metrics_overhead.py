@@ -0,0 +1,69 @@
+"""
+Benchmark of the cost of counting metrics, running the same workloads through sessions with and without a metrics
+registry. Every line costs two clock reads and a dictionary update whatever its length, which is most of a microsecond
+against the few microseconds a line of three tokens takes, so the budget of 25% is set by short lines. Long lines pay
+next to nothing.
+
+Run from the repository root with ``python -m benchmarks.metrics_overhead``, it exits with status 1 if a workload is
+over the budget.
+"""
+import argparse
+import statistics
+import sys
+import timeit
+from typing import List, Tuple
+
+from SRPN.profiling.metrics_registry import MetricsRegistry
+from SRPN.session.session import Session
+from benchmarks.workloads import long_lines, short_lines
+
+WORKLOADS = (("short_lines", short_lines(2_000)), ("long_lines", long_lines(500)))
+OVERHEAD_BUDGET = 0.25
+REPEAT = 100
+
+
+def _time_session(lines: List[str], metrics: MetricsRegistry) -> float:
+    """
+    :param lines: Lines of the workload.
+    :param metrics: Registry the session is counted in, None to count nothing.
+    :return: Seconds taken by a new session, made before timing starts, to evaluate the lines.
+    """
+    session = Session(metrics=metrics)
+
+    def evaluate() -> None:
+        for line in lines:
+            session.process_command(line)
+
+    return timeit.timeit(evaluate, number=1)
+
+
+def run(workloads: Tuple[Tuple[str, List[str]], ...] = WORKLOADS, budget: float = OVERHEAD_BUDGET,
+        repeat: int = REPEAT) -> bool:
+    """
+    Print the time taken by every workload with and without metrics.
+    :param workloads: Names and lines of the workloads.
+    :param budget: Largest overhead allowed, as a fraction of the time taken without metrics.
+    :param repeat: Number of times every workload is run each way.
+    :return: Whether every workload is within the budget.
+    """
+    metrics = MetricsRegistry()
+    within_budget = True
+    for name, lines in workloads:
+        plain_times, measured_times = list(), list()
+        for _ in range(repeat):
+            plain_times.append(_time_session(lines, None))
+            measured_times.append(_time_session(lines, metrics))
+        overhead = statistics.median(measured / plain for plain, measured in zip(plain_times, measured_times)) - 1
+        within_budget = within_budget and overhead <= budget
+        print(f"{name:<12} without: {statistics.median(plain_times):.4f} s, "
+              f"with: {statistics.median(measured_times):.4f} s, "
+              f"overhead {overhead:+.1%} {'ok' if overhead <= budget else 'OVER BUDGET'}")
+    return within_budget
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Benchmark of the cost of counting metrics.")
+    argument_parser.add_argument("--budget", type=float, default=OVERHEAD_BUDGET)
+    argument_parser.add_argument("--repeat", type=int, default=REPEAT)
+    parsed_arguments = argument_parser.parse_args()
+    sys.exit(0 if run(budget=parsed_arguments.budget, repeat=parsed_arguments.repeat) else 1)
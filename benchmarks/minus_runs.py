@@ -0,0 +1,46 @@
+"""
+Stress benchmark for joining minus symbols to operands on lines made of long runs of minuses.
+
+Run from the repository root with ``python -m benchmarks.minus_runs``.
+"""
+import timeit
+from typing import Tuple
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.lexer.scanner import Scanner
+
+RUN_LENGTHS = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def generate_line(run_length: int) -> str:
+    """
+    :param run_length: Number of consecutive minuses between the two operands.
+    :return: A line of the form ``1 ------...-5``.
+    """
+    return "1 " + "-" * run_length + "5"
+
+
+def time_minus_resolution(run_length: int) -> float:
+    """
+    Time only the minus resolution stage, the line is decomposed beforehand.
+    :param run_length: Number of consecutive minuses in the line.
+    :return: The best time in seconds out of the repeated runs.
+    """
+    lexer = Lexer()
+    substrings = Scanner.decompose_command(generate_line(run_length))
+    return min(timeit.repeat(lambda: lexer._verify_minus_operands(substrings), number=1, repeat=3))
+
+
+def run(run_lengths: Tuple[int, ...] = RUN_LENGTHS) -> None:
+    """
+    Print the time spent per minus for every run length, which stays flat when the resolution is linear.
+    :param run_lengths: Run lengths to sweep.
+    """
+    print(f"{'minuses':>10} {'seconds':>10} {'ns/minus':>10}")
+    for run_length in run_lengths:
+        seconds = time_minus_resolution(run_length)
+        print(f"{run_length:>10} {seconds:10.4f} {seconds / run_length * 1e9:10.1f}")
+
+
+if __name__ == '__main__':
+    run()
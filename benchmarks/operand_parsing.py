@@ -0,0 +1,27 @@
+"""
+Benchmark of building operands from literals of increasing length, including literals beyond the integer string
+conversion limit of recent Pythons.
+
+Run from the repository root with ``python -m benchmarks.operand_parsing``.
+"""
+import timeit
+
+from SRPN.tokens.operand import Operand
+
+LENGTHS = (10, 1_000, 100_000, 1_000_000)
+
+
+def run(lengths: tuple = LENGTHS) -> None:
+    """
+    Print the time taken to build an operand from a literal of every length, with and without leading zeros.
+    :param lengths: Number of digits in each literal.
+    """
+    for length in lengths:
+        for name, literal in (("digits", "7" * length), ("zeros", "0" * (length - 1) + "7")):
+            seconds = min(timeit.repeat(lambda: Operand(literal), number=10, repeat=3)) / 10
+            print(f"{name:>6} {length:>9}: {seconds * 1e6:10.1f} us ({length / seconds / 1e6:8.1f} M digits/s), "
+                  f"value {Operand(literal).get_value()}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,55 @@
+"""
+Benchmark of a ``d`` heavy session written to a file, one write per value against the default block buffering.
+
+Run from the repository root with ``python -m benchmarks.output_buffering``.
+"""
+import os
+import time
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.output.output_sink import OutputSink, StreamOutputSink
+from SRPN.parse.parser import Parser
+from SRPN.stack.stack import Stack
+from SRPN.tokens.tokenizer import Tokenizer
+
+# The stack is filled once, after which every line prints all 23 of its values.
+_FILL_COMMAND = " ".join(str(value) for value in range(Stack.DEFAULT_CAPACITY))
+LINES = 20_000
+
+
+def _time_session(output_sink: OutputSink, lines: int) -> float:
+    """
+    :param output_sink: Sink the session writes to.
+    :param lines: Number of ``d`` lines in the session.
+    :return: Time taken to evaluate the session and flush its output.
+    """
+    lexer, tokenizer, parser, stack = Lexer(), Tokenizer(output_sink), Parser(output_sink), Stack()
+    parser.read_tokens(stack, tokenizer.read_substrings(lexer.read_user_input(_FILL_COMMAND)))
+    tokens = tokenizer.read_substrings(lexer.read_user_input("d"))
+
+    start = time.perf_counter()
+    for _ in range(lines):
+        parser.read_tokens(stack, tokens)
+        output_sink.end_command()
+    output_sink.flush()
+    return time.perf_counter() - start
+
+
+def run(lines: int = LINES) -> None:
+    """
+    Print the time taken by the session with each buffering.
+    :param lines: Number of ``d`` lines in the session.
+    """
+    values = lines * Stack.DEFAULT_CAPACITY
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        # Without buffering in the sink every value is its own write, as print made it.
+        unbuffered_time = _time_session(StreamOutputSink(devnull, buffer_lines=1, line_buffered=False), lines)
+        buffered_time = _time_session(StreamOutputSink(devnull, line_buffered=False), lines)
+
+    print(f"unbuffered: {unbuffered_time:.4f} s ({values / unbuffered_time / 1e6:.2f} M values/s)")
+    print(f"buffered:   {buffered_time:.4f} s ({values / buffered_time / 1e6:.2f} M values/s)")
+    print(f"speedup:    {unbuffered_time / buffered_time:.2f}x")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,52 @@
+"""
+Benchmark of a vectorised parameter sweep against evaluating the same script once per binding.
+
+Run from the repository root with ``python -m benchmarks.parameter_sweep``, NumPy is required.
+"""
+import time
+
+import numpy
+
+from SRPN.batch.parameter_sweep import ParameterSweep
+from SRPN.lexer.lexer import Lexer
+from SRPN.output.output_sink import ListOutputSink
+from SRPN.parse.parser import Parser
+from SRPN.stack.stack import Stack
+from SRPN.tokens.tokenizer import Tokenizer
+
+SCRIPT = "$0 $1 * 3 + $0 -7 %\n2 ^ / $1 - =\n"
+LANE_COUNT = 1_000_000
+# Evaluating one binding at a time is slow enough that only a sample is timed and the rate extrapolated.
+SEQUENTIAL_SAMPLE = 2_000
+
+
+def run(lane_count: int = LANE_COUNT) -> None:
+    """
+    Print the rate of both approaches in bindings per second.
+    :param lane_count: Number of bindings evaluated by the sweep.
+    """
+    bindings = numpy.random.default_rng(0).integers(-100_000, 100_000, size=(lane_count, 2))
+    sweep = ParameterSweep(SCRIPT)
+
+    start = time.perf_counter()
+    sweep.evaluate(bindings)
+    sweep_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for operand1, operand2 in bindings[:SEQUENTIAL_SAMPLE].tolist():
+        output_sink = ListOutputSink()
+        lexer, tokenizer, parser, stack = Lexer(), Tokenizer(output_sink), Parser(output_sink), Stack()
+        script = SCRIPT.replace("$0", str(operand1)).replace("$1", str(operand2))
+        for line in script.split("\n"):
+            parser.read_tokens(stack, tokenizer.read_substrings(lexer.read_user_input(line)))
+    sequential_seconds = time.perf_counter() - start
+
+    sweep_rate = lane_count / sweep_seconds
+    sequential_rate = SEQUENTIAL_SAMPLE / sequential_seconds
+    print(f"sweep:      {sweep_rate:14,.0f} bindings/s ({lane_count} lanes in {sweep_seconds:.3f} s)")
+    print(f"sequential: {sequential_rate:14,.0f} bindings/s (sample of {SEQUENTIAL_SAMPLE})")
+    print(f"speedup:    {sweep_rate / sequential_rate:14,.0f}x")
+
+
+if __name__ == '__main__':
+    run()
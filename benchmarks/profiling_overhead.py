@@ -0,0 +1,39 @@
+"""
+Benchmark of the cost of profiling, running the same workloads through sessions with and without a Profiler.
+
+Run from the repository root with ``python -m benchmarks.profiling_overhead``.
+"""
+import timeit
+from typing import List, Tuple
+
+from SRPN.profiling.profiler import Profiler
+from SRPN.session.session import Session
+from benchmarks.workloads import long_lines, short_lines
+
+WORKLOADS = (("short_lines", short_lines(20_000)), ("long_lines", long_lines(20_000)))
+
+
+def _run_session(lines: List[str], profiled: bool) -> None:
+    """
+    :param lines: Lines of the workload.
+    :param profiled: Whether the session is given a Profiler.
+    """
+    session = Session(profiler=Profiler() if profiled else None)
+    for line in lines:
+        session.process_command(line)
+
+
+def run(workloads: Tuple[Tuple[str, List[str]], ...] = WORKLOADS) -> None:
+    """
+    Print the time taken by every workload with and without profiling.
+    :param workloads: Names and lines of the workloads.
+    """
+    for name, lines in workloads:
+        plain_time = min(timeit.repeat(lambda: _run_session(lines, False), number=1, repeat=5))
+        profiled_time = min(timeit.repeat(lambda: _run_session(lines, True), number=1, repeat=5))
+        print(f"{name:<12} without: {plain_time:.4f} s, with: {profiled_time:.4f} s, "
+              f"overhead {profiled_time / plain_time - 1:+.1%}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,46 @@
+"""
+Benchmark of drawing the values of r, one randint call at a time against the RandomGenerator one at a time and in
+bulk, along with the cost of cloning a generator part way through its sequence.
+
+Run from the repository root with ``python -m benchmarks.random_generation``.
+"""
+import random
+import timeit
+
+from SRPN.stack.random_generator import RandomGenerator
+from SRPN.tokens.general_methods import GeneralMethods
+
+VALUES = 1_000_000
+
+
+def run(values: int = VALUES) -> None:
+    """
+    Print the rate of every way of drawing values.
+    :param values: Number of values drawn.
+    """
+    def draw_randint() -> None:
+        reference = random.Random(0)
+        for _ in range(values):
+            reference.randint(0, GeneralMethods.UPPER_BOUND)
+
+    def draw_next_value() -> None:
+        generator = RandomGenerator()
+        for _ in range(values):
+            generator.next_value()
+
+    timings = {
+        "randint": min(timeit.repeat(draw_randint, number=1, repeat=3)),
+        "next_value": min(timeit.repeat(draw_next_value, number=1, repeat=3)),
+        "take": min(timeit.repeat(lambda: RandomGenerator().take(values), number=1, repeat=3)),
+    }
+    for name, seconds in timings.items():
+        print(f"{name:<10} {values / seconds / 1e6:6.2f} M values/s ({timings['randint'] / seconds:.1f}x randint)")
+
+    generator = RandomGenerator()
+    generator.take(values)
+    clone_seconds = min(timeit.repeat(generator.clone, number=1_000, repeat=3)) / 1_000
+    print(f"clone after {values} values: {clone_seconds * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    run()
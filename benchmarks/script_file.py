@@ -0,0 +1,89 @@
+"""
+Benchmark of running a large script file through the calculator, typed line by line on standard input, streamed in
+chunks, and memory mapped with --script. Each mode runs in its own process and their outputs are compared by hash.
+Multi-gigabyte inputs are run with ``--size-mb``, the standard input loop takes the longest by far.
+
+Run from the repository root with ``python -m benchmarks.script_file``.
+"""
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from benchmarks.workloads import comment_dense, minus_runs, saturation_storm, short_lines
+
+SIZE_MB = 16
+_MODES = {
+    "stdin loop": [],
+    "stream": ["--stream"],
+    "script": ["--script"],
+}
+
+
+def write_script(path: str, size_mb: int) -> None:
+    """
+    Write a script of a mix of workloads, repeated until it reaches the size.
+    :param path: Path the script is written to.
+    :param size_mb: Size of the script in megabytes.
+    """
+    lines: List[str] = short_lines(2_000) + comment_dense(500) + minus_runs(500) + saturation_storm(300)
+    block = ("\n".join(lines) + "\n").encode()
+    with open(path, "wb") as script_file:
+        for _ in range(-(-size_mb * 1_000_000 // len(block))):
+            script_file.write(block)
+
+
+def _run_mode(path: str, arguments: List[str]) -> Tuple[float, str, int]:
+    """
+    :param path: Path of the script.
+    :param arguments: Command line arguments selecting the mode, the path is appended to --script.
+    :return: Time taken, hash of the output and its size in bytes.
+    """
+    command = [sys.executable, "-m", "SRPN", *arguments]
+    if arguments == ["--script"]:
+        command.append(path)
+    digest, output_bytes = hashlib.sha256(), 0
+    start = time.perf_counter()
+    with open(path, "rb") as script_file:
+        process = subprocess.Popen(command, stdin=script_file, stdout=subprocess.PIPE)
+        for chunk in iter(lambda: process.stdout.read(1 << 20), b""):
+            digest.update(chunk)
+            output_bytes += len(chunk)
+        process.wait()
+    return time.perf_counter() - start, digest.hexdigest(), output_bytes
+
+
+def run(size_mb: int = SIZE_MB, path: str = None) -> None:
+    """
+    Print the time and input throughput of every mode.
+    :param size_mb: Size of the generated script in megabytes.
+    :param path: Existing script to run instead of generating one.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if path is None:
+            path = os.path.join(directory, "script.srpn")
+            write_script(path, size_mb)
+        input_bytes = os.path.getsize(path)
+        print(f"input: {input_bytes / 1e6:.1f} MB")
+
+        digests = set()
+        baseline_seconds = None
+        for name, arguments in _MODES.items():
+            seconds, digest, output_bytes = _run_mode(path, arguments)
+            digests.add(digest)
+            baseline_seconds = baseline_seconds or seconds
+            print(f"{name:<10} {seconds:8.2f} s  {input_bytes / seconds / 1e6:6.2f} MB/s  "
+                  f"({baseline_seconds / seconds:.2f}x stdin loop, {output_bytes / 1e6:.1f} MB output)")
+        print("outputs match" if len(digests) == 1 else "OUTPUTS DIFFER")
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Benchmark of running a large script file.")
+    argument_parser.add_argument("--size-mb", type=int, default=SIZE_MB, help="size of the generated script")
+    argument_parser.add_argument("--path", help="existing script to run instead of generating one")
+    parsed_arguments = argument_parser.parse_args()
+    run(parsed_arguments.size_mb, parsed_arguments.path)
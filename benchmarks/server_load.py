@@ -0,0 +1,126 @@
+"""
+Load generator for the calculator server, opening many concurrent connections that each run a whole session.
+Without an address an in-process server is started on a free port, so it can be run locally as is.
+
+Run from the repository root with ``python -m benchmarks.server_load``, or against a running
+``python -m SRPN --serve`` with ``python -m benchmarks.server_load --port 7878``.
+"""
+import argparse
+import asyncio
+import random
+import resource
+import time
+from typing import List, Tuple
+
+from SRPN.batch.session_runner import run_session
+from SRPN.server.calculator_server import CalculatorServer
+
+CONNECTIONS = 2_000
+LINES_PER_CONNECTION = 50
+_FRAGMENTS = ("1", "22", "333", "-4", "+", "-", "*", "/", "%", "d", "=", "r", "# note #", "x", "\r")
+
+
+def _make_session_input(random_generator: random.Random, lines: int) -> str:
+    """
+    :param random_generator: Generator the lines are drawn from.
+    :param lines: Number of lines in the session.
+    :return: Everything typed in the session.
+    """
+    return "".join(
+        " ".join(random_generator.choice(_FRAGMENTS) for _ in range(8)) + "\n" for _ in range(lines)
+    )
+
+
+async def _run_client(open_connection, session_input: str) -> Tuple[bytes, float]:
+    """
+    Send a session one line at a time and read back everything it outputs.
+    :param open_connection: Coroutine function opening a connection to the server.
+    :param session_input: Everything typed in the session.
+    :return: Output of the session and the time from connecting to the session ending.
+    """
+    start = time.perf_counter()
+    reader, writer = await open_connection()
+    # Every line ends in a line feed, and a carriage return is part of its line as it would be on standard input.
+    for line in session_input.split("\n")[:-1]:
+        writer.write(f"{line}\n".encode())
+        await writer.drain()
+    writer.write_eof()
+    output = await reader.read()
+    writer.close()
+    return output, time.perf_counter() - start
+
+
+async def _generate_load(host: str, port: int, unix_socket: str, advanced: bool, session_inputs: List[str]) -> None:
+    """
+    Run every session at once against the server, starting one in-process if no address is given.
+    :param host: Address of the server.
+    :param port: Port of the server, None to start a server in-process.
+    :param unix_socket: Unix socket of the server, used instead of host and port if given.
+    :param advanced: Whether the server runs advanced sessions.
+    :param session_inputs: Everything typed in each session.
+    """
+    server = None
+    if unix_socket:
+        def open_connection():
+            return asyncio.open_unix_connection(unix_socket)
+    else:
+        if port is None:
+            server = await CalculatorServer(advanced).start_tcp(host, 0)
+            port = server.sockets[0].getsockname()[1]
+
+        def open_connection():
+            return asyncio.open_connection(host, port)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_run_client(open_connection, session_input) for session_input in session_inputs))
+    seconds = time.perf_counter() - start
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    lines = sum(session_input.count("\n") for session_input in session_inputs)
+    latencies = sorted(session_seconds for _, session_seconds in results)
+    mismatches = sum(
+        output.decode() != run_session(session_input, advanced)
+        for (output, _), session_input in zip(results, session_inputs)
+    )
+    print(f"sessions:   {len(session_inputs)} concurrent, {lines} lines in {seconds:.3f} s")
+    print(f"throughput: {lines / seconds:,.0f} lines/s, {len(session_inputs) / seconds:,.0f} sessions/s")
+    print(f"session time: median {latencies[len(latencies) // 2] * 1e3:.1f} ms, "
+          f"max {latencies[-1] * 1e3:.1f} ms")
+    print(f"outputs differing from srpn.py: {mismatches}")
+
+
+def run(connections: int = CONNECTIONS, lines_per_connection: int = LINES_PER_CONNECTION, host: str = "127.0.0.1",
+        port: int = None, unix_socket: str = None, advanced: bool = False) -> None:
+    """
+    Print the throughput of the server and check every session's output against a local session.
+    :param connections: Number of concurrent connections.
+    :param lines_per_connection: Number of lines sent on every connection.
+    :param host: Address of the server.
+    :param port: Port of the server, None to start a server in-process.
+    :param unix_socket: Unix socket of the server, used instead of host and port if given.
+    :param advanced: Whether the server runs advanced sessions.
+    """
+    # Both ends of every connection may be in this process, so raise the open file limit as far as allowed.
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard_limit, hard_limit))
+
+    random_generator = random.Random(0)
+    session_inputs = [_make_session_input(random_generator, lines_per_connection) for _ in range(connections)]
+    asyncio.run(_generate_load(host, port, unix_socket, advanced, session_inputs))
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Load generator for the calculator server.")
+    argument_parser.add_argument("--connections", type=int, default=CONNECTIONS)
+    argument_parser.add_argument("--lines", type=int, default=LINES_PER_CONNECTION)
+    argument_parser.add_argument("--host", default="127.0.0.1")
+    argument_parser.add_argument("--port", type=int)
+    argument_parser.add_argument("--unix-socket")
+    argument_parser.add_argument("--advanced", action="store_true", help="the server runs advanced sessions")
+    arguments = argument_parser.parse_args()
+    run(
+        arguments.connections, arguments.lines, arguments.host, arguments.port, arguments.unix_socket,
+        arguments.advanced
+    )
@@ -0,0 +1,59 @@
+"""
+Benchmark of snapshotting and restoring sessions, for a session that never used r and one part way through its
+sequence, along with the throughput of snapshotting many sessions into one buffer.
+
+Run from the repository root with ``python -m benchmarks.session_snapshot``.
+"""
+import timeit
+from typing import List
+
+from SRPN.session.session import Session
+
+SESSIONS = 10_000
+REPETITIONS = 10_000
+
+
+def _make_sessions(count: int, random_values: int) -> List[Session]:
+    """
+    :param count: Number of sessions.
+    :param random_values: Values every session draws with r, 0 leaves the generator untouched.
+    :return: Sessions with a full stack of distinct values.
+    """
+    sessions = list()
+    for index in range(count):
+        session = Session()
+        session.process_command(" ".join(str(index + value) for value in range(20)), return_output=True)
+        session.process_command("r" * random_values, return_output=True)
+        sessions.append(session)
+    return sessions
+
+
+def run(sessions: int = SESSIONS, repetitions: int = REPETITIONS) -> None:
+    """
+    Print the time a single snapshot and restore take, and the rate of batch snapshots.
+    :param sessions: Number of sessions in a batch.
+    :param repetitions: Number of times every single snapshot and restore is timed.
+    """
+    for name, random_values in (("without r", 0), ("after r", 3)):
+        session = _make_sessions(1, random_values)[0]
+        snapshot = session.snapshot()
+        target = Session()
+        snapshot_seconds = min(timeit.repeat(session.snapshot, number=repetitions, repeat=3)) / repetitions
+        restore_seconds = min(timeit.repeat(lambda: target.restore(snapshot), number=repetitions, repeat=3))
+        restore_seconds /= repetitions
+        print(f"{name:<10} {len(snapshot):5} bytes  snapshot {snapshot_seconds * 1e6:6.2f} us  "
+              f"restore {restore_seconds * 1e6:6.2f} us")
+
+    for name, random_values in (("without r", 0), ("after r", 3)):
+        batch = _make_sessions(sessions, random_values)
+        targets = [Session() for _ in range(sessions)]
+        buffer = Session.snapshot_many(batch)
+        snapshot_seconds = min(timeit.repeat(lambda: Session.snapshot_many(batch), number=1, repeat=3))
+        restore_seconds = min(timeit.repeat(lambda: Session.restore_many(buffer, targets), number=1, repeat=3))
+        print(f"batch {name:<10} {sessions} sessions, {len(buffer) / 1e6:.2f} MB  "
+              f"snapshot {snapshot_seconds / sessions * 1e6:6.2f} us/session  "
+              f"restore {restore_seconds / sessions * 1e6:6.2f} us/session")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,64 @@
+"""
+Benchmark of many independent sessions run on a thread pool of increasing size. Threads only add throughput on a
+free-threaded build of CPython, where sessions run in parallel as they share no mutable state.
+
+Run from the repository root with ``python -m benchmarks.session_throughput``.
+"""
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from SRPN.session.session import Session
+
+SESSIONS = 256
+LINES_PER_SESSION = 200
+_FRAGMENTS = ("1", "22", "333", "-4", "+", "-", "*", "/", "%", "d", "=", "r", "# note #")
+
+
+def _make_session_input(random_generator: random.Random, lines: int) -> List[str]:
+    """
+    :param random_generator: Generator the lines are drawn from.
+    :param lines: Number of lines in the session.
+    :return: Lines typed in the session.
+    """
+    return [" ".join(random_generator.choice(_FRAGMENTS) for _ in range(12)) for _ in range(lines)]
+
+
+def _run_session(lines: List[str]) -> int:
+    """
+    :param lines: Lines typed in the session.
+    :return: Number of lines of output.
+    """
+    session = Session()
+    for line in lines:
+        session.process_command(line)
+    return len(session.get_output_sink().get_lines())
+
+
+def run(sessions: int = SESSIONS, lines_per_session: int = LINES_PER_SESSION) -> None:
+    """
+    Print the session throughput for every thread pool size.
+    :param sessions: Number of sessions run for every pool size.
+    :param lines_per_session: Number of lines typed in every session.
+    """
+    random_generator = random.Random(0)
+    inputs = [_make_session_input(random_generator, lines_per_session) for _ in range(sessions)]
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL enabled: {gil_enabled}, CPUs: {os.cpu_count()}")
+
+    single_thread_rate = None
+    for threads in (1, 2, 4, 8):
+        with ThreadPoolExecutor(threads) as executor:
+            start = time.perf_counter()
+            list(executor.map(_run_session, inputs))
+            seconds = time.perf_counter() - start
+        rate = sessions / seconds
+        single_thread_rate = single_thread_rate or rate
+        print(f"{threads} threads: {rate:8.1f} sessions/s ({rate / single_thread_rate:.2f}x)")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,107 @@
+"""
+Benchmark of starting the calculator from cold for a single line of input, as the marking script and wrappers do for
+every input file. Every entry point is timed to its first output, and the time its imports take under
+``-X importtime`` is checked against a budget, beyond the imports of the bare interpreter.
+
+Run from the repository root with ``python -m benchmarks.startup``, it exits with status 1 if an entry point is over
+the budget.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from SRPN.zipapp_builder import ZipappBuilder
+
+IMPORT_BUDGET_MS = 100.0
+RUNS = 20
+_FIRST_LINE = b"1 2 + =\n"
+_REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _get_environment() -> Dict[str, str]:
+    """
+    :return: Environment the entry points run in, finding the package from the repository root as srpn.py needs.
+    """
+    return dict(os.environ, PYTHONPATH=_REPOSITORY_ROOT)
+
+
+def time_to_first_output(arguments: List[str]) -> float:
+    """
+    :param arguments: Arguments of the interpreter that start the entry point.
+    :return: Seconds from starting the process to reading the first byte it outputs for a single line.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, *arguments], stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=_REPOSITORY_ROOT,
+        env=_get_environment()
+    )
+    process.stdin.write(_FIRST_LINE)
+    process.stdin.close()
+    process.stdout.read(1)
+    seconds = time.perf_counter() - start
+    process.stdout.read()
+    process.wait()
+    return seconds
+
+
+def import_time(arguments: List[str]) -> float:
+    """
+    :param arguments: Arguments of the interpreter that start the entry point.
+    :return: Milliseconds spent importing modules, the sum of the self times reported by -X importtime.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE, cwd=_REPOSITORY_ROOT, env=_get_environment(), check=True
+    )
+    microseconds = 0
+    for line in process.stderr.decode().splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_time = line[len("import time:"):].split("|")[0].strip()
+            if self_time.isdigit():
+                microseconds += int(self_time)
+    return microseconds / 1000
+
+
+def run(budget_ms: float = IMPORT_BUDGET_MS, runs: int = RUNS) -> bool:
+    """
+    Print the median time to first output and import time of every entry point.
+    :param budget_ms: Milliseconds the imports of an entry point may take beyond those of the bare interpreter.
+    :param runs: Number of times every entry point is started.
+    :return: Whether every entry point is within the budget.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        zipapp_path = os.path.join(directory, "srpn.pyz")
+        ZipappBuilder().build(zipapp_path)
+        entry_points = {
+            "interpreter": ["-c", "import sys; sys.stdout.write(sys.stdin.read())"],
+            "srpn.py": [os.path.join("SRPN", "srpn.py")],
+            "python -m SRPN": ["-m", "SRPN"],
+            "zipapp": [zipapp_path],
+        }
+
+        interpreter_import_ms = statistics.median(import_time(entry_points["interpreter"]) for _ in range(runs))
+        within_budget = True
+        for name, arguments in entry_points.items():
+            first_output_ms = statistics.median(time_to_first_output(arguments) for _ in range(runs)) * 1000
+            import_ms = statistics.median(import_time(arguments) for _ in range(runs)) - interpreter_import_ms
+            status = ""
+            if name != "interpreter":
+                status = "ok" if import_ms <= budget_ms else "OVER BUDGET"
+                within_budget = within_budget and import_ms <= budget_ms
+            print(f"{name:<16} first output {first_output_ms:7.1f} ms  imports {import_ms:6.1f} ms  {status}")
+
+    print(f"import budget: {budget_ms:.1f} ms beyond the interpreter")
+    return within_budget
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Benchmark of starting the calculator from cold.")
+    argument_parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    argument_parser.add_argument("--runs", type=int, default=RUNS)
+    parsed_arguments = argument_parser.parse_args()
+    sys.exit(0 if run(parsed_arguments.budget_ms, parsed_arguments.runs) else 1)
@@ -0,0 +1,182 @@
+"""
+Benchmark suite timing every stage of the calculator separately and end to end over the synthetic workloads, saving
+the results as JSON so runs can be compared.
+
+Run from the repository root with ``python -m benchmarks.suite``, see ``--help`` for saving and comparing results.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from SRPN.errors.negative_exponent_error import NegativeExponentError
+from SRPN.errors.stack_empty_error import StackEmptyError
+from SRPN.errors.underflow_error import UnderflowError
+from SRPN.lexer.lexer import Lexer
+from SRPN.output.output_sink import ListOutputSink
+from SRPN.parse.parser import Parser
+from SRPN.session.session import Session
+from SRPN.stack.stack import Stack
+from SRPN.tokens import command, operand, operators, token
+from SRPN.tokens.tokenizer import Tokenizer
+from benchmarks.workloads import DEFAULT_SCALES, WORKLOADS
+
+STAGES = ("lexer", "tokenizer", "parser", "stack", "end_to_end")
+REPEAT = 3
+
+
+def _time_stages(lines: List[str], repeat: int) -> Dict[str, float]:
+    """
+    Time every stage over the same lines. Each stage is given the output of the stage before it, prepared beforehand,
+    so only the stage itself is timed. The stack stage makes the Stack calls the Parser would make directly, so the
+    difference between the two is the cost of dispatching tokens.
+    :param lines: Lines of the workload.
+    :param repeat: Number of times each stage is timed, the best time is kept.
+    :return: Best time in seconds of every stage.
+    """
+    substrings = _lex(lines)
+    tokens = Tokenizer(ListOutputSink()).read_substrings(
+        tuple(substring for line_substrings in substrings for substring in line_substrings)
+    )
+    stack_calls = _make_stack_calls(tokens)
+
+    def run_tokenizer() -> None:
+        tokenizer = Tokenizer(ListOutputSink())
+        for line_substrings in substrings:
+            tokenizer.read_substrings(line_substrings)
+
+    def run_end_to_end() -> None:
+        session = Session()
+        for line in lines:
+            session.process_command(line)
+
+    timers: Dict[str, Callable[[], None]] = {
+        "lexer": lambda: _lex(lines),
+        "tokenizer": run_tokenizer,
+        "parser": lambda: Parser(ListOutputSink()).read_tokens(Stack(), tokens),
+        "stack": lambda: _run_stack_calls(stack_calls),
+        "end_to_end": run_end_to_end,
+    }
+    return {stage: min(timeit.repeat(timer, number=1, repeat=repeat)) for stage, timer in timers.items()}
+
+
+def _lex(lines: List[str]) -> List[tuple]:
+    """
+    :param lines: Lines of the workload.
+    :return: Substrings of every line, lexed in order so comments carry across lines.
+    """
+    lexer = Lexer()
+    return [lexer.read_user_input(line) for line in lines]
+
+
+def _make_stack_calls(tokens: Tuple[token.Token, ...]) -> List[Tuple[int, object]]:
+    """
+    :param tokens: Tokens of the workload.
+    :return: Kind of Stack call every token makes, with the value or token it is made with.
+    """
+    stack_calls = list()
+    for _token in tokens:
+        if isinstance(_token, operand.Operand):
+            stack_calls.append((0, _token.get_value()))
+        elif isinstance(_token, operators.Operator):
+            stack_calls.append((1, _token))
+        elif isinstance(_token, command.Command):
+            stack_calls.append((2, _token))
+    return stack_calls
+
+
+def _run_stack_calls(stack_calls: List[Tuple[int, object]]) -> None:
+    """
+    :param stack_calls: Stack calls made by _make_stack_calls.
+    """
+    stack, output_sink = Stack(), ListOutputSink()
+    for kind, argument in stack_calls:
+        try:
+            if kind == 0:
+                stack.add_int_to_stack(argument)
+            elif kind == 1:
+                stack.perform_operand(argument)
+            else:
+                argument.perform_command(stack, output_sink)
+        except (OverflowError, UnderflowError, ZeroDivisionError, NegativeExponentError, StackEmptyError):
+            pass
+
+
+def _get_environment() -> Dict[str, str]:
+    """
+    :return: Description of where the suite ran, saved with the results.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run(workloads: Tuple[str, ...] = tuple(WORKLOADS), scale_factor: float = 1.0, repeat: int = REPEAT,
+        output_path: str = None, compare_path: str = None) -> Dict[str, object]:
+    """
+    Print the time of every stage for every workload, optionally saving the results and comparing them to a
+    previous run.
+    :param workloads: Names of the workloads to run.
+    :param scale_factor: Multiplier of the default scale of every workload.
+    :param repeat: Number of times each stage is timed, the best time is kept.
+    :param output_path: Path the results are saved to as JSON.
+    :param compare_path: Path of saved results to compare against.
+    :return: The results.
+    """
+    previous_workloads = dict()
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as compare_file:
+            previous_workloads = json.load(compare_file)["workloads"]
+
+    results = {"environment": _get_environment(), "workloads": dict()}
+    print(f"{'workload':<17} {'lines':>7} {'chars':>9} " + " ".join(f"{stage:>11}" for stage in STAGES))
+    for name in workloads:
+        scale = max(1, int(DEFAULT_SCALES[name] * scale_factor))
+        lines = WORKLOADS[name](scale)
+        seconds = _time_stages(lines, repeat)
+        characters = sum(len(line) for line in lines)
+        results["workloads"][name] = {
+            "scale": scale, "lines": len(lines), "characters": characters, "seconds": seconds,
+            "characters_per_second": {stage: characters / stage_seconds for stage, stage_seconds in seconds.items()},
+        }
+
+        print(f"{name:<17} {len(lines):>7} {characters:>9} "
+              + " ".join(f"{seconds[stage] * 1e3:>9.1f}ms" for stage in STAGES))
+        previous = previous_workloads.get(name)
+        if previous and previous["scale"] == scale:
+            print(f"{'  vs previous':<35} "
+                  + " ".join(f"{previous['seconds'][stage] / seconds[stage]:>10.2f}x" for stage in STAGES))
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(
+        description="Time every stage of the calculator over synthetic workloads."
+    )
+    argument_parser.add_argument(
+        "--workload", action="append", choices=sorted(WORKLOADS), help="workload to run, every workload by default"
+    )
+    argument_parser.add_argument("--scale", type=float, default=1.0, help="multiplier of every workload's size")
+    argument_parser.add_argument("--repeat", type=int, default=REPEAT, help="timings taken of each stage, best kept")
+    argument_parser.add_argument("--output", help="path the results are saved to as JSON")
+    argument_parser.add_argument("--compare", help="path of saved results to show the speedup against")
+    arguments = argument_parser.parse_args()
+    run(tuple(arguments.workload or WORKLOADS), arguments.scale, arguments.repeat, arguments.output, arguments.compare)
@@ -0,0 +1,52 @@
+"""
+Benchmark of tiered sessions, which compile hot lines to Python functions, against sessions evaluating every line with
+the Parser, over lines repeated many times. The lines are all hot after the first few repetitions, so the time is that
+of their compiled functions. Their operators work on the values already on the stack, so folding cannot evaluate them
+in advance.
+
+Run from the repository root with ``python -m benchmarks.tiered_execution``.
+"""
+import timeit
+from typing import Dict, List
+
+from SRPN.parse.closure_compiler import TieredLine
+from SRPN.session.session import Session
+
+_LINES: Dict[str, List[str]] = {
+    "short lines": ["3 +", "2 *", "7 -", "5 /", "9 %", "="],
+    "long line": ["3 + 2 * 7 - 5 / 9 % 4 + 6 * 8 - 2 / 3 + 11 * 13 - 3 / 17 + 2 ^ 1000 % =", "d"],
+    "stack errors": ["+ 1 0 / 2 -1 ^ r = 5 % * - d"],
+    "saturation": ["2147483647 * 2 + 3 * 99999 * 2 ^ 3 - 4 ^ =", "2 -2147483647 * ="],
+}
+REPETITIONS = 5_000
+
+
+def run(repetitions: int = REPETITIONS, hot_threshold: int = TieredLine.DEFAULT_HOT_THRESHOLD) -> None:
+    """
+    Print the time taken to evaluate every workload with the Parser alone and with tiered execution.
+    :param repetitions: Number of times the lines of every workload are evaluated.
+    :param hot_threshold: Number of evaluations before a line is compiled.
+    """
+    for name, lines in _LINES.items():
+        timings = dict()
+        for threshold in (0, hot_threshold):
+            session = Session(hot_threshold=threshold)
+            stack, output_sink = session.get_stack(), session.get_output_sink()
+
+            def evaluate() -> None:
+                for _ in range(repetitions):
+                    # Every repetition starts from the same single value, and its output is thrown away.
+                    stack.set_state((5,), False)
+                    for line in lines:
+                        session.process_command(line)
+                    output_sink.clear()
+
+            timings[threshold] = min(timeit.repeat(evaluate, number=1, repeat=3))
+        line_count = repetitions * len(lines)
+        print(f"{name:<14} parser {timings[0] / line_count * 1e6:6.2f} us/line  "
+              f"tiered {timings[hot_threshold] / line_count * 1e6:6.2f} us/line  "
+              f"({timings[0] / timings[hot_threshold]:.2f}x)")
+
+
+if __name__ == '__main__':
+    run()
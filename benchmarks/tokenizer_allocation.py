@@ -0,0 +1,52 @@
+"""
+Benchmark of the time, allocated memory and distinct objects needed to tokenize a line of a million tokens.
+
+Run from the repository root with ``python -m benchmarks.tokenizer_allocation``.
+"""
+import random
+import time
+import tracemalloc
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.tokens.tokenizer import Tokenizer
+
+TOKEN_COUNT = 1_000_000
+_FRAGMENTS = ("1", "22", "5", "17", "+", "-", "*", "/", "%", "^", "d", "=", "r")
+
+
+def generate_line(token_count: int = TOKEN_COUNT, seed: int = 0) -> str:
+    """
+    :param token_count: Number of space separated tokens in the line.
+    :param seed: Seed used for the fragment choice so runs are comparable.
+    :return: The generated line.
+    """
+    generator = random.Random(seed)
+    return " ".join(generator.choice(_FRAGMENTS) for _ in range(token_count))
+
+
+def run(token_count: int = TOKEN_COUNT) -> None:
+    """
+    Print the tokenizer throughput, the memory allocated while tokenizing and how many distinct token objects exist.
+    :param token_count: Number of tokens in the benchmarked line.
+    """
+    substrings = Lexer().read_user_input(generate_line(token_count))
+    tokenizer = Tokenizer()
+
+    start = time.perf_counter()
+    tokenizer.read_substrings(substrings)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    tokens = tokenizer.read_substrings(substrings)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"tokens:           {len(tokens)}")
+    print(f"seconds:          {seconds:.3f} ({len(tokens) / seconds / 1e6:.2f} M tokens/s)")
+    print(f"allocated bytes:  {allocated} ({allocated / len(tokens):.1f} per token)")
+    print(f"peak bytes:       {peak}")
+    print(f"distinct tokens:  {len({id(_token) for _token in tokens})}")
+
+
+if __name__ == '__main__':
+    run()
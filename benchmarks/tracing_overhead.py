@@ -0,0 +1,69 @@
+"""
+Benchmark of the cost of tracing, running the same workloads through sessions with and without a trace, which should
+stay under 10%. The workloads are small and run many times, alternating with and without the trace.
+
+Run from the repository root with ``python -m benchmarks.tracing_overhead``, it exits with status 1 if a workload is
+over the budget.
+"""
+import argparse
+import statistics
+import sys
+import timeit
+from typing import List, Tuple
+
+from SRPN.parse.tracing_parser import TracingParser
+from SRPN.session.session import Session
+from benchmarks.workloads import long_lines, short_lines
+
+WORKLOADS = (("short_lines", short_lines(2_000)), ("long_lines", long_lines(500)))
+OVERHEAD_BUDGET = 0.10
+REPEAT = 100
+
+
+def _time_session(lines: List[str], trace_capacity: int) -> float:
+    """
+    :param lines: Lines of the workload.
+    :param trace_capacity: Number of entries the trace of the session keeps, 0 for no trace.
+    :return: Seconds taken by a new session to evaluate the lines. The session is made before timing starts, as timeit
+    turns off the garbage collector and sessions left over from earlier runs would pile up while it is off.
+    """
+    session = Session(trace_capacity=trace_capacity)
+
+    def evaluate() -> None:
+        for line in lines:
+            session.process_command(line)
+
+    return timeit.timeit(evaluate, number=1)
+
+
+def run(workloads: Tuple[Tuple[str, List[str]], ...] = WORKLOADS, budget: float = OVERHEAD_BUDGET,
+        repeat: int = REPEAT) -> bool:
+    """
+    Print the time taken by every workload with and without tracing.
+    :param workloads: Names and lines of the workloads.
+    :param budget: Largest overhead allowed, as a fraction of the time taken without tracing.
+    :param repeat: Number of times every workload is run each way.
+    :return: Whether every workload is within the budget.
+    """
+    within_budget = True
+    for name, lines in workloads:
+        plain_times, traced_times = list(), list()
+        for _ in range(repeat):
+            plain_times.append(_time_session(lines, 0))
+            traced_times.append(_time_session(lines, TracingParser.DEFAULT_CAPACITY))
+        # Every run with the trace is compared to the run without it just before, so a burst of load only skews a few of
+        # the ratios and the median leaves them out.
+        overhead = statistics.median(traced / plain for plain, traced in zip(plain_times, traced_times)) - 1
+        within_budget = within_budget and overhead <= budget
+        print(f"{name:<12} without: {statistics.median(plain_times):.4f} s, "
+              f"with: {statistics.median(traced_times):.4f} s, "
+              f"overhead {overhead:+.1%} {'ok' if overhead <= budget else 'OVER BUDGET'}")
+    return within_budget
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Benchmark of the cost of tracing.")
+    argument_parser.add_argument("--budget", type=float, default=OVERHEAD_BUDGET)
+    argument_parser.add_argument("--repeat", type=int, default=REPEAT)
+    parsed_arguments = argument_parser.parse_args()
+    sys.exit(0 if run(budget=parsed_arguments.budget, repeat=parsed_arguments.repeat) else 1)
@@ -0,0 +1,56 @@
+"""
+Benchmark comparing evaluation of object tokens by the Parser with compiled instructions run by the VirtualMachine.
+The evaluators are timed in turn and the medians compared, as the time of a single run varies a lot. A line compiled to
+be run only once pays for its compilation too, which is shown against the Parser as well.
+
+Run from the repository root with ``python -m benchmarks.vm_evaluation``.
+"""
+import statistics
+import timeit
+
+from SRPN.lexer.lexer import Lexer
+from SRPN.output.output_sink import ListOutputSink
+from SRPN.parse.compiler import Compiler
+from SRPN.parse.parser import Parser
+from SRPN.parse.virtual_machine import VirtualMachine
+from SRPN.stack.stack import Stack
+from SRPN.tokens.tokenizer import Tokenizer
+
+# Every repetition uses each operator and leaves the stack depth unchanged, saturating once on the multiplication.
+_REPEATED_COMMAND = "3 + 2 * 5 - 7 % 4 ^ 2 / 2147483647 * 1 - "
+REPETITIONS = 20_000
+REPEAT = 9
+
+
+def run(repetitions: int = REPETITIONS, repeat: int = REPEAT) -> None:
+    """
+    Print the time both evaluators take on the same tokens, compilation is timed separately.
+    :param repetitions: Number of times the command is repeated in the evaluated line.
+    :param repeat: Number of times every evaluator is timed.
+    """
+    line = "1 " + _REPEATED_COMMAND * repetitions
+    tokens = Tokenizer().read_substrings(Lexer().read_user_input(line))
+    output_sink = ListOutputSink()
+    parser, virtual_machine = Parser(output_sink), VirtualMachine(output_sink)
+    instructions = Compiler.compile_tokens(tokens)
+
+    compile_times, parser_times, machine_times = list(), list(), list()
+    for _ in range(repeat):
+        compile_times.append(timeit.timeit(lambda: Compiler.compile_tokens(tokens), number=1))
+        parser_times.append(timeit.timeit(lambda: parser.read_tokens(Stack(), tokens), number=1))
+        machine_times.append(timeit.timeit(lambda: virtual_machine.run(Stack(), instructions), number=1))
+    compile_time = statistics.median(compile_times)
+    parser_time = statistics.median(parser_times)
+    machine_time = statistics.median(machine_times)
+
+    print(f"tokens:          {len(tokens)}")
+    print(f"instructions:    {len(instructions) // 2} ({instructions.itemsize * len(instructions)} bytes)")
+    print(f"compile:         {compile_time:.4f} s")
+    print(f"parser:          {parser_time:.4f} s ({len(tokens) / parser_time / 1e6:.2f} M tokens/s)")
+    print(f"virtual machine: {machine_time:.4f} s ({len(tokens) / machine_time / 1e6:.2f} M tokens/s)")
+    print(f"speedup:         {parser_time / machine_time:.2f}x, "
+          f"{parser_time / (compile_time + machine_time):.2f}x compiling the line to run it once")
+
+
+if __name__ == '__main__':
+    run()
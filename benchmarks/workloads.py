@@ -0,0 +1,135 @@
+"""
+Generators of synthetic session inputs shaped like the workloads the calculator sees. Every generator is seeded, so a
+workload is the same on every run and results can be compared between runs.
+"""
+import random
+from typing import Callable, Dict, List
+
+from SRPN.stack.stack import Stack
+from SRPN.tokens.general_methods import GeneralMethods
+
+_TOKENS = ("1", "22", "333", "4444", "+", "-", "*", "/", "%", "^", "=", "d", "r")
+_COMMENT_WORDS = ("the", "sum", "of", "2", "and", "-3", "is", "printed", "with", "d", "+", "#12")
+
+
+def long_lines(scale: int, seed: int = 0) -> List[str]:
+    """
+    :param scale: Size of the workload, the number of tokens in every line.
+    :param seed: Seed of the generator.
+    :return: A few very long lines of random tokens.
+    """
+    random_generator = random.Random(seed)
+    return [" ".join(random_generator.choice(_TOKENS) for _ in range(scale)) for _ in range(4)]
+
+
+def short_lines(scale: int, seed: int = 0) -> List[str]:
+    """
+    :param scale: Size of the workload, the number of lines.
+    :param seed: Seed of the generator.
+    :return: Many lines of a few tokens each, with values kept in range so the stack neither fills nor empties.
+    """
+    random_generator = random.Random(seed)
+    lines = list()
+    for _ in range(scale):
+        operand = random_generator.randint(1, 99)
+        operator = random_generator.choice("+-*/%")
+        lines.append(f"{operand} {operator} =" if random_generator.random() < 0.5 else f"{operand} {operator}")
+    return ["1"] + lines
+
+
+def comment_dense(scale: int, seed: int = 0) -> List[str]:
+    """
+    :param scale: Size of the workload, the number of lines.
+    :param seed: Seed of the generator.
+    :return: Lines that are mostly comment text, with comments left open across lines.
+    """
+    random_generator = random.Random(seed)
+    lines = list()
+    for index in range(scale):
+        comment = " ".join(random_generator.choice(_COMMENT_WORDS) for _ in range(30))
+        if index % 4 == 0:
+            lines.append(f"# {comment}")
+        elif index % 4 == 1:
+            lines.append(f"{comment} # 1 +")
+        else:
+            lines.append(f"2 # {comment} # =")
+    return lines
+
+
+def minus_runs(scale: int, seed: int = 0) -> List[str]:
+    """
+    :param scale: Size of the workload, the number of lines.
+    :param seed: Seed of the generator.
+    :return: Lines of long runs of minuses between operands, mixing runs that do and do not join an operand.
+    """
+    random_generator = random.Random(seed)
+    lines = list()
+    for _ in range(scale):
+        parts = [f"{random_generator.randint(0, 99)}{'-' * random_generator.randint(1, 40)}" for _ in range(8)]
+        lines.append(" ".join(parts) + " 1 d")
+    return lines
+
+
+def saturation_storm(scale: int, seed: int = 0) -> List[str]:
+    """
+    :param scale: Size of the workload, the number of lines.
+    :param seed: Seed of the generator.
+    :return: Lines that keep saturating at the bounds, overflowing the stack and underflowing it again.
+    """
+    random_generator = random.Random(seed)
+    upper, lower = GeneralMethods.UPPER_BOUND, GeneralMethods.LOWER_BOUND
+    lines = list()
+    for index in range(scale):
+        if index % 3 == 0:
+            lines.append(" ".join(str(random_generator.choice((upper, lower, 99999999999))) for _ in range(30)))
+        elif index % 3 == 1:
+            lines.append(" ".join(random_generator.choice(("*", "+", "-", "^", "9 *", "-9 *")) for _ in range(30)))
+        else:
+            lines.append("+ " * 30 + "= 2147483647 2147483647 ^ =")
+    return lines
+
+
+def output_heavy(scale: int, seed: int = 0) -> List[str]:
+    """
+    :param scale: Size of the workload, the number of lines printing the stack.
+    :param seed: Seed of the generator.
+    :return: A line filling the stack followed by lines printing all of it.
+    """
+    random_generator = random.Random(seed)
+    fill = " ".join(str(random_generator.randint(-1000, 1000)) for _ in range(Stack.DEFAULT_CAPACITY))
+    return [fill] + ["d d d"] * scale
+
+
+def random_heavy(scale: int, seed: int = 0) -> List[str]:
+    """
+    :param scale: Size of the workload, the number of lines.
+    :param seed: Seed of the generator.
+    :return: Lines drawing random numbers and combining each with the value below it, so the stack does not fill.
+    """
+    random_generator = random.Random(seed)
+    lines = list()
+    for _ in range(scale):
+        pairs = " ".join(f"r {random_generator.choice('+-*/%')}" for _ in range(random_generator.randint(1, 6)))
+        lines.append(f"{pairs} =" if random_generator.random() < 0.5 else pairs)
+    return ["r"] + lines
+
+
+# Every generator by name, along with the scale it is run at by default.
+WORKLOADS: Dict[str, Callable[[int, int], List[str]]] = {
+    "long_lines": long_lines,
+    "short_lines": short_lines,
+    "comment_dense": comment_dense,
+    "minus_runs": minus_runs,
+    "saturation_storm": saturation_storm,
+    "output_heavy": output_heavy,
+    "random_heavy": random_heavy,
+}
+DEFAULT_SCALES: Dict[str, int] = {
+    "long_lines": 50_000,
+    "short_lines": 50_000,
+    "comment_dense": 10_000,
+    "minus_runs": 10_000,
+    "saturation_storm": 5_000,
+    "output_heavy": 5_000,
+    "random_heavy": 10_000,
+}